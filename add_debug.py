@@ -1,5 +1,6 @@
-with open('src/pages/Design.tsx', 'r') as f:
-    content = f.read()
+import sys
+
+from patchkit import patch_file
 
 # Add console.log to handleLetUsDesign
 old_handler = '''  const handleLetUsDesign = () => {
@@ -10,9 +11,10 @@ new_handler = '''  const handleLetUsDesign = () => {
     setDesignServiceMode(true);
     console.log('🔥 designServiceMode state updated');'''
 
-content = content.replace(old_handler, new_handler)
+result = patch_file('src/pages/Design.tsx', [(old_handler, new_handler)], strict=True)
 
-with open('src/pages/Design.tsx', 'w') as f:
-    f.write(content)
+if result.missing:
+    print("⚠️  handleLetUsDesign not found - no debug logging added")
+    sys.exit(1)
 
 print("✅ Debug logging added")
@@ -1,33 +1,57 @@
 #!/usr/bin/env python3
 
-# Read the file
-with open('src/components/design/BannerEditorLayout.tsx', 'r') as f:
-    lines = f.readlines()
-
-# Change 1: Add two props to interface after line 49 (index 48)
-lines.insert(49, '  designServiceMode?: boolean;\n')
-lines.insert(50, '  onDesignServiceModeChange?: (mode: boolean) => void;\n')
-
-# Change 2: Update component signature at line 54 (now line 56 after insertions)
-# Find the line that starts with "const BannerEditorLayout"
-for i, line in enumerate(lines):
-    if 'const BannerEditorLayout: React.FC<BannerEditorLayoutProps> = ({ onOpenAIModal }) => {' in line:
-        lines[i] = 'const BannerEditorLayout: React.FC<BannerEditorLayoutProps> = ({ onOpenAIModal, designServiceMode: externalDesignServiceMode, onDesignServiceModeChange }) => {\n'
-        break
-
-# Change 3: Replace state management lines
-# Find the lines with "const [designServiceMode, setDesignServiceMode] = useState(false);"
-for i, line in enumerate(lines):
-    if 'const [designServiceMode, setDesignServic    if 'const [designse);' in line:
-        # Replace this line and keep the comment above it
-        lines[i] = '  const [internalDesignServiceMode, setInternalDesignServiceMode] = useState(false);\n'
-        # Insert two new lines after
-        lines.insert(i+1, '  const designServiceMode = externalDesignServiceMode !== undefined ? externalDesignServiceMode : internalDesignServiceMode;\n')
-        lines.insert(i+2, '  const setDesignServiceMode = onDesignServiceModeChange || setInternalDesignServiceMode;\n')
-        break
-
-# Write the file
-with open('src/components/design/BannerEditorLayout.tsx', 'w') as f:
-    f.writelines(lines)
+import sys
+
+from patchkit.buffer import EditBuffer
+
+file_path = 'src/components/design/BannerEditorLayout.tsx'
+
+# Read the file. Every line number below refers to the original file, so
+# earlier insertions never shift later ones.
+with open(file_path, 'r') as f:
+    buffer = EditBuffer(f.read())
+
+missing = []
+
+
+def find_line(description, needle, start_line=0):
+    """Original line index of ``needle``, or None (recorded in ``missing``)."""
+    try:
+        return buffer.find_line(needle, start_line)
+    except ValueError:
+        missing.append(description)
+        return None
+
+
+# Change 1: Add two props to the interface, after its onOpenAIModal member
+interface = find_line('interface props', 'interface BannerEditorLayoutProps {')
+member = None if interface is None else find_line('interface props', '  onOpenAIModal?: () => void;', interface)
+if member is not None:
+    buffer.insert_line(member + 1, '  designServiceMode?: boolean;')
+    buffer.insert_line(member + 1, '  onDesignServiceModeChange?: (mode: boolean) => void;')
+
+# Change 2: Update component signature
+signature = find_line('component signature', 'const BannerEditorLayout: React.FC<BannerEditorLayoutProps> = ({ onOpenAIModal }) => {')
+if signature is not None:
+    buffer.replace_line(signature, 'const BannerEditorLayout: React.FC<BannerEditorLayoutProps> = ({ onOpenAIModal, designServiceMode: externalDesignServiceMode, onDesignServiceModeChange }) => {')
+
+# Change 3: Replace state management line, keeping the comment above it
+state = find_line('state management', 'const [designServiceMode, setDesignServiceMode] = useState(false);')
+if state is not None:
+    buffer.replace_line(state, (
+        '  const [internalDesignServiceMode, setInternalDesignServiceMode] = useState(false);\n'
+        '  const designServiceMode = externalDesignServiceMode !== undefined ? externalDesignServiceMode : internalDesignServiceMode;\n'
+        '  const setDesignServiceMode = onDesignServiceModeChange || setInternalDesignServiceMode;'
+    ))
+
+# Nothing is written unless every change found its anchor
+if missing:
+    print(f"⚠️  {len(missing)} of 3 changes did not match, nothing written:")
+    for description in missing:
+        print(f"   - {description}")
+    sys.exit(1)
+
+with open(file_path, 'w') as f:
+    f.write(buffer.render())
 
 print("✅ All changes applied successfully!")
@@ -1,49 +1,24 @@
 #!/usr/bin/env python3
+"""
+Show a PDF rendering spinner in PreviewCanvas instead of the PDF preview overlay
 
-import re
-
-# Read the file
-with open('src/components/design/PreviewCanvas.tsx', 'r') as f:
-    content = f.read()
-
-# 1. Add isRenderingPdf to interface
-content = content.replace(
-    'isUploading?: boolean;\n}',
-    'isUploading?: boolean;\n  isRenderingPdf?: boolean;\n}'
-)
-
-# 2. Add isRenderingPdf parameter
-content = content.replace(
-    'isUploading = false,}) => {',
-    'isUploading = false,\n  isRenderingPdf = false,}) => {'
-)
-
-# 3. Add PDF rendering spinner after existing spinner
-spinner_code = '''        {/* PDF Rendering Spinner Overlay */}
-        {isRenderingPdf && (
-          <div className="absolute inset-0 bg-white/80 backdrop-blur-sm flex items-center justify-center z-50 rounded-2xl">
-            <div className="flex flex-col items-center gap-3">
-              <Loader2 className="h-8 w-8 text-purple-600 animate-spin" />
-              <p className="text-sm font-medium text-purple-700">Rendering PDF...</p>
-            </div>
-          </div>
-        )}'''
-
-content = content.replace(
-    '              <p className="text-sm font-medium text-blue-700">Processing file...</p>\n            </div>\n          </div>\n        )}',
-    '              <p className="text-sm font-medium text-blue-700">Processing file...</p>\n            </div>\n          </div>\n        )}\n' + spinner_code
-)
-
-# 4. Remove PDF overlay section
-pdf_overlay_pattern = r'\s*{/\* PDF Preview Overlay \*/}.*?}\s*\)\s*}\s*</div>'
-content = re.sub(pdf_overlay_pattern, '', content, flags=re.DOTALL)
-
-# 5. Update image rendering conditions
-content = content.replace('imageUrl && !file?.isPdf &&', 'imageUrl &&')
-content = content.replace('!imageUrl && !file?.isPdf &&', '!imageUrl &&')
-
-# Write the file back
-with open('src/components/design/PreviewCanvas.tsx', 'w') as f:
-    f.write(content)
-
-print("PreviewCanvas.tsx updated successfully")
+The edits are the ``fix_preview_canvas`` group of the patch registry
+(``patchkit/patches.py``); running this script is
+``python -m patchkit fix_preview_canvas`` and takes the same options.
+"""
+
+import sys
+
+from patchkit.cli import main
+from patchkit.registry import patch_text
+
+GROUP = 'fix_preview_canvas'
+
+
+def patch_preview_canvas(content):
+    """Return PreviewCanvas.tsx source with the PDF rendering spinner instead of the overlay"""
+    return patch_text(content, [GROUP]).text
+
+
+if __name__ == '__main__':
+    sys.exit(main([GROUP, *sys.argv[1:]]))
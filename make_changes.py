@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 
-file_path = 'src/components/design/BannerEditorLayout.tsx'
+import sys
+
+from patchkit import patch_file
 
-# Read the file
-with open(file_path, 'r') as f:
-    content = f.read()
+file_path = 'src/components/design/BannerEditorLayout.tsx'
 
 # Change 1: Update interface
 old_interface = '''interface BannerEditorLayoutProps {
@@ -17,8 +17,6 @@ new_interface = '''interface BannerEditorLayoutProps {
   onDesignServiceModeChange?: (mode: boolean) => void;
 }'''
 
-content = content.replace(old_interface, new_interface)
-
 # Change 2: Update component signature
 old_sig = 'const BannerEditorLayout: React.FC<BannerEditorLayoutProps> = ({ onOpenAIModal }) => {'
 
@@ -28,8 +26,6 @@ new_sig = '''const BannerEditorLayout: React.FC<BannerEditorLayoutProps> = ({
   onDesignServiceModeChange
 }) => {'''
 
-content = content.replace(old_sig, new_sig)
-
 # Change 3: Update state management
 old_state = '''  // Design Service mode state
   const [designServiceMode, setDe  const [designServiceMode, salse);'''
@@ -38,10 +34,18 @@ new_state = '''  // Design Service mode state - use external state if provided,
   const [inter  const [inter  const setInternalDesignServiceMode] =  const [inter  const [inter  const setInternalDeernalD  const [inter  const [intered ? externalDesignServiceMode : internalDesignServiceMode;
   c  c  c  c  c  c  c  c  c  c onDesignServiceModeChange || setInternalDesignServiceMode;'''
 
-content = content.replace(old_state, new_state)
-
-# Write the file
-with open(file_path, 'w') as f:
-    f.write(content)
+# Apply all three changes in a single pass over the file; nothing is
+# written unless every change found its anchor
+result = patch_file(file_path, [
+    (old_interface, new_interface),
+    (old_sig, new_sig),
+    (old_state, new_state),
+], strict=True)
+
+if result.missing:
+    print(f"⚠️  {len(result.missing)} of 3 changes did not match, nothing written:")
+    for anchor in result.missing:
+        print(f"   - {anchor.splitlines()[0].strip()}")
+    sys.exit(1)
 
 print("✅ All 3 changes made successfully!")
@@ -0,0 +1,52 @@
+"""
+Shared helpers for the one-off source patch scripts in the repo root.
+
+Names are imported on first use so that ``python -m patchkit --list`` does
+not pay for the engine, the JSX and TSX scanners or ``re`` compilation.
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    'BlockEdit': 'jsx',
+    'Edit': 'engine',
+    'EditConflict': 'conflicts',
+    'EditBuffer': 'buffer',
+    'Guard': 'guards',
+    'JsxIndex': 'jsx',
+    'JsxNode': 'jsx',
+    'JsxScanError': 'jsx',
+    'NodeEdit': 'tsx',
+    'NodeTable': 'tsx',
+    'PatchDef': 'registry',
+    'PatchResult': 'engine',
+    'PatchSet': 'patchset',
+    'PatternTimeout': 'patterns',
+    'RegexEdit': 'patterns',
+    'SafePattern': 'patterns',
+    'apply_edits': 'engine',
+    'apply_patch': 'patchset',
+    'compile_pattern': 'patterns',
+    'find_matches': 'engine',
+    'parse_tsx': 'tsx',
+    'patch_file': 'engine',
+    'replace_block': 'jsx',
+    'replace_blocks': 'jsx',
+    'scan_jsx': 'jsx',
+    'stream_file': 'stream',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
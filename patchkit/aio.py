@@ -0,0 +1,295 @@
+"""
+Concurrent file I/O for sweeps over many files.
+
+``run`` hands each file to a worker process that reads, patches and writes
+it, one blocking call after another. That suits a few large components, but
+a sweep such as the QuickQuote colour changes of ``fix-quickquote-*.sh``, or
+a codemod over every ``netlify/functions/*.mjs``, is hundreds of small files
+whose time goes on waiting for each ``open``/``read``/``write`` in turn.
+
+``sweep`` runs the same jobs from an asyncio event loop instead, in batches
+of up to ``BATCH_FILES`` files or ``BATCH_BYTES`` bytes. Reads, hashes,
+cache lookups and writes go to a thread pool of ``io_workers`` threads, so
+that many requests are in flight and the disk sees a deep queue rather than
+one file at a time. Only matching and splicing go to the process pool: each
+worker is given the edit lists once when it starts, keyed by patch id, and a
+batch then costs one round trip of its files' bytes. At most
+``max_pending`` batches are held in memory at once.
+
+Results are the ``FileSummary``s ``apply_file`` would return, so manifests,
+transactions, reports and dry-run diffs work unchanged.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .manifest import content_hash
+from .patchset import apply_patch
+from .patterns import PatternTimeout
+from .report import Profiler
+from .runner import FileSummary, _file_size, unmatched_error
+
+DEFAULT_IO_WORKERS = 16
+# Files are handed between the loop, the I/O threads and the workers in
+# batches, so a small file costs a share of one hand-off rather than three.
+BATCH_FILES = 32
+BATCH_BYTES = 1024 * 1024
+
+# Set in each worker process by ``_install``.
+_TABLES = {}
+_PROFILE_DIR = None
+
+
+def _install(tables, profile_dir):
+    global _TABLES, _PROFILE_DIR
+    _TABLES = tables
+    _PROFILE_DIR = profile_dir
+
+
+def _patch_in_worker(items):
+    return _patch_batch(_TABLES, _PROFILE_DIR, items)
+
+
+def _patch_batch(tables, profile_dir, items):
+    """
+    Apply edit list ``pid`` to ``raw`` for each ``(pid, path, raw)``.
+
+    Returns ``(counts, stats, output or None, error, seconds)`` per item;
+    ``output`` is ``None`` when nothing changed.
+    """
+    timer = time.perf_counter
+    results = []
+    for pid, path, raw in items:
+        started = timer()
+        edits, origins = tables[pid]
+        stats = []
+        try:
+            with Profiler(profile_dir, path):
+                result = apply_patch(raw.decode('utf-8'), edits, stats, origins)
+        except (ValueError, PatternTimeout, RecursionError) as e:
+            results.append((None, stats, None, str(e), timer() - started))
+            continue
+        output = result.text.encode('utf-8') if result.changed else None
+        results.append((result.counts, stats, output, None, timer() - started))
+    return results
+
+
+class _File:
+    """One file's progress through a sweep."""
+
+    __slots__ = (
+        'index', 'path', 'full_path', 'pid', 'raw', 'pre_hash', 'stat', 'hit', 'error',
+        'counts', 'stats', 'output', 'read_seconds', 'patch_seconds',
+    )
+
+    def __init__(self, index, root, path, pid):
+        self.index = index
+        self.path = path
+        self.full_path = os.path.join(root, path)
+        self.pid = pid
+        self.raw = None
+        self.pre_hash = None
+        self.stat = None
+        self.hit = None
+        self.error = None
+        self.counts = None
+        self.stats = []
+        self.output = None
+        self.read_seconds = None
+        self.patch_seconds = None
+
+
+def _load(files, cache):
+    # I/O thread: read, stat and hash each file and look it up in the cache.
+    timer = time.perf_counter
+    for file in files:
+        started = timer()
+        try:
+            with open(file.full_path, 'rb') as f:
+                file.raw = f.read()
+                file.stat = os.fstat(f.fileno())
+        except OSError as e:
+            file.error = str(e)
+            continue
+        file.pre_hash = content_hash(file.raw)
+        if cache is not None:
+            file.hit = cache.get(file.raw, file.pre_hash, file.pid)
+        file.read_seconds = timer() - started
+
+
+def _store(files, cache, write):
+    # I/O thread: fill the cache, write what changed and build the summaries.
+    return [_finish(file, cache, write) for file in files]
+
+
+def _finish(file, cache, write):
+    timer = time.perf_counter
+    if file.error is None:
+        started = timer()
+        changed = file.output is not file.raw
+        post_hash = content_hash(file.output) if changed else file.pre_hash
+        cache_state = 'hit' if file.hit is not None else None
+        if file.hit is None and cache is not None:
+            stored = cache.put(file.raw, file.pre_hash, file.pid, file.output, post_hash, file.counts, file.stats)
+            cache_state = 'stored' if stored else 'miss'
+        file.error = unmatched_error(file.counts)
+        try:
+            if changed and write and file.error is None:
+                with open(file.full_path, 'wb') as f:
+                    f.write(file.output)
+                file.stat = os.stat(file.full_path)
+        except OSError as e:
+            file.error = str(e)
+        write_seconds = timer() - started
+    seconds = (file.read_seconds or 0.0) + (file.patch_seconds or 0.0)
+    if file.error is not None:
+        summary = FileSummary(file.path, seconds=seconds, error=file.error)
+        summary.edits = file.stats
+        summary.read_seconds = file.read_seconds
+        summary.patch_seconds = file.patch_seconds
+        return summary
+
+    summary = FileSummary(file.path, file.counts, changed, seconds + write_seconds, len(file.raw))
+    summary.edits = file.stats
+    summary.read_seconds = file.read_seconds
+    summary.patch_seconds = file.patch_seconds
+    summary.write_seconds = write_seconds
+    summary.pre_hash = file.pre_hash
+    summary.post_hash = post_hash
+    summary.stat = file.stat
+    summary.cache = cache_state
+    if changed and not write:
+        summary.original = file.raw
+        summary.output = file.output
+    return summary
+
+
+def _batches(files, sizes, batch_files=BATCH_FILES, batch_bytes=BATCH_BYTES):
+    batch = []
+    total = 0
+    for file, size in zip(files, sizes):
+        if batch and (len(batch) >= batch_files or total + size > batch_bytes):
+            yield batch
+            batch = []
+            total = 0
+        batch.append(file)
+        total += size
+    if batch:
+        yield batch
+
+
+class FileIO:
+    """Blocking file calls made awaitable on a bounded thread pool."""
+
+    def __init__(self, workers=DEFAULT_IO_WORKERS):
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='patchkit-io')
+
+    def call(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    def close(self):
+        self._pool.shutdown()
+
+
+class _Sweep:
+    """State shared by the per-batch coroutines of one ``sweep``."""
+
+    def __init__(self, io, patch, write, cache, max_pending):
+        self.io = io
+        self.patch = patch
+        self.write = write
+        self.cache = cache
+        self.pending = asyncio.Semaphore(max_pending)
+
+    async def batch(self, files):
+        async with self.pending:
+            await self.io.call(_load, files, self.cache)
+            todo = [file for file in files if file.error is None and file.hit is None]
+            if todo:
+                results = await self.patch([(file.pid, file.path, file.raw) for file in todo])
+                for file, (counts, stats, output, error, seconds) in zip(todo, results):
+                    file.counts, file.stats, file.error, file.patch_seconds = counts, stats, error, seconds
+                    file.output = file.raw if output is None else output
+            for file in files:
+                if file.hit is not None:
+                    file.counts, file.stats = file.hit.counts, file.hit.edits
+                    file.output = file.raw if file.hit.output == file.raw else file.hit.output
+                    file.patch_seconds = 0.0
+            return await self.io.call(_store, files, self.cache, self.write)
+
+
+async def sweep_async(
+    jobs, root, origins, workers=None, io_workers=DEFAULT_IO_WORKERS, profile_dir=None, write=True, cache=None,
+    stream_bytes=None, max_pending=None,
+):
+    """Coroutine form of ``sweep``."""
+    from .stream import DEFAULT_WINDOW, stream_file, streamable
+
+    # A glob sweep gives every file the same edit list, hence the same patch
+    # id, so the tables the workers receive stay small.
+    tables = {}
+    for path, edits, pid in jobs:
+        tables.setdefault(pid, (edits, origins[path]))
+    if max_pending is None:
+        max_pending = io_workers * 2
+    io = FileIO(io_workers)
+    pool = None
+    loop = asyncio.get_running_loop()
+    try:
+        # With one CPU a process pool only adds pickling.
+        if workers == 1 or (workers is None and (os.cpu_count() or 1) == 1):
+            async def patch(items):
+                return _patch_batch(tables, profile_dir, items)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_install, initargs=(tables, profile_dir))
+
+            def patch(items):
+                return loop.run_in_executor(pool, _patch_in_worker, items)
+
+        files = []
+        sizes = []
+        streamed = []
+        for index, (path, edits, pid) in enumerate(jobs):
+            size = _file_size(root, path)
+            if stream_bytes is not None and size >= max(stream_bytes, 1) and streamable(edits):
+                # Rare and large: the whole job goes to one worker, as in ``run``.
+                streamed.append((index, loop.run_in_executor(
+                    pool, stream_file, root, path, edits, origins[path], write, DEFAULT_WINDOW, True,
+                )))
+            else:
+                files.append(_File(index, root, path, pid))
+                sizes.append(size)
+        state = _Sweep(io, patch, write, cache, max_pending)
+        done = await asyncio.gather(*(state.batch(batch) for batch in _batches(files, sizes)))
+        summaries = [None] * len(jobs)
+        for batch, batch_summaries in zip(_batches(files, sizes), done):
+            for file, summary in zip(batch, batch_summaries):
+                summaries[file.index] = summary
+        for index, future in streamed:
+            summaries[index] = await future
+        return summaries
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        io.close()
+
+
+def sweep(
+    jobs, root, origins, workers=None, io_workers=DEFAULT_IO_WORKERS, profile_dir=None, write=True, cache=None,
+    stream_bytes=None, max_pending=None,
+):
+    """
+    Patch ``jobs`` (``(path, edits, patch id)`` triples) with concurrent I/O; one ``FileSummary`` per job, in order.
+
+    ``origins`` is ``group_origins`` output. With ``workers=1`` (or a single
+    CPU) matching runs on the event loop's thread instead of a process pool;
+    I/O stays concurrent either way.
+    At most ``max_pending`` batches (default: twice ``io_workers``) are in
+    memory at once.
+    """
+    return asyncio.run(sweep_async(
+        jobs, root, origins, workers, io_workers, profile_dir, write, cache, stream_bytes, max_pending,
+    ))
@@ -0,0 +1,494 @@
+"""
+Benchmark the patch scripts' core functions on synthetic large TSX inputs.
+
+Usage:
+    python -m patchkit.bench [--scales 1,10,100] [--repeat 5] [--output FILE]
+    python -m patchkit.bench --record [BASELINE]
+    python -m patchkit.bench --check [BASELINE] [--max-slowdown 2.0] [--max-memory 1.25]
+
+Fixtures are generated at multiples of the size of the real component each
+script targets (``Checkout.tsx``, ``OrderConfirmation.tsx``, ...). They
+contain the anchors the script looks for, surrounded by filler components
+with deeply nested ``<div>`` trees, long props, strings, template literals
+and JSX text, so the scanners see realistic input. Each function runs
+in-process; the median time, throughput and tracemalloc peak are printed and
+written as JSON so runs can be compared across changes.
+
+``--check`` is the regression gate. It runs the targets on pinned fixtures
+(generated at fixed sizes rather than from the current components, and
+verified against the hashes in the baseline) and fails if any median is
+more than ``--max-slowdown`` times, or any peak more than ``--max-memory``
+times, the committed baseline in ``tests/bench/``. Timings are only
+comparable on similar hardware, so record the baseline where the gate runs
+(``--record``), which is also how it is updated after an intentional change.
+The gate's fixtures start at ten times the reference size: below that, run
+to run noise is of the order of the limit.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from importlib import import_module
+
+from .paths import REPO_ROOT
+from .tsx import TableCache, use_tables
+
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_REPEAT = 5
+DEFAULT_OUTPUT_DIR = os.path.join(REPO_ROOT, '.patchkit', 'bench')
+NESTING_DEPTH = 12
+# Used when the reference component is not present in the tree, and for
+# the gate's pinned fixtures.
+FALLBACK_REFERENCE_BYTES = 60_000
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, 'tests', 'bench', 'patchkit-baseline.json')
+GATE_SCALES = (10, 30)
+GATE_REPEAT = 9
+DEFAULT_MAX_SLOWDOWN = 2.0
+DEFAULT_MAX_MEMORY = 1.25
+
+CHECKOUT_IMPORT = "import { usd, formatDimensions, getFeatureFlags, getPricingOptions, computeTotals, PricingItem } from '@/lib/pricing';"
+ORDER_DETAILS_IMPORT = "import { usd, formatDimensions, calculatePolePocketCostFromOrder, calculateUnitPriceFromOrder } from '@/lib/pricing';"
+
+CHECKOUT_SECTION = '''
+const CheckoutItemCard: React.FC<{ item: PricingItem }> = ({ item }) => {
+  return (
+    <div className="border border-gray-200 rounded-lg p-4">
+      <div className="flex justify-between">
+        <span className="font-medium">{formatDimensions(item.width_in, item.height_in)}</span>
+        <span>{usd(item.line_total_cents / 100)}</span>
+      </div>
+      {/* Cost Breakdown */}
+      <div className="mt-3 bg-gray-50 rounded-md p-3">
+        <h4 className="text-sm font-medium text-gray-900 mb-2">Price Breakdown</h4>
+        <div className="space-y-1 text-sm">
+          <div className="flex justify-between">
+            <span className="text-gray-600">Base banner:</span>
+            <span>{usd(item.unit_price_cents / 100)} × {item.quantity}</span>
+          </div>
+          {item.grommets !== 'none' && (
+            <div className="flex justify-between">
+              <span className="text-gray-600">Grommets ({item.grommets}):</span>
+              <span>Included</span>
+            </div>
+          )}
+        </div>
+      </div>
+    </div>
+  );
+};
+'''
+
+EMAIL_SECTION = '''
+const EmailItem = ({ item, hasBreakdown, itemQty }: EmailItemProps) => (
+  <Section style={itemSection}>
+    <div style={itemDetails}>
+      <Text style={itemName}>{item.width_in}" × {item.height_in}" banner</Text>
+      {/* Cost Breakdown - only show if we have the data */}
+      {hasBreakdown && (
+        <div style={costBreakdown}>
+          <Text style={breakdownTitle}>Price Breakdown</Text>
+          <div style={breakdownRow}>
+            <Text style={breakdownLabel}>{item.product_type === 'yard_sign' ? 'Signs:' : 'Base banner:'}</Text>
+            <Text style={breakdownValue}>${(item.unitPriceCents / 100).toFixed(2)} × {itemQty}</Text>
+          </div>
+          {item.ropeFeet > 0 && (
+            <div style={breakdownRow}>
+              <Text style={breakdownLabel}>Rope ({item.ropeFeet.toFixed(1)}ft):</Text>
+              <Text style={breakdownValue}>${(item.ropeCostCents / 100).toFixed(2)}</Text>
+            </div>
+          )}
+        </div>
+      )}
+    </div>
+  </Section>
+);
+'''
+
+ORDER_DETAILS_SECTION = '''
+const OrderItemsPanel: React.FC<{ order: Order }> = ({ order }) => {
+  return (
+    <div className="space-y-4">
+      {order.items.map((item, index) => (
+        <div key={index} className="border rounded-lg p-4">
+          {/* Cost Breakdown */}
+          <div className="mt-2 text-sm">
+            <h5 className="font-medium text-gray-900 mb-1">Price Breakdown</h5>
+            <div className="flex justify-between">
+              <span>Base:</span>
+              <span>{usd(calculateUnitPriceFromOrder(item) / 100)}</span>
+            </div>
+            <div className="flex justify-between">
+              <span>Pole pockets:</span>
+              <span>{usd(calculatePolePocketCostFromOrder(item) / 100)}</span>
+            </div>
+          </div>
+        </div>
+      ))}
+      <div className="border-t pt-4 space-y-2">
+        {(() => {
+          // Calculate correct subtotal and tax from line totals
+          const subtotal = order.items.reduce((sum, i) => sum + i.line_total_cents, 0);
+          const tax = Math.round(subtotal * 0.06);
+          return (
+            <div className="flex justify-between">
+              <span>Total</span>
+              <span>{usd((subtotal + tax) / 100)}</span>
+            </div>
+          );
+        })()}
+      </div>
+    </div>
+  );
+};
+'''
+
+PREVIEW_CANVAS_SECTION = '''
+interface PreviewCanvasProps {
+  imageUrl?: string;
+  file?: UploadedFile;
+  isUploading?: boolean;
+}
+
+const PreviewCanvas: React.FC<PreviewCanvasProps> = ({
+  imageUrl,
+  file,
+  isUploading = false,}) => {
+  return (
+    <div className="relative">
+      <div className="canvas-wrapper">
+        {isUploading && (
+          <div className="absolute inset-0 bg-white/80 flex items-center justify-center z-50 rounded-2xl">
+            <div className="flex flex-col items-center gap-3">
+              <Loader2 className="h-8 w-8 text-blue-600 animate-spin" />
+              <p className="text-sm font-medium text-blue-700">Processing file...</p>
+            </div>
+          </div>
+        )}
+        {imageUrl && !file?.isPdf && (
+          <img src={imageUrl} alt="Banner preview" className="w-full h-full object-contain" />
+        )}
+        {!imageUrl && !file?.isPdf && (
+          <div className="text-gray-400">No image yet</div>
+        )}
+        {/* PDF Preview Overlay */}
+        {file?.isPdf && renderPdfOverlay({ file, pageCount: file.pageCount })}
+      </div>
+    </div>
+  );
+};
+'''
+
+# name: (reference component, header lines, section with the script's anchors)
+FIXTURES = {
+    'checkout': ('src/pages/Checkout.tsx', [CHECKOUT_IMPORT], CHECKOUT_SECTION),
+    'email': (
+        'src/emails/OrderConfirmation.tsx',
+        ['import {', '  Section,', '  Text,', "} from '@react-email/components';"],
+        EMAIL_SECTION,
+    ),
+    'order_details': ('src/components/orders/OrderDetails.tsx', [ORDER_DETAILS_IMPORT], ORDER_DETAILS_SECTION),
+    'preview_canvas': ('src/components/design/PreviewCanvas.tsx', [], PREVIEW_CANVAS_SECTION),
+}
+
+# (module:function, fixture)
+TARGETS = (
+    ('update_checkout_and_email:patch_checkout', 'checkout'),
+    ('update_checkout_and_email:patch_email', 'email'),
+    ('update_pricing_files:patch_order_details', 'order_details'),
+    ('fix_preview_canvas:patch_preview_canvas', 'preview_canvas'),
+)
+
+
+def _filler_component(i, depth=NESTING_DEPTH):
+    """One realistic component: nested div tree, long props, strings and JSX text."""
+    classes = ' '.join(
+        f'{prefix}-{(i + n) % 9 + 1}'
+        for n, prefix in enumerate(('p', 'm', 'gap', 'px', 'py', 'mt', 'mb', 'rounded', 'shadow', 'space-y'))
+    )
+    opening = []
+    closing = []
+    for level in range(depth):
+        indent = '      ' + '  ' * level
+        opening.append(
+            f'{indent}<div className="{classes} level-{level} flex items-center justify-between '
+            f'hover:bg-gray-50 transition-colors duration-150" data-depth={{{level}}} '
+            f'onClick={{() => onSelect(item.id, {level})}} style={{{{ zIndex: {level}, opacity: isActive ? 1 : 0.8 }}}}>'
+        )
+        closing.append(f'{indent}</div>')
+    indent = '      ' + '  ' * depth
+    body = [
+        f'{indent}<span className="font-medium">{{item.label ?? "Section {i}"}}</span>',
+        f"{indent}<p>Don't worry, we'll reprint it if it's wrong.</p>",
+        f'{indent}{{open && count > 0 && <Badge variant="secondary">{{`${{count}} items`}}</Badge>}}',
+        f'{indent}<input value={{value}} onChange={{(e) => setValue(e.target.value)}} disabled={{count >= 10}} />',
+    ]
+    return '\n'.join([
+        '',
+        f'interface Section{i}Props {{',
+        '  item: { id: string; label?: string };',
+        '  onSelect: (id: string, level: number) => void;',
+        '  isActive?: boolean;',
+        '}',
+        '',
+        f'const Section{i}: React.FC<Section{i}Props> = ({{ item, onSelect, isActive }}) => {{',
+        '  const [open, setOpen] = useState(false);',
+        "  const [value, setValue] = useState('');",
+        '  const count = value.split(/[,;]/).filter(Boolean).length;',
+        "  const label = '</div> inside a string must not close anything';",
+        '  return (',
+        *opening,
+        *body,
+        *reversed(closing),
+        '  );',
+        '};',
+        '',
+    ])
+
+
+def build_fixture(name, scale, root=REPO_ROOT, reference_bytes=None):
+    """
+    Synthetic source for fixture ``name`` at ``scale`` times the reference size.
+
+    The reference size is that of the real component, unless
+    ``reference_bytes`` pins it.
+    """
+    reference, header, section = FIXTURES[name]
+    if reference_bytes is not None:
+        target = reference_bytes * scale
+    else:
+        try:
+            target = os.path.getsize(os.path.join(root, reference)) * scale
+        except OSError:
+            target = FALLBACK_REFERENCE_BYTES * scale
+
+    lines = ["import React, { useState } from 'react';", *header, '']
+    size = sum(len(line) + 1 for line in lines) + len(section)
+    before = []
+    after = []
+    i = 0
+    while size < target:
+        component = _filler_component(i)
+        # Put the anchors in the middle so every scan crosses filler on both sides.
+        (before if i % 2 == 0 else after).append(component)
+        size += len(component) + 1
+        i += 1
+    return '\n'.join(lines + before + [section] + after) + '\n'
+
+
+def _resolve(target):
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    module_name, function_name = target.split(':')
+    return getattr(import_module(module_name), function_name)
+
+
+def measure(function, content, repeat=DEFAULT_REPEAT):
+    """
+    Median/min wall time over ``repeat`` runs plus the tracemalloc peak of one run.
+
+    Every run gets an empty in-memory TSX table cache, so structural edits
+    parse each time instead of measuring a cache hit after the first run.
+    """
+    previous = use_tables(None)
+    try:
+        timings = []
+        for _ in range(repeat):
+            use_tables(TableCache(directory=None))
+            started = time.perf_counter()
+            function(content)
+            timings.append(time.perf_counter() - started)
+
+        use_tables(TableCache(directory=None))
+        tracemalloc.start()
+        try:
+            function(content)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    finally:
+        use_tables(previous)
+    return statistics.median(timings), min(timings), peak
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, repeat=DEFAULT_REPEAT, targets=TARGETS, reference_bytes=None):
+    results = []
+    for target, fixture in targets:
+        function = _resolve(target)
+        for scale in scales:
+            content = build_fixture(fixture, scale, reference_bytes=reference_bytes)
+            encoded = content.encode('utf-8')
+            size = len(encoded)
+            median, fastest, peak = measure(function, content, repeat)
+            results.append({
+                'target': target,
+                'fixture': fixture,
+                'scale': scale,
+                'bytes': size,
+                'lines': content.count('\n'),
+                'runs': repeat,
+                'median_s': median,
+                'min_s': fastest,
+                'mb_per_s': size / median / 1e6 if median else None,
+                'peak_bytes': peak,
+                'sha256': hashlib.sha256(encoded).hexdigest(),
+            })
+    return results
+
+
+def _key(result):
+    return result['target'], result['scale']
+
+
+def compare(baseline, results, max_slowdown=DEFAULT_MAX_SLOWDOWN, max_memory=DEFAULT_MAX_MEMORY):
+    """
+    Compare ``results`` to a recorded baseline.
+
+    Returns one row per baseline result: ``(result, base, time ratio,
+    memory ratio, problem or None)``.
+    """
+    current = {_key(result): result for result in results}
+    rows = []
+    for base in baseline['results']:
+        result = current.get(_key(base))
+        if result is None:
+            rows.append((None, base, None, None, 'not run'))
+            continue
+        if result['sha256'] != base['sha256']:
+            rows.append((result, base, None, None, 'fixture changed; re-record the baseline'))
+            continue
+        slowdown = result['median_s'] / base['median_s'] if base['median_s'] else 1.0
+        growth = result['peak_bytes'] / base['peak_bytes'] if base['peak_bytes'] else 1.0
+        problem = None
+        if slowdown > max_slowdown:
+            problem = f'{slowdown:.2f}x slower (limit {max_slowdown:g}x)'
+        elif growth > max_memory:
+            problem = f'{growth:.2f}x peak memory (limit {max_memory:g}x)'
+        rows.append((result, base, slowdown, growth, problem))
+    return rows
+
+
+def print_comparison(rows, out=sys.stdout):
+    print(f'{"target":<45} {"scale":>5} {"median":>10} {"base":>10} {"time":>7} {"peak":>9} {"mem":>7}', file=out)
+    for result, base, slowdown, growth, problem in rows:
+        mark = '❌' if problem else '✅'
+        if slowdown is None:
+            print(f'{mark} {base["target"]:<43} {base["scale"]:>4}x  {problem}', file=out)
+            continue
+        line = (
+            f'{mark} {base["target"]:<43} {base["scale"]:>4}x {result["median_s"] * 1000:>8.2f}ms '
+            f'{base["median_s"] * 1000:>8.2f}ms {slowdown:>6.2f}x {result["peak_bytes"] / 1e6:>7.2f}MB {growth:>6.2f}x'
+        )
+        if problem:
+            line += f'  {problem}'
+        print(line, file=out)
+
+
+def _write_json(path, results, **extra):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            **extra,
+            'results': results,
+        }, f, indent=2)
+        f.write('\n')
+
+
+def check(baseline_path, repeat=GATE_REPEAT, max_slowdown=DEFAULT_MAX_SLOWDOWN, max_memory=DEFAULT_MAX_MEMORY):
+    """Run the gate against ``baseline_path``; 0 if nothing regressed, 1 otherwise."""
+    try:
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f'❌ Cannot read baseline {baseline_path}: {e}', file=sys.stderr)
+        return 1
+    if baseline['python'].rsplit('.', 1)[0] != platform.python_version().rsplit('.', 1)[0]:
+        print(f'⚠️  Baseline was recorded on Python {baseline["python"]}, this is {platform.python_version()}')
+    if baseline['platform'] != platform.platform():
+        print(f'⚠️  Baseline was recorded on {baseline["platform"]}; timings may not be comparable')
+
+    scales = sorted({base['scale'] for base in baseline['results']})
+    targets = [(target, fixture) for target, fixture in TARGETS if any(
+        base['target'] == target for base in baseline['results']
+    )]
+    results = run_benchmarks(scales, repeat, targets, baseline['reference_bytes'])
+    rows = compare(baseline, results, max_slowdown, max_memory)
+    print_comparison(rows)
+
+    failed = sum(1 for row in rows if row[4])
+    if failed:
+        print(f'\n❌ {failed} of {len(rows)} benchmarks regressed against {baseline_path}')
+        return 1
+    print(f'\n✅ {len(rows)} benchmarks within {max_slowdown:g}x time and {max_memory:g}x memory of the baseline')
+    return 0
+
+
+def record(baseline_path, repeat=GATE_REPEAT, scales=GATE_SCALES):
+    """Rewrite the gate's baseline from a run on the pinned fixtures."""
+    results = run_benchmarks(scales, repeat, reference_bytes=FALLBACK_REFERENCE_BYTES)
+    print_table(results)
+    _write_json(baseline_path, results, reference_bytes=FALLBACK_REFERENCE_BYTES, repeat=repeat)
+    print(f'\n📄 Baseline written to {baseline_path}')
+    return 0
+
+
+def print_table(results, out=sys.stdout):
+    print(f'{"target":<45} {"scale":>5} {"size":>9} {"median":>10} {"MB/s":>8} {"peak":>9}', file=out)
+    for r in results:
+        print(
+            f'{r["target"]:<45} {r["scale"]:>4}x {r["bytes"] / 1e6:>7.2f}MB '
+            f'{r["median_s"] * 1000:>8.2f}ms {r["mb_per_s"] or 0:>8.1f} {r["peak_bytes"] / 1e6:>7.2f}MB',
+            file=out,
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark patch scripts on synthetic TSX fixtures.')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)), help='comma-separated size multiples')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='timed runs per measurement')
+    parser.add_argument('--output', help='JSON results file (default: .patchkit/bench/bench-<timestamp>.json)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        '--check', nargs='?', const=DEFAULT_BASELINE, metavar='BASELINE',
+        help='compare pinned-fixture runs to a baseline and exit 1 on a regression (default: tests/bench/)',
+    )
+    mode.add_argument(
+        '--record', nargs='?', const=DEFAULT_BASELINE, metavar='BASELINE',
+        help='write the baseline --check compares to',
+    )
+    parser.add_argument(
+        '--max-slowdown', type=float, default=DEFAULT_MAX_SLOWDOWN,
+        help=f'fail --check when a median exceeds this multiple of the baseline (default: {DEFAULT_MAX_SLOWDOWN})',
+    )
+    parser.add_argument(
+        '--max-memory', type=float, default=DEFAULT_MAX_MEMORY,
+        help=f'fail --check when a tracemalloc peak exceeds this multiple of the baseline (default: {DEFAULT_MAX_MEMORY})',
+    )
+    args = parser.parse_args(argv)
+
+    if args.check or args.record:
+        repeat = max(args.repeat, GATE_REPEAT)
+        if args.check:
+            return check(args.check, repeat, args.max_slowdown, args.max_memory)
+        return record(args.record, repeat)
+
+    scales = [int(scale) for scale in args.scales.split(',') if scale]
+    results = run_benchmarks(scales, args.repeat)
+    print_table(results)
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, time.strftime('bench-%Y%m%d-%H%M%S.json'))
+    _write_json(output, results)
+    print(f'\n📄 Results written to {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
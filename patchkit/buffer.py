@@ -0,0 +1,115 @@
+"""
+Piece-table edit buffer for line- and offset-based edits.
+
+``apply_changes.py`` used to ``readlines()`` and then ``lines.insert(...)``,
+which is O(n) per insert and shifts every later index ("now line 56 after
+insertions"). ``EditBuffer`` records inserts, deletes and replaces against
+offsets and line numbers of the *original* text, which never move, and
+materialises the result once in O(n + k) when ``render()`` is called.
+"""
+
+from bisect import bisect_right
+
+
+class EditBuffer:
+    """Edits recorded against the original text, applied in one pass."""
+
+    def __init__(self, text):
+        self.original = text
+        # (start, end, text, seq); seq keeps inserts at the same offset in call order.
+        self._edits = []
+        self._line_starts = None
+
+    # -- anchors -----------------------------------------------------------
+
+    def line_start(self, index):
+        """Offset of original line ``index`` (0-based); ``len(lines)`` is end of text."""
+        if self._line_starts is None:
+            starts = [0]
+            find = self.original.find
+            pos = find('\n')
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = find('\n', pos + 1)
+            if starts[-1] == len(self.original):
+                starts.pop()
+            self._line_starts = starts
+        starts = self._line_starts
+        if index == len(starts):
+            return len(self.original)
+        if not 0 <= index < len(starts):
+            raise IndexError(f'line {index} is outside the original text')
+        return starts[index]
+
+    def line_of(self, offset):
+        """Original line index containing ``offset``."""
+        self.line_start(0)
+        return bisect_right(self._line_starts, offset) - 1
+
+    def find(self, needle, start=0):
+        """Offset of ``needle`` in the original text; raises ``ValueError`` if missing."""
+        offset = self.original.find(needle, start)
+        if offset == -1:
+            raise ValueError(f'Anchor not found: {needle[:60]!r}')
+        return offset
+
+    def find_line(self, needle, start_line=0):
+        """Index of the first original line containing ``needle``."""
+        return self.line_of(self.find(needle, self.line_start(start_line)))
+
+    # -- edits -------------------------------------------------------------
+
+    def replace(self, start, end, text):
+        if not 0 <= start <= end <= len(self.original):
+            raise IndexError(f'range {start}:{end} is outside the original text')
+        self._edits.append((start, end, text, len(self._edits)))
+        return self
+
+    def insert(self, offset, text):
+        return self.replace(offset, offset, text)
+
+    def delete(self, start, end):
+        return self.replace(start, end, '')
+
+    def insert_line(self, index, line):
+        """Insert ``line`` before original line ``index``; a newline is added if missing."""
+        if not line.endswith('\n'):
+            line += '\n'
+        offset = self.line_start(index)
+        if offset == len(self.original) and self.original and not self.original.endswith('\n'):
+            line = '\n' + line
+        return self.insert(offset, line)
+
+    def replace_line(self, index, line):
+        """Replace original line ``index`` (including its newline) with ``line``."""
+        if not line.endswith('\n'):
+            line += '\n'
+        return self.replace(self.line_start(index), self.line_start(index + 1), line)
+
+    def replace_text(self, anchor, text):
+        """Replace the first occurrence of ``anchor`` in the original text."""
+        start = self.find(anchor)
+        return self.replace(start, start + len(anchor), text)
+
+    # -- output ------------------------------------------------------------
+
+    def render(self):
+        """Build the edited text: one sort of the k edits plus one join over n chars."""
+        if not self._edits:
+            return self.original
+        # Pure inserts sort before a replace starting at the same offset, so
+        # the inserted text lands in front of it.
+        edits = sorted(self._edits, key=lambda e: (e[0], e[1] != e[0], e[3]))
+        pieces = []
+        cursor = 0
+        for start, end, text, _ in edits:
+            if start < cursor:
+                raise ValueError(f'Edit at offset {start} overlaps an earlier edit ending at {cursor}')
+            pieces.append(self.original[cursor:start])
+            pieces.append(text)
+            cursor = end
+        pieces.append(self.original[cursor:])
+        return ''.join(pieces)
+
+    def __len__(self):
+        return len(self._edits)
@@ -0,0 +1,234 @@
+"""
+Content-addressed cache of patch outputs.
+
+Rebuilding a branch replays the same fixes against file versions that have
+been patched before. ``PatchCache`` maps (sha256 of the input bytes, patch
+id, ``engine.MATCH_VERSION``) to the output, so a repeat costs one hash and
+one small read instead of the literal scan, the regexes and the JSX tag
+matching. A change to what the edits match bumps ``MATCH_VERSION``, so
+outputs of the old behaviour are never served.
+
+Entries are stored as a delta against the input: the lengths of the common
+prefix and suffix plus the bytes in between, which for a localised patch is
+a few hundred bytes. Each entry also keeps the per-edit counts so the run
+report looks the same on a hit, and the sha256 of the output, which is
+checked on every read. The cache is an LRU bounded by total size and entry
+count: reads touch an entry's mtime and ``prune()`` deletes the oldest
+entries first.
+
+Usage:
+    python -m patchkit.cache [--clear] [--max-mb N] [--max-entries N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from .engine import MATCH_VERSION
+from .manifest import content_hash
+from .report import EditStat
+from .paths import REPO_ROOT
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, '.patchkit', 'cache')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+def _common_prefix(a, b):
+    # Binary search over slice comparisons: O(n log n) byte compares in C
+    # instead of an O(n) loop in Python.
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b, limit):
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def make_delta(original, output):
+    """``(prefix, suffix, middle)`` such that ``apply_delta(original, ...) == output``."""
+    prefix = _common_prefix(original, output)
+    suffix = _common_suffix(original, output, min(len(original), len(output)) - prefix)
+    return prefix, suffix, output[prefix:len(output) - suffix]
+
+
+def apply_delta(original, prefix, suffix, middle):
+    return original[:prefix] + middle + original[len(original) - suffix:]
+
+
+class CacheHit:
+    """A cached patch result: the output bytes plus the counts and stats recorded with it."""
+
+    __slots__ = ('output', 'counts', 'edits')
+
+    def __init__(self, output, counts, edits):
+        self.output = output
+        self.counts = counts
+        self.edits = edits
+
+
+class PatchCache:
+    """
+    On-disk LRU of patch outputs, keyed by input hash, patch id and matching version.
+
+    Safe to share across processes. Entries written under another
+    ``MATCH_VERSION`` are never read again and age out through ``prune()``.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def _path(self, input_hash, pid):
+        return os.path.join(self.directory, input_hash[:2], f'{input_hash}-{pid}-m{MATCH_VERSION}')
+
+    def get(self, original, input_hash, pid):
+        """The cached result of patch ``pid`` on ``original``, or ``None``."""
+        path = self._path(input_hash, pid)
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                middle = f.read()
+        except (OSError, ValueError):
+            return None
+        if header.get('version') != CACHE_VERSION:
+            return None
+        output = apply_delta(original, header['prefix'], header['suffix'], middle)
+        if content_hash(output) != header['post']:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        edits = [EditStat(kind, label, matches, size_delta) for kind, label, matches, size_delta in header['edits']]
+        return CacheHit(output, header['counts'], edits)
+
+    def put(self, original, input_hash, pid, output, output_hash, counts, edits):
+        """Store the result of patch ``pid`` on ``original``; failures only cost a future miss."""
+        prefix, suffix, middle = make_delta(original, output)
+        header = {
+            'version': CACHE_VERSION,
+            'post': output_hash,
+            'prefix': prefix,
+            'suffix': suffix,
+            'counts': counts,
+            'edits': [[stat.kind, stat.label, stat.matches, stat.size_delta] for stat in edits],
+        }
+        path = self._path(input_hash, pid)
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.entry-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(header, separators=(',', ':')).encode('utf-8'))
+                f.write(b'\n')
+                f.write(middle)
+            os.replace(tmp_path, path)
+        except OSError:
+            return False
+        return True
+
+    def _entries(self):
+        entries = []
+        try:
+            shards = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for shard in shards:
+            shard_path = os.path.join(self.directory, shard)
+            if not os.path.isdir(shard_path):
+                continue
+            for name in os.listdir(shard_path):
+                path = os.path.join(shard_path, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def stats(self):
+        entries = self._entries()
+        return {'entries': len(entries), 'bytes': sum(size for _, size, _ in entries)}
+
+    def prune(self, max_bytes=None, max_entries=None):
+        """Delete least recently used entries until both limits hold; returns how many were evicted."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_entries = self.max_entries if max_entries is None else max_entries
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= max_bytes and len(entries) - evicted <= max_entries:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        return evicted
+
+    def clear(self):
+        return self.prune(max_bytes=0, max_entries=0)
+
+
+class CacheCounters:
+    """Hit/miss/store/eviction counts for one run, for the report."""
+
+    __slots__ = ('hits', 'misses', 'stores', 'evictions')
+
+    def __init__(self):
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+    def count(self, summaries):
+        for summary in summaries:
+            if summary.cache == 'hit':
+                self.hits += 1
+            elif summary.cache in ('miss', 'stored'):
+                self.misses += 1
+                self.stores += summary.cache == 'stored'
+        return self
+
+    def to_dict(self):
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores, 'evictions': self.evictions}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect or prune the patch output cache.')
+    parser.add_argument('--dir', default=DEFAULT_CACHE_DIR, help='cache directory')
+    parser.add_argument('--clear', action='store_true', help='delete every entry')
+    parser.add_argument('--max-mb', type=float, default=None, help='evict LRU entries beyond this size')
+    parser.add_argument('--max-entries', type=int, default=None, help='evict LRU entries beyond this count')
+    args = parser.parse_args(argv)
+
+    cache = PatchCache(args.dir)
+    if args.clear:
+        print(f'🗑️  Evicted {cache.clear()} entries')
+    elif args.max_mb is not None or args.max_entries is not None:
+        max_bytes = None if args.max_mb is None else int(args.max_mb * 1024 * 1024)
+        print(f'🗑️  Evicted {cache.prune(max_bytes, args.max_entries)} entries')
+    stats = cache.stats()
+    print(f'📦 {stats["entries"]} entries, {stats["bytes"] / 1024:.1f} KiB in {args.dir}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
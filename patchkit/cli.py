@@ -0,0 +1,120 @@
+"""
+Command-line entry point for the patch registry.
+
+Usage:
+    python -m patchkit --list
+    python -m patchkit <id-or-group> [...] [--dry-run] [--workers N] [--report FILE]
+        [--profile DIR] [--stream-mb N | --no-stream] [--io-workers N]
+    python -m patchkit --all
+    python -m patchkit <id-or-group> [...] --locate
+    python -m patchkit <id-or-group> [...] --watch [--poll]
+
+Paths are resolved against the repo root (or ``--root``), never the
+current directory. Only the registry is imported up front; the engine, the
+regex layer and the process pool load once there is something to apply.
+"""
+
+import argparse
+import sys
+import time
+
+from .options import add_run_options
+from .report import short_label
+
+
+def print_patches(patches, out=sys.stdout):
+    for patch in patches:
+        guard = f'  [{patch.guard!r}]' if patch.guard is not None else ''
+        target = patch.target or '(located by anchor)'
+        print(f'{patch.id:<36} {",".join(patch.groups):<28} {target}{guard}', file=out)
+        if patch.description:
+            print(f'{"":36} {patch.description}', file=out)
+
+
+def print_locations(patches, index, out=sys.stdout):
+    """
+    Where each patch's anchors occur across the indexed tree.
+
+    Returns the number of anchors that are missing from the target or also
+    occur in another file, i.e. that could land somewhere unintended.
+    """
+    problems = 0
+    for patch in patches:
+        print(f'{patch.id}', file=out)
+        targets = None if patch.target is None else set(patch.paths(index.root))
+        for anchor in patch.anchors():
+            located = index.locate(anchor)
+            expected = targets if targets is not None else set(located)
+            if located and set(located) == expected and (targets is not None or len(located) == 1):
+                icon = '✅'
+            else:
+                icon = '⚠️'
+                problems += 1
+            print(f'  {icon} {short_label(anchor)!r}', file=out)
+            for path, offsets in sorted(located.items()):
+                print(f'       {path} @ {", ".join(map(str, offsets))}', file=out)
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m patchkit', description='List and apply registered patches.')
+    parser.add_argument('patches', nargs='*', help='patch ids or groups (script names) to apply')
+    parser.add_argument('--list', action='store_true', help='list registered patches and exit')
+    parser.add_argument('--all', action='store_true', help='apply every registered patch')
+    parser.add_argument('--locate', action='store_true', help='show which files hold each anchor and exit')
+    parser.add_argument('--watch', action='store_true', help='keep running and re-apply patches when targets change')
+    parser.add_argument('--poll', action='store_true', help='with --watch, poll file stats instead of using inotify')
+    parser.add_argument('--debounce', type=float, default=50, help='with --watch, milliseconds to wait for a burst of changes')
+    add_run_options(parser, root_help='directory the patch targets are relative to')
+    args = parser.parse_args(argv)
+
+    from .registry import all_patches, select
+
+    if args.list:
+        print_patches(select(args.patches) if args.patches else all_patches())
+        return 0
+    if args.all:
+        patches = all_patches()
+    elif args.patches:
+        try:
+            patches = select(args.patches)
+        except KeyError as e:
+            print(f'❌ Unknown patch or group: {e.args[0]}', file=sys.stderr)
+            return 2
+    else:
+        parser.error('name patches or groups to apply, or pass --all (see --list)')
+
+    index = None
+    if args.locate or any(patch.target is None for patch in patches):
+        from .index import load_index
+
+        index = load_index(args.root, save=not args.dry_run)
+    if args.locate:
+        return 1 if print_locations(patches, index) else 0
+
+    from .index import AmbiguousAnchor
+
+    started = time.perf_counter()
+    # Resolve every target before anything is written, so an anchor that
+    # matches several files stops the whole run.
+    try:
+        patch_sets = [patch.patch_set(args.root, index) for patch in patches]
+    except AmbiguousAnchor as e:
+        print(f'❌ {e}', file=sys.stderr)
+        return 2
+    if args.watch:
+        from .watch import watch
+
+        return watch(patch_sets, args.root, debounce=args.debounce / 1000, poll=args.poll)
+
+    from .runner import cache_note, print_run, run_from_args
+
+    summaries, counters = run_from_args(patch_sets, args)
+    elapsed = time.perf_counter() - started
+    print_run(summaries, counters, elapsed, args)
+    print(f'\n🏁 {len(patches)} patches, {len(summaries)} files in {elapsed * 1000:.1f} ms{cache_note(counters)}')
+    return 1 if any(summary.error for summary in summaries) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
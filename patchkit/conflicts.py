@@ -0,0 +1,192 @@
+"""
+Edit spans, overlap detection and single-pass composition.
+
+``fix.py`` and ``fix_mobile.py`` rewrite the same ``setTimeout`` block in
+``AssetsPanel.tsx`` differently, and whichever ran last won. ``apply_patch``
+now resolves every edit for a file to ``Span``s in the original text first,
+finds overlapping spans with an ``IntervalTree``, and either raises
+``EditConflict`` naming both edits or splices all spans in one pass.
+
+Offsets are character offsets into the decoded text.
+"""
+
+
+class Span:
+    """
+    ``text[start:end]`` is to be replaced by ``replacement``.
+
+    ``kind`` and ``label`` identify the edit (``'literal'`` and its anchor,
+    ``'regex'`` and its pattern, ``'block'`` and its marker) and ``origin``
+    the patch set it belongs to.
+    """
+
+    __slots__ = ('start', 'end', 'replacement', 'kind', 'label', 'origin')
+
+    def __init__(self, start, end, replacement, kind, label, origin=None):
+        self.start = start
+        self.end = end
+        self.replacement = replacement
+        self.kind = kind
+        self.label = label
+        self.origin = origin
+
+    def describe(self):
+        label = self.label if len(self.label) <= 50 else self.label[:47] + '...'
+        origin = f' from {self.origin}' if self.origin else ''
+        return f'{self.kind} {label!r}{origin} at {self.start}:{self.end}'
+
+    def __repr__(self):
+        return f'Span({self.start}, {self.end}, {self.label[:30]!r})'
+
+
+def overlaps(start, end, other_start, other_end):
+    """
+    Whether two half-open ranges collide.
+
+    An empty range is an insertion point: it collides with another insertion
+    at the same offset (the order would be ambiguous) or with a range that
+    strictly contains it, but not with a range it merely touches.
+    """
+    if start == end and other_start == other_end:
+        return start == other_start
+    if start == end:
+        return other_start < start < other_end
+    if other_start == other_end:
+        return start < other_start < end
+    return start < other_end and other_start < end
+
+
+class IntervalTree:
+    """
+    Static interval tree over ``(start, end, value)`` triples.
+
+    The triples are sorted by start and viewed as an implicit balanced
+    binary tree (the middle element of each range is its root), with each
+    node holding the largest end in its subtree. A query skips every subtree
+    that ends before the query range, and every right subtree that starts
+    after it, so it costs O(log n + k).
+    """
+
+    def __init__(self, intervals):
+        self._items = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self._max_end = [0] * len(self._items)
+        if self._items:
+            self._build(0, len(self._items))
+
+    def _build(self, lo, hi):
+        # Iterative post-order, so deep trees do not hit the recursion limit.
+        stack = [(lo, hi, False)]
+        while stack:
+            lo, hi, children_done = stack.pop()
+            mid = (lo + hi) // 2
+            if not children_done:
+                stack.append((lo, hi, True))
+                if mid + 1 < hi:
+                    stack.append((mid + 1, hi, False))
+                if lo < mid:
+                    stack.append((lo, mid, False))
+                continue
+            best = self._items[mid][1]
+            if lo < mid:
+                best = max(best, self._max_end[(lo + mid) // 2])
+            if mid + 1 < hi:
+                best = max(best, self._max_end[(mid + 1 + hi) // 2])
+            self._max_end[mid] = best
+
+    def __len__(self):
+        return len(self._items)
+
+    def overlapping(self, start, end):
+        """Every stored ``(start, end, value)`` that ``overlaps`` the query range."""
+        found = []
+        stack = [(0, len(self._items))] if self._items else []
+        while stack:
+            lo, hi = stack.pop()
+            mid = (lo + hi) // 2
+            if self._max_end[mid] < start:
+                continue
+            item = self._items[mid]
+            if lo < mid:
+                stack.append((lo, mid))
+            if item[0] > end:
+                continue
+            if overlaps(start, end, item[0], item[1]):
+                found.append(item)
+            if mid + 1 < hi:
+                stack.append((mid + 1, hi))
+        return found
+
+
+class Conflict:
+    """Two spans from different edits that claim overlapping text."""
+
+    __slots__ = ('first', 'second')
+
+    def __init__(self, first, second):
+        self.first = first
+        self.second = second
+
+    def __str__(self):
+        return f'{self.first.describe()} overlaps {self.second.describe()}'
+
+
+class EditConflict(ValueError):
+    """Edits for one file overlap; nothing was applied."""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        more = f' (+{len(conflicts) - 1} more)' if len(conflicts) > 1 else ''
+        super().__init__(f'Conflicting edits: {conflicts[0]}{more}')
+
+
+def dedupe(spans):
+    """Drop spans that repeat another span's range and replacement exactly (two definitions, same fix)."""
+    seen = set()
+    unique = []
+    for span in spans:
+        key = (span.start, span.end, span.replacement)
+        if key not in seen:
+            seen.add(key)
+            unique.append(span)
+    return unique
+
+
+def _may_overlap(spans):
+    # One sweep in start order: if every span starts at or after the end of
+    # everything before it (and no two start together), nothing overlaps and
+    # the tree is not needed. The usual file has no conflicts at all.
+    furthest = previous = None
+    for start, end in sorted((span.start, span.end) for span in spans):
+        if previous is not None and (start < furthest or start == previous):
+            return True
+        furthest = end if furthest is None else max(furthest, end)
+        previous = start
+    return False
+
+
+def find_conflicts(spans):
+    """Pairs of overlapping spans, each reported once, in text order."""
+    if not _may_overlap(spans):
+        return []
+    tree = IntervalTree((span.start, span.end, index) for index, span in enumerate(spans))
+    conflicts = []
+    for index, span in enumerate(spans):
+        for _, _, other in tree.overlapping(span.start, span.end):
+            if other > index:
+                conflicts.append(Conflict(span, spans[other]))
+    conflicts.sort(key=lambda c: (min(c.first.start, c.second.start), c.first.start))
+    return conflicts
+
+
+def compose(content, spans):
+    """Splice non-overlapping ``spans`` into ``content`` in one pass."""
+    if not spans:
+        return content
+    pieces = []
+    cursor = 0
+    for span in sorted(spans, key=lambda s: (s.start, s.end)):
+        pieces.append(content[cursor:span.start])
+        pieces.append(span.replacement)
+        cursor = span.end
+    pieces.append(content[cursor:])
+    return ''.join(pieces)
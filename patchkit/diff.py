@@ -0,0 +1,287 @@
+"""
+In-memory unified diffs for dry runs.
+
+Previewing a script used to mean running it, reading ``git diff`` and
+``git checkout``-ing the result away. The dry run renders the same unified
+diff from the before/after text without touching disk.
+
+Lines are interned to small integers first, so the diff compares ints
+instead of strings, and the common prefix and suffix are trimmed before the
+Myers search, which therefore only sees the edited region of a file. The
+search is the linear-space variant (forward and backward passes meeting at
+a middle snake), so memory stays proportional to the file even for large
+rewrites. Very large edited regions are first cut at lines that occur
+exactly once on each side (patience-style anchors), which bounds the cost of
+near-total rewrites at the price of a diff that may not be the shortest.
+"""
+
+import sys
+from bisect import bisect_left
+
+CONTEXT = 3
+# Edited regions with more lines than this (old + new) are split at unique
+# lines before the exact search.
+ANCHOR_THRESHOLD = 2000
+
+
+def intern_lines(a_lines, b_lines):
+    """Map both line lists to ints; equal lines get equal ids."""
+    ids = {}
+    a = [ids.setdefault(line, len(ids)) for line in a_lines]
+    b = [ids.setdefault(line, len(ids)) for line in b_lines]
+    return a, b
+
+
+def _middle_snake(a, alo, ahi, b, blo, bhi):
+    """Split point ``(x, y)`` of a shortest edit script of ``a[alo:ahi]`` -> ``b[blo:bhi]``, or ``None``."""
+    n = ahi - alo
+    m = bhi - blo
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    length = 2 * max_d + 2
+    forward = [-1] * length
+    backward = [-1] * length
+    forward[offset + 1] = 0
+    backward[offset + 1] = 0
+    delta = n - m
+    odd = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0
+    for d in range(max_d):
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            i = offset + k1
+            if k1 == -d or (k1 != d and forward[i - 1] < forward[i + 1]):
+                x1 = forward[i + 1]
+            else:
+                x1 = forward[i - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[alo + x1] == b[blo + y1]:
+                x1 += 1
+                y1 += 1
+            forward[i] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif odd:
+                j = offset + delta - k1
+                if 0 <= j < length and backward[j] != -1 and x1 >= n - backward[j]:
+                    return x1, y1
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            i = offset + k2
+            if k2 == -d or (k2 != d and backward[i - 1] < backward[i + 1]):
+                x2 = backward[i + 1]
+            else:
+                x2 = backward[i - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[ahi - 1 - x2] == b[bhi - 1 - y2]:
+                x2 += 1
+                y2 += 1
+            backward[i] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not odd:
+                j = offset + delta - k2
+                if 0 <= j < length and forward[j] != -1:
+                    x1 = forward[j]
+                    if x1 >= n - x2:
+                        return x1, offset + x1 - j
+    return None
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """Longest increasing run of ``(i, j)`` pairs of lines unique in both ranges."""
+    # line -> its index, or -1 once it has been seen twice
+    in_a = {}
+    for i in range(alo, ahi):
+        in_a[a[i]] = -1 if a[i] in in_a else i
+    in_b = {}
+    for j in range(blo, bhi):
+        in_b[b[j]] = -1 if b[j] in in_b else j
+    pairs = sorted((i, in_b[line]) for line, i in in_a.items() if i >= 0 and in_b.get(line, -1) >= 0)
+    # Patience sorting: tails[k] is the smallest j ending an increasing run of length k + 1.
+    tails = []
+    tail_index = []
+    previous = [None] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        k = bisect_left(tails, j)
+        if k == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[k] = j
+            tail_index[k] = index
+        previous[index] = tail_index[k - 1] if k else None
+    run = []
+    index = tail_index[-1] if tail_index else None
+    while index is not None:
+        run.append(pairs[index])
+        index = previous[index]
+    run.reverse()
+    return run
+
+
+def _edit_script(a, b):
+    """``[(tag, i1, i2, j1, j2)]`` with tags ``equal``/``delete``/``insert``, in order."""
+    ops = []
+    # Work items are either a range to diff or an op that is already final;
+    # a stack instead of recursion keeps deep splits off the Python stack.
+    stack = [(None, 0, len(a), 0, len(b))]
+    while stack:
+        tag, alo, ahi, blo, bhi = stack.pop()
+        if tag is not None:
+            ops.append((tag, alo, ahi, blo, bhi))
+            continue
+        prefix = 0
+        while alo + prefix < ahi and blo + prefix < bhi and a[alo + prefix] == b[blo + prefix]:
+            prefix += 1
+        suffix = 0
+        while alo + prefix < ahi - suffix and blo + prefix < bhi - suffix and a[ahi - 1 - suffix] == b[bhi - 1 - suffix]:
+            suffix += 1
+        pending = []
+        if prefix:
+            pending.append(('equal', alo, alo + prefix, blo, blo + prefix))
+        mlo, mhi, nlo, nhi = alo + prefix, ahi - suffix, blo + prefix, bhi - suffix
+        if mlo == mhi:
+            if nlo < nhi:
+                pending.append(('insert', mlo, mlo, nlo, nhi))
+        elif nlo == nhi:
+            pending.append(('delete', mlo, mhi, nlo, nlo))
+        elif (mhi - mlo) + (nhi - nlo) > ANCHOR_THRESHOLD and _push_anchored(pending, a, mlo, mhi, b, nlo, nhi):
+            pass
+        else:
+            split = _middle_snake(a, mlo, mhi, b, nlo, nhi)
+            if split is None:
+                pending.append(('delete', mlo, mhi, nlo, nlo))
+                pending.append(('insert', mhi, mhi, nlo, nhi))
+            else:
+                x, y = split
+                pending.append((None, mlo, mlo + x, nlo, nlo + y))
+                pending.append((None, mlo + x, mhi, nlo + y, nhi))
+        if suffix:
+            pending.append(('equal', ahi - suffix, ahi, bhi - suffix, bhi))
+        stack.extend(reversed(pending))
+    return ops
+
+
+def _push_anchored(pending, a, alo, ahi, b, blo, bhi):
+    """Queue the range as sub-ranges between unique-line anchors; False if there are none."""
+    anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+    if not anchors:
+        return False
+    i0, j0 = alo, blo
+    for i, j in anchors:
+        pending.append((None, i0, i, j0, j))
+        pending.append(('equal', i, i + 1, j, j + 1))
+        i0, j0 = i + 1, j + 1
+    pending.append((None, i0, ahi, j0, bhi))
+    return True
+
+
+def diff_opcodes(a_lines, b_lines):
+    """
+    ``difflib``-style opcodes for a line diff of ``a_lines`` -> ``b_lines``.
+
+    The diff is a shortest one unless ``ANCHOR_THRESHOLD`` cut in.
+
+    Adjacent operations of the same kind are merged, and a deletion next to
+    an insertion becomes a ``replace``.
+    """
+    a, b = intern_lines(a_lines, b_lines)
+    merged = []
+    for tag, i1, i2, j1, j2 in _edit_script(a, b):
+        if i1 == i2 and j1 == j2:
+            continue
+        if merged:
+            ptag, pi1, pi2, pj1, pj2 = merged[-1]
+            if ptag == tag or (ptag != 'equal' and tag != 'equal'):
+                if ptag != tag:
+                    tag = 'replace'
+                merged[-1] = (tag, pi1, i2, pj1, j2)
+                continue
+        merged.append((tag, i1, i2, j1, j2))
+    return merged
+
+
+def group_opcodes(opcodes, context=CONTEXT):
+    """Split opcodes into hunks with ``context`` lines around each change (as ``difflib`` does)."""
+    codes = list(opcodes)
+    if not codes or all(code[0] == 'equal' for code in codes):
+        return []
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+    groups = []
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == 'equal' and i2 - i1 > 2 * context:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            groups.append(group)
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        groups.append(group)
+    return groups
+
+
+def _range(start, stop):
+    length = stop - start
+    begin = start + 1
+    if length == 1:
+        return f'{begin}'
+    if not length:
+        begin -= 1
+    return f'{begin},{length}'
+
+
+def _emit(out, prefix, line):
+    if line.endswith('\n'):
+        out.append(prefix + line)
+    else:
+        out.append(prefix + line + '\n')
+        out.append('\\ No newline at end of file\n')
+
+
+def unified_diff(old, new, path, context=CONTEXT):
+    """Unified diff of ``old`` -> ``new`` text for ``path`` in ``git diff`` format; ``''`` if equal."""
+    if old == new:
+        return ''
+    a_lines = old.splitlines(keepends=True)
+    b_lines = new.splitlines(keepends=True)
+    out = [f'--- a/{path}\n', f'+++ b/{path}\n']
+    for group in group_opcodes(diff_opcodes(a_lines, b_lines), context):
+        first, last = group[0], group[-1]
+        out.append(f'@@ -{_range(first[1], last[2])} +{_range(first[3], last[4])} @@\n')
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in a_lines[i1:i2]:
+                    _emit(out, ' ', line)
+                continue
+            for line in a_lines[i1:i2]:
+                _emit(out, '-', line)
+            for line in b_lines[j1:j2]:
+                _emit(out, '+', line)
+    return ''.join(out)
+
+
+def summary_diff(summary):
+    """Diff of a ``FileSummary`` patched with ``write=False``; ``''`` if it did not change."""
+    if summary.output is None:
+        return ''
+    return unified_diff(summary.original.decode('utf-8'), summary.output.decode('utf-8'), summary.path)
+
+
+def print_diffs(summaries, out=sys.stdout):
+    """Write the diff of every changed file, in path order; returns how many were written."""
+    written = 0
+    for summary in sorted(summaries, key=lambda s: s.path):
+        diff = summary_diff(summary)
+        if diff:
+            out.write(diff)
+            written += 1
+    return written
@@ -0,0 +1,214 @@
+"""
+Single-pass multi-anchor patch engine.
+
+The one-off scripts in the repo root apply each edit with its own
+``content.replace(old, new)``, so every edit rescans and recopies the whole
+file. ``apply_edits`` finds every anchor in one left-to-right scan and builds
+the output once from slices of the original text.
+"""
+
+import re
+from functools import lru_cache
+
+# Version of what edits match and produce, across the literal engine, JSX
+# block boundaries (``jsx``), TSX node queries (``tsx``) and the regex layer.
+# Cached outputs (``patchkit.cache``) are keyed by it, so bump it with any
+# change that makes the same edits give different output.
+# 2: a NodeEdit inserted after a last member or binding adds its separator.
+MATCH_VERSION = 2
+
+
+class Edit:
+    """A literal anchor and the text that replaces every occurrence of it."""
+
+    __slots__ = ('anchor', 'replacement')
+
+    def __init__(self, anchor, replacement):
+        if not anchor:
+            raise ValueError('Edit anchor must be a non-empty string')
+        self.anchor = anchor
+        self.replacement = replacement
+
+    def __repr__(self):
+        preview = self.anchor if len(self.anchor) <= 40 else self.anchor[:37] + '...'
+        return f'Edit({preview!r})'
+
+
+class PatchResult:
+    """Patched text plus how many times each anchor matched."""
+
+    __slots__ = ('text', 'counts', 'original')
+
+    def __init__(self, text, counts, original):
+        self.text = text
+        self.counts = counts
+        self.original = original
+
+    @property
+    def changed(self):
+        return self.text != self.original
+
+    @property
+    def missing(self):
+        """Anchors that did not match anywhere."""
+        return [anchor for anchor, count in self.counts.items() if count == 0]
+
+
+def as_edit(edit):
+    """Accept either an ``Edit`` or a plain ``(anchor, replacement)`` tuple."""
+    if isinstance(edit, Edit):
+        return edit
+    anchor, replacement = edit
+    return Edit(anchor, replacement)
+
+
+# Deepest nesting of groups the trie pattern may have. Anchors that are
+# prefixes of each other nest one group per anchor, and ``re`` parses and
+# compiles groups recursively, so a deeper trie falls back to alternation.
+MAX_TRIE_DEPTH = 200
+
+
+def _chain(node, char):
+    # Follow single-child links from ``node[char]``: the literal run and the
+    # node it ends at.
+    literal = [char]
+    child = node[char]
+    while len(child) == 1 and '' not in child:
+        (next_char, child), = child.items()
+        literal.append(next_char)
+    return ''.join(literal), child
+
+
+def _trie_pattern(root):
+    """
+    The trie as nested non-capturing groups and their nesting depth.
+
+    Single-child chains are collapsed so the depth follows branch points,
+    not anchor length. Nodes are emitted children first from an explicit
+    stack, so a deep trie cannot exhaust Python's recursion limit here.
+    """
+    built = {}
+    stack = [(root, False)]
+    while stack:
+        node, ready = stack.pop()
+        branches = [_chain(node, char) for char in sorted(k for k in node if k)]
+        if not ready:
+            stack.append((node, True))
+            stack.extend((child, False) for _, child in branches)
+            continue
+        parts = []
+        depth = 0
+        for literal, child in branches:
+            pattern, child_depth = built.pop(id(child))
+            parts.append(re.escape(literal) + pattern)
+            depth = max(depth, child_depth)
+        if not parts:
+            built[id(node)] = ('', 0)
+            continue
+        if len(parts) == 1:
+            body = parts[0]
+        else:
+            body = '(?:' + '|'.join(parts) + ')'
+            depth += 1
+        # Greedy ``?`` tries the longer continuation first, so every match is
+        # the longest anchor starting at that offset.
+        if '' in node:
+            built[id(node)] = (f'(?:{body})?', depth + 1)
+        else:
+            built[id(node)] = (body, depth)
+    return built[id(root)]
+
+
+@lru_cache(maxsize=256)
+def _matcher(anchors):
+    # Anchors are merged into a prefix trie and compiled into one regex, so
+    # shared prefixes are only compared once per offset (the Aho-Corasick
+    # idea) and the scan runs inside the C regex engine instead of a
+    # per-character Python loop.
+    root = {}
+    for anchor in anchors:
+        node = root
+        for char in anchor:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    pattern, depth = _trie_pattern(root)
+    if depth > MAX_TRIE_DEPTH:
+        # Longest first, so the first alternative to match at an offset is
+        # the longest anchor there, as with the trie.
+        pattern = '|'.join(re.escape(anchor) for anchor in sorted(anchors, key=len, reverse=True))
+    return re.compile(pattern)
+
+
+@lru_cache(maxsize=256)
+def _byte_matcher(anchors):
+    # The same trie over UTF-8 bytes, for scanning files without decoding
+    # them. UTF-8 is self-synchronising, so a match never starts or ends
+    # inside a character and byte matches line up with text matches.
+    return re.compile(_matcher(anchors).pattern.encode('utf-8'))
+
+
+def _index_edits(edits):
+    replacements = {}
+    for edit in map(as_edit, edits):
+        previous = replacements.setdefault(edit.anchor, edit.replacement)
+        if previous != edit.replacement:
+            raise ValueError(f'Conflicting replacements for anchor {edit.anchor[:60]!r}')
+    return replacements
+
+
+def find_matches(content, edits):
+    """Return ``(start, end, anchor)`` for every non-overlapping anchor match."""
+    replacements = _index_edits(edits)
+    if not replacements:
+        return []
+    matcher = _matcher(tuple(sorted(replacements)))
+    return [(m.start(), m.end(), m.group()) for m in matcher.finditer(content)]
+
+
+def apply_edits(content, edits):
+    """
+    Apply all edits to ``content`` in one scan.
+
+    Every anchor is matched against the original text, so a replacement never
+    feeds into another edit's anchor. Where anchors overlap, the leftmost match
+    wins, and the longest anchor wins between matches starting at the same
+    offset.
+    """
+    replacements = _index_edits(edits)
+    counts = dict.fromkeys(replacements, 0)
+    if not replacements:
+        return PatchResult(content, counts, content)
+
+    matcher = _matcher(tuple(sorted(replacements)))
+    pieces = []
+    cursor = 0
+    for match in matcher.finditer(content):
+        anchor = match.group()
+        counts[anchor] += 1
+        pieces.append(content[cursor:match.start()])
+        pieces.append(replacements[anchor])
+        cursor = match.end()
+
+    if cursor == 0:
+        return PatchResult(content, counts, content)
+    pieces.append(content[cursor:])
+    return PatchResult(''.join(pieces), counts, content)
+
+
+def patch_file(path, edits, encoding='utf-8', strict=False):
+    """
+    Apply ``edits`` to the file at ``path``; the file is only rewritten if it changed.
+
+    With ``strict``, nothing is written unless every anchor matched, so a
+    file is never left with only some of its edits.
+    """
+    with open(path, 'r', encoding=encoding) as f:
+        content = f.read()
+
+    result = apply_edits(content, edits)
+    if strict and result.missing:
+        return result
+    if result.changed:
+        with open(path, 'w', encoding=encoding) as f:
+            f.write(result.text)
+    return result
@@ -0,0 +1,50 @@
+"""
+Content guards for conditional edits.
+
+The old scripts protect themselves with checks such as
+``if 'OrderItemBreakdown' not in content``. A ``Guard`` expresses the same
+check as data so it can live in the patch registry.
+"""
+
+
+class Guard:
+    """Allow an edit only if ``present`` occurs in the file and ``absent`` does not."""
+
+    __slots__ = ('present', 'absent')
+
+    def __init__(self, present=None, absent=None):
+        if present is None and absent is None:
+            raise ValueError('Guard needs a present or absent string')
+        self.present = present
+        self.absent = absent
+
+    def allows(self, content):
+        if self.present is not None and self.present not in content:
+            return False
+        if self.absent is not None and self.absent in content:
+            return False
+        return True
+
+    def fields(self):
+        return ('guard', self.present or '', self.absent or '')
+
+    def __repr__(self):
+        parts = []
+        if self.present is not None:
+            parts.append(f'present={self.present!r}')
+        if self.absent is not None:
+            parts.append(f'absent={self.absent!r}')
+        return f'Guard({", ".join(parts)})'
+
+
+class Guarded:
+    """An edit that only applies when its guard allows the file's current content."""
+
+    __slots__ = ('edit', 'guard')
+
+    def __init__(self, edit, guard):
+        self.edit = edit
+        self.guard = guard
+
+    def __repr__(self):
+        return f'Guarded({self.edit!r}, {self.guard!r})'
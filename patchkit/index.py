@@ -0,0 +1,336 @@
+"""
+Persistent anchor index over ``src/`` and ``netlify/functions/``.
+
+The patch scripts hard-code which file an anchor such as
+``'{/* Cost Breakdown */}'`` lives in. ``AnchorIndex`` keeps, for every
+source file, the set of identifier tokens it contains, and an inverted
+``token -> files`` map built from them. Looking up an anchor intersects the
+posting sets of the anchor's tokens, so only the few candidate files are
+read, and ``bytes.find`` turns those into exact byte offsets. Located
+anchors are cached as ``{path: [offsets]}`` too.
+
+The index is refreshed incrementally: a file is re-tokenised only when its
+size or mtime changed, and cached anchor locations are re-checked only
+against the files that changed. Each root has its own index file (see
+``index_path``), so switching ``--root`` does not discard another tree's.
+
+Usage:
+    python -m patchkit.index [anchor ...] [--rebuild]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+
+from .paths import REPO_ROOT
+
+INDEX_VERSION = 2
+DEFAULT_INDEX = os.path.join(REPO_ROOT, '.patchkit', 'anchor-index.json')
+DEFAULT_DIRS = ('src', 'netlify/functions')
+SOURCE_SUFFIXES = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.mts', '.cts', '.css', '.json', '.html')
+SKIP_DIRS = ('node_modules', '.git', 'dist', 'build')
+
+# Identifier-like runs. Shorter runs (``id``, ``px``) are in nearly every
+# file and would only cost memory.
+_TOKEN = re.compile(rb'[A-Za-z0-9_$]{3,}')
+
+
+class AmbiguousAnchor(ValueError):
+    """An anchor that should identify one file occurs in several (or none)."""
+
+    def __init__(self, anchor, paths):
+        self.anchor = anchor
+        self.paths = sorted(paths)
+        where = ', '.join(self.paths) if self.paths else 'no indexed file'
+        super().__init__(f'Anchor {anchor[:60]!r} found in {where}')
+
+
+def file_tokens(raw):
+    """Distinct identifier tokens in ``raw`` bytes."""
+    return set(_TOKEN.findall(raw))
+
+
+def anchor_tokens(anchor):
+    """
+    Tokens every file containing ``anchor`` must have, as ``(token, position)``.
+
+    A token touching the start of the anchor may be the tail of a longer
+    word in the file (position ``'end'``), one touching the end its head
+    (``'start'``), and one spanning the whole anchor any part of a word
+    (``'inside'``). Interior tokens are whole words (``'whole'``).
+    """
+    data = anchor.encode('utf-8')
+    tokens = set()
+    for m in _TOKEN.finditer(data):
+        at_start = m.start() == 0
+        at_end = m.end() == len(data)
+        if at_start and at_end:
+            position = 'inside'
+        elif at_start:
+            position = 'end'
+        elif at_end:
+            position = 'start'
+        else:
+            position = 'whole'
+        tokens.add((m.group().decode('ascii'), position))
+    return tokens
+
+
+def find_offsets(raw, needle):
+    """Byte offsets of every (non-overlapping) occurrence of ``needle`` in ``raw``."""
+    offsets = []
+    find = raw.find
+    offset = find(needle)
+    while offset != -1:
+        offsets.append(offset)
+        offset = find(needle, offset + len(needle))
+    return offsets
+
+
+class AnchorIndex:
+    """Token inverted index plus cached anchor locations, stored as JSON."""
+
+    def __init__(self, root=REPO_ROOT, path=DEFAULT_INDEX, dirs=DEFAULT_DIRS):
+        self.root = root
+        self.path = path
+        self.dirs = tuple(dirs)
+        # path -> {'size', 'mtime_ns', 'tokens': [str]}
+        self.files = {}
+        # anchor -> {path: [byte offsets]}
+        self.anchors = {}
+        self._postings = None
+        self.dirty = False
+        if path is not None:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if (
+            data.get('version') == INDEX_VERSION and data.get('dirs') == list(self.dirs)
+            and data.get('root') == os.path.abspath(self.root)
+        ):
+            self.files = data.get('files', {})
+            self.anchors = data.get('anchors', {})
+
+    # -- maintenance -------------------------------------------------------
+
+    def _walk(self):
+        for top in self.dirs:
+            for dirpath, dirnames, filenames in os.walk(os.path.join(self.root, top)):
+                dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+                for filename in filenames:
+                    if filename.endswith(SOURCE_SUFFIXES):
+                        full_path = os.path.join(dirpath, filename)
+                        yield os.path.relpath(full_path, self.root).replace(os.sep, '/'), full_path
+
+    def refresh(self):
+        """
+        Bring the index up to date with the tree.
+
+        Returns the set of paths that were added, changed or removed.
+        """
+        changed = set()
+        seen = set()
+        for path, full_path in self._walk():
+            seen.add(path)
+            try:
+                stat = os.stat(full_path)
+            except OSError:
+                continue
+            entry = self.files.get(path)
+            if entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                continue
+            with open(full_path, 'rb') as f:
+                raw = f.read()
+            self.files[path] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'tokens': sorted(token.decode('ascii') for token in file_tokens(raw)),
+            }
+            changed.add(path)
+        removed = set(self.files) - seen
+        for path in removed:
+            del self.files[path]
+        changed |= removed
+        if changed:
+            self._postings = None
+            self._recheck_anchors(changed)
+            self.dirty = True
+        return changed
+
+    def _recheck_anchors(self, changed):
+        for anchor, located in self.anchors.items():
+            for path in changed:
+                located.pop(path, None)
+            candidates = self.candidates(anchor) & changed
+            located.update(self._offsets(anchor, candidates))
+
+    @property
+    def postings(self):
+        """``{token: set(paths)}``, built from the per-file token lists on first use."""
+        if self._postings is None:
+            postings = {}
+            for path, entry in self.files.items():
+                for token in entry['tokens']:
+                    postings.setdefault(token, set()).add(path)
+            self._postings = postings
+        return self._postings
+
+    # -- queries -----------------------------------------------------------
+
+    def _token_paths(self, token, position):
+        postings = self.postings
+        if position == 'whole':
+            return postings.get(token, set())
+        # A partial token is matched against the vocabulary, which is far
+        # smaller than the files it was built from.
+        if position == 'start':
+            match = str.startswith
+        elif position == 'end':
+            match = str.endswith
+        else:
+            match = str.__contains__
+        paths = set()
+        for word, word_paths in postings.items():
+            if match(word, token):
+                paths |= word_paths
+        return paths
+
+    def candidates(self, anchor):
+        """Paths that contain every token of ``anchor``; all paths if it has none."""
+        tokens = anchor_tokens(anchor)
+        if not tokens:
+            return set(self.files)
+        # Whole tokens are a dict lookup; do them first and rarest first.
+        ordered = sorted(tokens, key=lambda t: (t[1] != 'whole', len(self.postings.get(t[0], ()))))
+        result = None
+        for token, position in ordered:
+            paths = self._token_paths(token, position)
+            result = set(paths) if result is None else result & paths
+            if not result:
+                break
+        return result
+
+    def _offsets(self, anchor, paths):
+        needle = anchor.encode('utf-8')
+        located = {}
+        for path in paths:
+            try:
+                with open(os.path.join(self.root, path), 'rb') as f:
+                    offsets = find_offsets(f.read(), needle)
+            except OSError:
+                continue
+            if offsets:
+                located[path] = offsets
+        return located
+
+    def locate(self, anchor):
+        """``{path: [byte offsets]}`` for every indexed file containing ``anchor``."""
+        located = self.anchors.get(anchor)
+        if located is None:
+            located = self._offsets(anchor, self.candidates(anchor))
+            self.anchors[anchor] = located
+            self.dirty = True
+        return dict(located)
+
+    def find_target(self, anchors):
+        """
+        The one indexed file containing every anchor in ``anchors``.
+
+        Raises ``AmbiguousAnchor`` when no file or several files qualify.
+        """
+        paths = None
+        for anchor in anchors:
+            found = set(self.locate(anchor))
+            paths = found if paths is None else paths & found
+        paths = paths or set()
+        if len(paths) != 1:
+            raise AmbiguousAnchor(anchors[0] if anchors else '', paths)
+        return paths.pop()
+
+    # -- persistence -------------------------------------------------------
+
+    def save(self):
+        if not self.dirty or self.path is None:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.anchor-index-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {
+                        'version': INDEX_VERSION, 'root': os.path.abspath(self.root), 'dirs': list(self.dirs),
+                        'files': self.files, 'anchors': self.anchors,
+                    },
+                    f, separators=(',', ':'),
+                )
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.dirty = False
+
+
+def index_path(root=REPO_ROOT):
+    """
+    The index file for ``root``: ``DEFAULT_INDEX`` for this repo, and for any
+    other tree a file beside it named by a hash of the tree's absolute path.
+    """
+    root = os.path.abspath(root)
+    if root == os.path.abspath(REPO_ROOT):
+        return DEFAULT_INDEX
+    key = hashlib.sha256(root.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(os.path.dirname(DEFAULT_INDEX), f'anchor-index-{key}.json')
+
+
+def load_index(root=REPO_ROOT, path=None, save=True):
+    """
+    Open the index for ``root`` at ``path`` (default: ``index_path(root)``),
+    refresh it and, unless ``save`` is false, save it.
+    """
+    index = AnchorIndex(root, index_path(root) if path is None else path)
+    index.refresh()
+    if save:
+        index.save()
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Locate anchors across src/ and netlify/functions/.')
+    parser.add_argument('anchors', nargs='*', help='literal anchors to locate')
+    parser.add_argument('--root', default=REPO_ROOT, help='directory to index')
+    parser.add_argument('--index', help='index file (default: one per root under .patchkit/)')
+    parser.add_argument('--rebuild', action='store_true', help='discard the index and re-tokenise every file')
+    args = parser.parse_args(argv)
+
+    path = args.index or index_path(args.root)
+    if args.rebuild and os.path.exists(path):
+        os.unlink(path)
+    index = AnchorIndex(args.root, path)
+    changed = index.refresh()
+    print(f'📇 {len(index.files)} files indexed, {len(changed)} refreshed')
+
+    status = 0
+    for anchor in args.anchors:
+        located = index.locate(anchor)
+        icon = '✅' if len(located) == 1 else '⚠️'
+        if len(located) != 1:
+            status = 1
+        print(f'{icon} {anchor[:60]!r}: {len(located)} file(s)')
+        for path, offsets in sorted(located.items()):
+            print(f'     {path} @ {", ".join(map(str, offsets))}')
+    index.save()
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
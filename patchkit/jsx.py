@@ -0,0 +1,306 @@
+"""
+Linear-time JSX/TSX tag-balance scanner.
+
+``update_checkout_and_email.py`` and ``update_pricing_files.py`` used to find
+the end of a block by walking the file one character at a time, slicing
+``temp[i:i+4]`` on every step. ``scan_jsx`` instead tokenizes the file once
+with a small set of compiled patterns and matches every opening tag with its
+closing tag on a stack, so locating "the element after this marker" is a
+lookup instead of a rescan.
+
+Strings, comments, template literals and regex literals are skipped, and JSX
+text is not tokenized as code, so an apostrophe in ``<p>Don't</p>`` or a
+``</div>`` inside a string literal never affects the balance.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+
+# One pattern per lexical mode. The scanner only ever moves forward, calling
+# ``search`` from the end of the previous token, so each file is walked once.
+_JS = re.compile(r'''
+      //[^\n]*
+    | /\*[\s\S]*?\*/
+    | '(?:[^'\\\n]|\\.)*'
+    | "(?:[^"\\\n]|\\.)*"
+    | [(,=:\[!&|?;]\s*/(?![/*])(?:[^/\\\n\[]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/
+    | `
+    | [{}]
+    | (?<![\w$)\].])<(?=[A-Za-z>])
+''', re.VERBOSE)
+_TAG = re.compile(r''''[^']*'|"[^"]*"|\{|/>|>''')
+_CHILDREN = re.compile(r'''\{|</([A-Za-z][\w.:-]*)?\s*>|<(?=[A-Za-z>])''')
+_TEMPLATE = re.compile(r'''\\[\s\S]|`|\$\{''')
+_TAG_NAME = re.compile(r'<([A-Za-z][\w.:-]*)?')
+# ``<T,>(...) =>`` and ``<K extends keyof X>(...) =>`` are generic arrow
+# functions, not elements.
+_TYPE_PARAMS = re.compile(r'<[A-Za-z_$][\w$]*\s*(?:,|extends\b)')
+
+_JS_MODE, _TAG_MODE, _CHILDREN_MODE, _TEMPLATE_MODE = range(4)
+_PATTERNS = (_JS, _TAG, _CHILDREN, _TEMPLATE)
+
+
+class JsxScanError(ValueError):
+    """Raised when the tags in a file cannot be balanced."""
+
+    def __init__(self, message, offset):
+        super().__init__(f'{message} at offset {offset}')
+        self.offset = offset
+
+
+class BlockEdit:
+    """Replace a marker and the JSX node that follows it."""
+
+    __slots__ = ('marker', 'replacement')
+
+    def __init__(self, marker, replacement):
+        if not marker:
+            raise ValueError('BlockEdit marker must be a non-empty string')
+        self.marker = marker
+        self.replacement = replacement
+
+    def __repr__(self):
+        return f'BlockEdit({self.marker!r})'
+
+
+class JsxNode:
+    """
+    One element, fragment or ``{...}`` expression container in JSX children.
+
+    ``name`` is the tag name, ``''`` for fragments and ``None`` for expression
+    containers. ``start``/``end`` span the whole node including its closing
+    tag; ``open_end`` is the end of the opening tag.
+    """
+
+    __slots__ = ('name', 'start', 'open_end', 'end', 'parent', 'self_closing')
+
+    def __init__(self, name, start, parent):
+        self.name = name
+        self.start = start
+        self.open_end = start
+        self.end = -1
+        self.parent = parent
+        self.self_closing = False
+
+    @property
+    def is_expression(self):
+        return self.name is None
+
+    def __repr__(self):
+        label = '{...}' if self.name is None else f'<{self.name}>'
+        return f'JsxNode({label}, {self.start}:{self.end})'
+
+
+class JsxIndex:
+    """Balanced nodes of one file, in document order."""
+
+    def __init__(self, text, nodes):
+        self.text = text
+        self.nodes = nodes
+        self._starts = [node.start for node in nodes]
+        self._by_start = {node.start: node for node in nodes}
+
+    def node_at(self, offset):
+        """The node whose opening ``<`` or ``{`` is exactly at ``offset``."""
+        return self._by_start.get(offset)
+
+    def node_after(self, offset, name=Ellipsis):
+        """First node starting at or after ``offset``, optionally with a given tag name."""
+        i = bisect_left(self._starts, offset)
+        if name is Ellipsis:
+            return self.nodes[i] if i < len(self.nodes) else None
+        for node in self.nodes[i:]:
+            if node.name == name:
+                return node
+        return None
+
+    def enclosing(self, offset):
+        """Innermost node whose span contains ``offset``."""
+        i = bisect_right(self._starts, offset) - 1
+        if i < 0:
+            return None
+        node = self.nodes[i]
+        while node is not None and node.end <= offset:
+            node = node.parent
+        return node
+
+
+def scan_jsx(text, braces=None):
+    """
+    Tokenize ``text`` once and return a ``JsxIndex`` of its balanced nodes.
+
+    If ``braces`` is a list, the ``(open, close)`` offsets of every ``{``
+    ``}`` pair in code are appended to it: blocks, object literals and types,
+    destructuring patterns, but not JSX expression containers, attribute
+    values or template substitutions.
+    """
+    nodes = []
+    open_nodes = []
+    # Each mode entry is (mode, node): the tag being read in tag mode, the
+    # open element in children mode, or the expression container for a JS
+    # mode entered from a ``{`` in JSX children.
+    modes = [(_JS_MODE, None)]
+    # The offset of the ``{`` behind each JS mode above the first, or None
+    # for the ways into code that are not code braces; kept for ``braces``.
+    opens = [] if braces is not None else None
+    pos = 0
+
+    def open_node(name, start):
+        parent = open_nodes[-1] if open_nodes else None
+        node = JsxNode(name, start, parent)
+        nodes.append(node)
+        return node
+
+    while True:
+        mode, owner = modes[-1]
+        match = _PATTERNS[mode].search(text, pos)
+        if match is None:
+            break
+        token = match.group()
+        start = match.start()
+        pos = match.end()
+        first = token[0]
+
+        if mode == _JS_MODE:
+            if first == '{':
+                modes.append((_JS_MODE, None))
+                if opens is not None:
+                    opens.append(start)
+            elif first == '}':
+                if len(modes) > 1:
+                    modes.pop()
+                    if opens is not None:
+                        opened = opens.pop()
+                        if opened is not None:
+                            braces.append((opened, start))
+                    if owner is not None:
+                        owner.end = pos
+                        open_nodes.pop()
+            elif first == '`':
+                modes.append((_TEMPLATE_MODE, None))
+            elif first == '<':
+                generic = _TYPE_PARAMS.match(text, start)
+                if generic is not None:
+                    pos = generic.end()
+                else:
+                    node, pos = _start_tag(text, start, open_node)
+                    modes.append((_TAG_MODE, node))
+            # Strings, comments and regex literals are skipped as single tokens.
+
+        elif mode == _TAG_MODE:
+            if first == '{':
+                modes.append((_JS_MODE, None))
+                if opens is not None:
+                    opens.append(None)
+            elif token == '/>':
+                modes.pop()
+                owner.end = owner.open_end = pos
+                owner.self_closing = True
+            elif first == '>':
+                modes[-1] = (_CHILDREN_MODE, owner)
+                owner.open_end = pos
+                open_nodes.append(owner)
+
+        elif mode == _CHILDREN_MODE:
+            if first == '{':
+                node = open_node(None, start)
+                node.open_end = pos
+                open_nodes.append(node)
+                modes.append((_JS_MODE, node))
+                if opens is not None:
+                    opens.append(None)
+            elif token.startswith('</'):
+                name = match.group(1) or ''
+                if owner.name != name:
+                    raise JsxScanError(f'</{name}> does not close <{owner.name}>', start)
+                owner.end = pos
+                open_nodes.pop()
+                modes.pop()
+            else:
+                node, pos = _start_tag(text, start, open_node)
+                modes.append((_TAG_MODE, node))
+
+        else:  # template literal
+            if token == '`':
+                modes.pop()
+            elif token == '${':
+                modes.append((_JS_MODE, None))
+                if opens is not None:
+                    opens.append(None)
+
+    unclosed = [node for _, node in modes if node is not None and node.end == -1]
+    if unclosed:
+        node = unclosed[-1]
+        raise JsxScanError(f'<{node.name}> is never closed', node.start)
+    return JsxIndex(text, nodes)
+
+
+def _start_tag(text, start, open_node):
+    match = _TAG_NAME.match(text, start)
+    node = open_node(match.group(1) or '', start)
+    return node, match.end()
+
+
+def replace_block(content, marker, replacement, index=None):
+    """
+    Replace ``marker`` and the JSX node that follows it with ``replacement``.
+
+    Returns ``content`` unchanged when the marker is missing. Pass a
+    precomputed ``index`` to skip the scan when it is already available.
+    """
+    return replace_blocks(content, [BlockEdit(marker, replacement)], index)[0]
+
+
+def replace_blocks(content, blocks, index=None, resolved=None):
+    """
+    Apply several ``BlockEdit``s against a single scan of ``content``.
+
+    Every block is located in the original text and the spans are spliced
+    in one pass, so later blocks do not need a rescan. Returns the new text
+    and a ``{marker: 0 or 1}`` match count. If ``resolved`` is a list, the
+    ``(block, start, end)`` span of each replaced block is appended to it.
+    """
+    located, counts = locate_blocks(content, blocks, index)
+    if resolved is not None:
+        resolved.extend(located)
+    if not located:
+        return content, counts
+    spans = sorted((start, end, block.replacement) for block, start, end in located)
+    pieces = []
+    cursor = 0
+    for start, end, replacement in spans:
+        if start < cursor:
+            raise ValueError(f'Block at offset {start} overlaps the previous block')
+        pieces.append(content[cursor:start])
+        pieces.append(replacement)
+        cursor = end
+    pieces.append(content[cursor:])
+    return ''.join(pieces), counts
+
+
+def locate_blocks(content, blocks, index=None):
+    """
+    Find each block's ``(block, start, end)`` span (marker through the end of its node).
+
+    The block ends with the first node after the marker, not, as the old
+    scripts' tag counting had it, at the ``</div>`` closing the element the
+    marker sits in; that closing tag is left alone.
+
+    Scans ``content`` at most once, and only if some marker is present.
+    Returns the spans and a ``{marker: 0 or 1}`` match count.
+    """
+    counts = {}
+    located = []
+    for block in blocks:
+        counts[block.marker] = 0
+        start = content.find(block.marker)
+        if start == -1:
+            continue
+        if index is None:
+            index = scan_jsx(content)
+        node = index.node_after(start + len(block.marker))
+        if node is None:
+            continue
+        counts[block.marker] = 1
+        located.append((block, start, node.end))
+    return located, counts
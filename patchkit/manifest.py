@@ -0,0 +1,124 @@
+"""
+Persistent record of which patches have already been applied to which files.
+
+Entries are keyed by (patch id, file path) and hold the sha256 of the file
+before and after patching, plus the size and mtime seen after the write.
+When a file still has the recorded size and mtime it is skipped without
+being read; otherwise it is skipped if its hash equals the recorded
+post-image. This replaces ad-hoc guards like
+``if 'OrderItemBreakdown' not in content``.
+
+Paths are relative to one root, so each root has its own manifest (see
+``manifest_path``) and a manifest records the root it was written for: a
+record from one tree never lets a file in another be skipped.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from .paths import REPO_ROOT
+
+MANIFEST_VERSION = 2
+DEFAULT_MANIFEST = os.path.join(REPO_ROOT, '.patchkit', 'manifest.json')
+
+
+def content_hash(data):
+    """sha256 hex digest of ``data`` (str is hashed as UTF-8)."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def manifest_path(root=REPO_ROOT):
+    """
+    The manifest for ``root``: ``DEFAULT_MANIFEST`` for this repo, and for any
+    other tree a file beside it named by a hash of the tree's absolute path.
+    """
+    root = os.path.abspath(root)
+    if root == os.path.abspath(REPO_ROOT):
+        return DEFAULT_MANIFEST
+    key = hashlib.sha256(root.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(os.path.dirname(DEFAULT_MANIFEST), f'manifest-{key}.json')
+
+
+class Manifest:
+    """JSON-backed ``{(patch_id, path): entry}`` store for the files under ``root``."""
+
+    def __init__(self, path, root=REPO_ROOT):
+        self.path = path
+        self.root = os.path.abspath(root)
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError:
+            # A corrupt manifest only costs a full re-check, never a wrong skip.
+            return
+        # Written for another root, its entries describe other files.
+        if data.get('version') == MANIFEST_VERSION and data.get('root') == self.root:
+            self.entries = data.get('entries', {})
+
+    @staticmethod
+    def _key(patch_id, path):
+        return f'{patch_id}:{path}'
+
+    def lookup(self, patch_id, path):
+        return self.entries.get(self._key(patch_id, path))
+
+    def record(self, patch_id, path, pre_hash, post_hash, stat):
+        self.entries[self._key(patch_id, path)] = {
+            'pre': pre_hash,
+            'post': post_hash,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        self.dirty = True
+
+    def is_applied(self, patch_id, path, full_path):
+        """
+        True when ``full_path`` already holds the recorded post-image.
+
+        A matching size and mtime answers without reading the file; otherwise
+        the file is hashed, and the stored stat is refreshed on a match so the
+        next run takes the fast path again.
+        """
+        entry = self.lookup(patch_id, path)
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return False
+        if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+            return True
+        if stat.st_size != entry['size']:
+            return False
+        with open(full_path, 'rb') as f:
+            if content_hash(f.read()) != entry['post']:
+                return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        self.dirty = True
+        return True
+
+    def save(self):
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.manifest-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'version': MANIFEST_VERSION, 'root': self.root, 'entries': self.entries},
+                    f, indent=2, sort_keys=True,
+                )
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.dirty = False
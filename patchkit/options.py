@@ -0,0 +1,47 @@
+"""
+Command-line options shared by ``python -m patchkit`` and ``python -m patchkit.runner``.
+
+Both entry points end in ``runner.run``, so the options that control it
+are declared once here and cannot drift apart in defaults or help. Only
+``paths`` is imported, to keep ``python -m patchkit --list`` cheap.
+"""
+
+from .paths import REPO_ROOT
+
+DEFAULT_STREAM_MB = 64
+
+
+def add_run_options(parser, root_help='directory the patch paths are relative to'):
+    """Add the options ``runner.run_from_args`` reads."""
+    parser.add_argument('--root', default=REPO_ROOT, help=root_help)
+    parser.add_argument('--dry-run', action='store_true', help='print unified diffs of what would change; write nothing')
+    parser.add_argument('--workers', type=int, default=None, help='process pool size (default: CPU count)')
+    parser.add_argument(
+        '--manifest', default=None,
+        help='manifest of already-applied patches (default: one per root under .patchkit/)',
+    )
+    parser.add_argument('--no-manifest', action='store_true', help='re-check every file regardless of the manifest')
+    parser.add_argument('--report', help='write a JSON run report to this file')
+    parser.add_argument('--profile', help='dump a cProfile per patched file into this directory (or set PATCHKIT_PROFILE)')
+    parser.add_argument(
+        '--transaction', action='store_true',
+        help='write all files together, and none of them if any file fails',
+    )
+    parser.add_argument('--no-cache', action='store_true', help='always run the edits instead of reusing cached outputs')
+    parser.add_argument('--cache-mb', type=float, default=None, help='evict cached outputs beyond this size')
+    parser.add_argument(
+        '--stream-mb', type=float, default=DEFAULT_STREAM_MB,
+        help='stream files of at least this size through mmap in bounded memory (default: %(default)s)',
+    )
+    parser.add_argument('--no-stream', action='store_true', help='always load whole files')
+    parser.add_argument(
+        '--io-workers', type=int, default=None,
+        help='read and write files concurrently on this many threads (sweeps over many files)',
+    )
+
+
+def stream_threshold(args):
+    """The ``stream_bytes`` for ``run`` from the ``--stream-mb``/``--no-stream`` options."""
+    if args.no_stream:
+        return None
+    return int(args.stream_mb * 1024 * 1024)
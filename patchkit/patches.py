@@ -0,0 +1,213 @@
+"""
+The repo-root patch scripts, expressed as registry entries.
+
+Groups are named after the script each entry came from, so
+``python -m patchkit update_pricing_files`` does what
+``update_pricing_files.py`` did. That script, ``update_checkout_and_email.py``
+and ``fix_preview_canvas.py`` now only call into the registry, so these
+entries are the one copy of their edits. ``fix.py`` and ``fix_mobile.py``
+are not registered: their sources are corrupted and their edits cannot be
+recovered. ``fix_upload.py`` is registered up to the point where its source
+breaks off.
+"""
+
+from .registry import Guard, PatchDef, block, literal, node, regex
+
+CHECKOUT = 'src/pages/Checkout.tsx'
+ORDER_DETAILS = 'src/components/orders/OrderDetails.tsx'
+ORDER_CONFIRMATION_EMAIL = 'src/emails/OrderConfirmation.tsx'
+BANNER_EDITOR_LAYOUT = 'src/components/design/BannerEditorLayout.tsx'
+PREVIEW_CANVAS = 'src/components/design/PreviewCanvas.tsx'
+ASSETS_PANEL = 'src/components/design/editor/AssetsPanel.tsx'
+
+ORDER_TOTALS = """{(() => {
+              // Calculate totals using unified pricing module
+              const totals = calculateOrderTotals(order.items);
+
+              return (
+                <>
+                  <div className="flex justify-between items-center">
+                    <span className="text-gray-700">Subtotal</span>
+                    <span className="text-gray-900">
+                      {usd(totals.subtotal_cents / 100)}
+                    </span>
+                  </div>
+                  <div className="flex justify-between items-center">
+                    <span className="text-gray-700">Tax (6%)</span>
+                    <span className="text-gray-900">
+                      {usd(totals.tax_cents / 100)}
+                    </span>
+                  </div>
+                  <div className="flex justify-between items-center border-t border-gray-200 pt-2">
+                    <span className="text-lg font-semibold text-gray-900">Total</span>
+                    <span className="text-xl font-bold text-gray-900">
+                      {usd(totals.total_cents / 100)}
+                    </span>
+                  </div>
+                </>
+              );
+            })()}"""
+
+PDF_RENDERING_SPINNER = '''        {/* PDF Rendering Spinner Overlay */}
+        {isRenderingPdf && (
+          <div className="absolute inset-0 bg-white/80 backdrop-blur-sm flex items-center justify-center z-50 rounded-2xl">
+            <div className="flex flex-col items-center gap-3">
+              <Loader2 className="h-8 w-8 text-purple-600 animate-spin" />
+              <p className="text-sm font-medium text-purple-700">Rendering PDF...</p>
+            </div>
+          </div>
+        )}'''
+
+EXISTING_SPINNER_END = '              <p className="text-sm font-medium text-blue-700">Processing file...</p>\n            </div>\n          </div>\n        )}'
+
+PATCHES = [
+    PatchDef(
+        'design-debug-logging', 'add_debug', 'src/pages/Design.tsx',
+        [
+            literal(
+                '''  const handleLetUsDesign = () => {
+    setDesignServiceMode(true);''',
+                '''  const handleLetUsDesign = () => {
+    console.log('🔥 handleLetUsDesign called - setting designServiceMode to true');
+    setDesignServiceMode(true);
+    console.log('🔥 designServiceMode state updated');''',
+            ),
+        ],
+        description='Log when "Let us design" switches on design service mode',
+    ),
+    PatchDef(
+        'banner-editor-design-service-mode', ('apply_changes', 'make_changes'), BANNER_EDITOR_LAYOUT,
+        [
+            literal(
+                '  onOpenAIModal?: () => void;\n}',
+                '  onOpenAIModal?: () => void;\n'
+                '  designServiceMode?: boolean;\n'
+                '  onDesignServiceModeChange?: (mode: boolean) => void;\n}',
+            ),
+            literal(
+                'const BannerEditorLayout: React.FC<BannerEditorLayoutProps> = ({ onOpenAIModal }) => {',
+                'const BannerEditorLayout: React.FC<BannerEditorLayoutProps> = ({ onOpenAIModal, designServiceMode: externalDesignServiceMode, onDesignServiceModeChange }) => {',
+            ),
+            literal(
+                '  const [designServiceMode, setDesignServiceMode] = useState(false);',
+                '  const [internalDesignServiceMode, setInternalDesignServiceMode] = useState(false);\n'
+                '  const designServiceMode = externalDesignServiceMode !== undefined ? externalDesignServiceMode : internalDesignServiceMode;\n'
+                '  const setDesignServiceMode = onDesignServiceModeChange || setInternalDesignServiceMode;',
+            ),
+        ],
+        guard=Guard(absent='externalDesignServiceMode'),
+        description='Let the parent control BannerEditorLayout design service mode',
+    ),
+    PatchDef(
+        'assets-panel-upload-errors', 'fix_upload', ASSETS_PANEL,
+        [
+            literal(
+                "import { Upload, X, Image as ImageIcon, Plus } from 'lucide-react';",
+                "import { Upload, X, Image as ImageIcon, Plus, AlertCircle, RefreshCw, Loader2 } from 'lucide-react';",
+            ),
+            regex(
+                r'(interface UploadedImage \{[^}]+\})',
+                r'\1' + '\n\ninterface UploadError {\n  message: string;\n  fileName: string;\n  canRetry: boolean;\n  retryFile?: File;\n}',
+            ),
+            literal(
+                'const [uploading, setUploading] = useState(false);',
+                'const [uploading, setUploading] = useState(false);\n  const [uploadError, setUploadError] = useState<UploadError | null>(null);',
+            ),
+        ],
+        guard=Guard(absent='uploadError'),
+        description='Upload error type and state for AssetsPanel',
+    ),
+    PatchDef(
+        'preview-canvas-pdf-spinner', 'fix_preview_canvas', PREVIEW_CANVAS,
+        [
+            node('interface:PreviewCanvasProps.isUploading', '\n  isRenderingPdf?: boolean;', 'after'),
+            node('props:PreviewCanvas.isUploading', '\n  isRenderingPdf = false,', 'after'),
+            literal(EXISTING_SPINNER_END, EXISTING_SPINNER_END + '\n' + PDF_RENDERING_SPINNER),
+            literal('imageUrl && !file?.isPdf &&', 'imageUrl &&'),
+            literal('!imageUrl && !file?.isPdf &&', '!imageUrl &&'),
+            regex(r'(?s)\s*{/\* PDF Preview Overlay \*/}.*?}\s*\)\s*}\s*</div>', '', safe=True),
+        ],
+        guard=Guard(absent='isRenderingPdf'),
+        description='Show a PDF rendering spinner instead of the PDF preview overlay',
+    ),
+    PatchDef(
+        'order-details-imports', 'update_pricing_files', ORDER_DETAILS,
+        [
+            literal(
+                "import { usd, formatDimensions, calculatePolePocketCostFromOrder, calculateUnitPriceFromOrder } from '@/lib/pricing';",
+                "import { usd } from '@/lib/pricing';\n"
+                "import { formatDimensions, calculateOrderTotals } from '@/lib/order-pricing';\n"
+                "import OrderItemBreakdown from './OrderItemBreakdown';",
+            ),
+        ],
+        description='Import the unified pricing module in OrderDetails',
+    ),
+    PatchDef(
+        'order-details-breakdown', 'update_pricing_files', ORDER_DETAILS,
+        [
+            block(
+                '{/* Cost Breakdown */}',
+                '{/* Cost Breakdown - Using Unified Pricing Module */}\n'
+                '                      <OrderItemBreakdown item={item} />',
+            ),
+        ],
+        guard=Guard(present='Price Breakdown</h5>'),
+        description='Replace the OrderDetails price breakdown with OrderItemBreakdown',
+    ),
+    PatchDef(
+        'order-details-totals', 'update_pricing_files', ORDER_DETAILS,
+        [
+            regex(r'(?s)\{\(\(\) => \{.*?\}\)\(\)\}', ORDER_TOTALS.replace('\\', '\\\\'), count=1),
+        ],
+        guard=Guard(present='Calculate correct subtotal and tax from line totals'),
+        description='Compute OrderDetails totals with calculateOrderTotals',
+    ),
+    PatchDef(
+        'checkout-breakdown-import', 'update_checkout_and_email', CHECKOUT,
+        [
+            literal(
+                "import { usd, formatDimensions, getFeatureFlags, getPricingOptions, computeTotals, PricingItem } from '@/lib/pricing';",
+                "import { usd, formatDimensions, getFeatureFlags, getPricingOptions, computeTotals, PricingItem } from '@/lib/pricing';\n"
+                "import OrderItemBreakdown from '@/components/orders/OrderItemBreakdown';",
+            ),
+        ],
+        guard=Guard(absent='OrderItemBreakdown'),
+        description='Import OrderItemBreakdown in Checkout',
+    ),
+    PatchDef(
+        'checkout-breakdown', 'update_checkout_and_email', CHECKOUT,
+        [
+            block(
+                '{/* Cost Breakdown */}',
+                '{/* Cost Breakdown - Using Unified Pricing Module */}\n'
+                '                          <OrderItemBreakdown item={item} variant="compact" />',
+            ),
+        ],
+        guard=Guard(present='<h4 className="text-sm font-medium text-gray-900 mb-2">Price Breakdown</h4>'),
+        description='Replace the Checkout price breakdown with OrderItemBreakdown',
+    ),
+    PatchDef(
+        'email-breakdown-import', 'update_checkout_and_email', ORDER_CONFIRMATION_EMAIL,
+        [
+            literal(
+                "} from '@react-email/components';",
+                "} from '@react-email/components';\n"
+                "import OrderItemBreakdownEmail from '@/components/orders/OrderItemBreakdownEmail';",
+            ),
+        ],
+        guard=Guard(absent='OrderItemBreakdownEmail'),
+        description='Import OrderItemBreakdownEmail in the order confirmation email',
+    ),
+    PatchDef(
+        'email-breakdown', 'update_checkout_and_email', ORDER_CONFIRMATION_EMAIL,
+        [
+            block(
+                '{/* Cost Breakdown - only show if we have the data */}',
+                '{/* Cost Breakdown - Using Unified Pricing Module */}\n'
+                '                        <OrderItemBreakdownEmail item={item} />',
+            ),
+        ],
+        guard=Guard(present='hasBreakdown && ('),
+        description='Replace the email price breakdown with OrderItemBreakdownEmail',
+    ),
+]
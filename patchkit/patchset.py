@@ -0,0 +1,232 @@
+"""
+Declared patch sets: named groups of edits against target files.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+
+from .conflicts import EditConflict, Span, compose, dedupe, find_conflicts
+from .engine import Edit, PatchResult, as_edit, find_matches
+from .guards import Guarded
+from .jsx import BlockEdit, locate_blocks
+from .patterns import RegexEdit
+from .report import EditStat
+from .tsx import NodeEdit, load_table
+
+
+class PatchSet:
+    """A named list of ``(path, edit)`` pairs; paths are relative to the repo root."""
+
+    def __init__(self, name, edits=()):
+        self.name = name
+        self.edits = []
+        for path, edit in edits:
+            self.add(path, edit)
+
+    def add(self, path, edit, guard=None):
+        """Add an edit for ``path``; with a ``Guard`` it only applies when the guard allows the file."""
+        if not isinstance(edit, (BlockEdit, RegexEdit, NodeEdit, Guarded)):
+            edit = as_edit(edit)
+        if guard is not None:
+            edit = Guarded(edit, guard)
+        self.edits.append((path, edit))
+        return self
+
+    def by_file(self):
+        """Edits grouped by target path, keeping declaration order."""
+        grouped = OrderedDict()
+        for path, edit in self.edits:
+            grouped.setdefault(path, []).append(edit)
+        return grouped
+
+    def __repr__(self):
+        return f'PatchSet({self.name!r}, {len(self.edits)} edits)'
+
+
+def group_by_file(patch_sets):
+    """Merge several patch sets into ``{path: [edit, ...]}``."""
+    grouped = OrderedDict()
+    for patch_set in patch_sets:
+        for path, edits in patch_set.by_file().items():
+            grouped.setdefault(path, []).extend(edits)
+    return grouped
+
+
+def group_origins(patch_sets):
+    """``{path: [patch set name, ...]}`` parallel to the edit lists of ``group_by_file``."""
+    grouped = OrderedDict()
+    for patch_set in patch_sets:
+        for path, edits in patch_set.by_file().items():
+            grouped.setdefault(path, []).extend([patch_set.name] * len(edits))
+    return grouped
+
+
+def patch_id(edits, origins=None):
+    """
+    Short stable hash of an edit list.
+
+    Identifies "these edits" in the manifest, so changing an anchor or a
+    replacement invalidates any record of the old definition. When the
+    edits come from more than one patch set, which set each came from is
+    hashed too, since that decides what counts as a conflict.
+    """
+    digest = hashlib.sha256()
+    for edit in edits:
+        for field in _edit_fields(edit):
+            digest.update(field.encode('utf-8'))
+            digest.update(b'\0')
+    if origins is not None and len(set(origins)) > 1:
+        for origin in origins:
+            digest.update(str(origin).encode('utf-8'))
+            digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+def _edit_fields(edit):
+    if isinstance(edit, Guarded):
+        return _edit_fields(edit.edit) + edit.guard.fields()
+    if isinstance(edit, BlockEdit):
+        return ('block', edit.marker, edit.replacement)
+    if isinstance(edit, NodeEdit):
+        return ('node', edit.query, edit.text, edit.position)
+    if isinstance(edit, RegexEdit):
+        return (
+            'regex', edit.pattern, edit.replacement, str(edit.flags), str(edit.count),
+            repr(sorted(edit.options.items())),
+        )
+    return ('edit', edit.anchor, edit.replacement)
+
+
+def edit_label(edit):
+    """The anchor, marker or pattern that identifies an edit in reports."""
+    if isinstance(edit, Guarded):
+        return edit_label(edit.edit)
+    if isinstance(edit, BlockEdit):
+        return edit.marker
+    if isinstance(edit, NodeEdit):
+        return edit.label
+    if isinstance(edit, RegexEdit):
+        return edit.pattern
+    return edit.anchor
+
+
+def apply_patch(content, edits, stats=None, origins=None):
+    """
+    Apply a mix of ``Edit``s, ``RegexEdit``s, ``BlockEdit``s and ``NodeEdit``s to one file.
+
+    Every edit is first resolved to spans of the original ``content``:
+    literal edits through the single-pass engine (one pass per origin, so
+    overlapping anchors declared together still resolve leftmost-longest),
+    regex edits in declaration order, and block edits against one JSX scan.
+    Guards are checked against ``content`` before anything runs. Spans that
+    overlap raise ``EditConflict`` and nothing is applied; otherwise all of
+    them are spliced in one pass.
+
+    ``origins`` names the patch set each edit came from (see
+    ``group_origins``) for conflict messages. If ``stats`` is a list, an
+    ``EditStat`` is appended for every edit and for each shared pass.
+    """
+    if origins is None:
+        origins = [None] * len(edits)
+    active = []
+    for edit, origin in zip(edits, origins):
+        if isinstance(edit, Guarded):
+            if not edit.guard.allows(content):
+                if stats is not None:
+                    stats.append(EditStat('guarded', edit_label(edit), 0, 0))
+                continue
+            edit = edit.edit
+        active.append((edit, origin))
+
+    spans = []
+    counts = {}
+    literal = OrderedDict()
+    for edit, origin in active:
+        if isinstance(edit, Edit):
+            literal.setdefault(origin, []).append(edit)
+    if literal:
+        started = time.perf_counter()
+        literal_counts = {}
+        literal_spans = []
+        for origin, group in literal.items():
+            replacements = {edit.anchor: edit.replacement for edit in group}
+            for anchor in replacements:
+                literal_counts.setdefault(anchor, 0)
+            for start, end, anchor in find_matches(content, group):
+                literal_counts[anchor] += 1
+                literal_spans.append(Span(start, end, replacements[anchor], 'literal', anchor, origin))
+        spans.extend(literal_spans)
+        counts.update(literal_counts)
+        if stats is not None:
+            _literal_stats(stats, literal, literal_counts, literal_spans, time.perf_counter() - started)
+
+    for edit, origin in active:
+        if not isinstance(edit, RegexEdit):
+            continue
+        started = time.perf_counter()
+        found = edit.spans(content)
+        spans.extend(Span(start, end, text, 'regex', edit.pattern, origin) for start, end, text in found)
+        counts[edit.pattern] = len(found)
+        if stats is not None:
+            stats.append(EditStat(
+                'regex', edit.pattern, len(found), _delta(found), time.perf_counter() - started,
+            ))
+
+    blocks = [(edit, origin) for edit, origin in active if isinstance(edit, BlockEdit)]
+    if blocks:
+        started = time.perf_counter()
+        located, block_counts = locate_blocks(content, [edit for edit, _ in blocks])
+        origin_of = {id(edit): origin for edit, origin in blocks}
+        found = [(start, end, block.replacement) for block, start, end in located]
+        spans.extend(
+            Span(start, end, block.replacement, 'block', block.marker, origin_of[id(block)])
+            for block, start, end in located
+        )
+        counts.update(block_counts)
+        if stats is not None:
+            stats.append(EditStat(
+                'jsx', f'{len(blocks)} block edits', sum(block_counts.values()), _delta(found),
+                time.perf_counter() - started,
+            ))
+            sizes = {block.marker: len(block.replacement) - (end - start) for block, start, end in located}
+            for block, _ in blocks:
+                stats.append(EditStat('block', block.marker, block_counts[block.marker], sizes.get(block.marker, 0)))
+
+    nodes = [(edit, origin) for edit, origin in active if isinstance(edit, NodeEdit)]
+    if nodes:
+        started = time.perf_counter()
+        # One table for every structural edit, parsed only on a cache miss.
+        table = load_table(content)
+        node_stats = []
+        for edit, origin in nodes:
+            found = edit.spans(table, content)
+            spans.extend(Span(start, end, text, 'node', edit.label, origin) for start, end, text in found)
+            counts[edit.label] = len(found)
+            node_stats.append(EditStat('node', edit.label, len(found), _delta(found)))
+        if stats is not None:
+            stats.append(EditStat(
+                'tsx', f'{len(nodes)} node edits', sum(stat.matches for stat in node_stats),
+                sum(stat.size_delta for stat in node_stats), time.perf_counter() - started,
+            ))
+            stats.extend(node_stats)
+
+    spans = dedupe(spans)
+    conflicts = find_conflicts(spans)
+    if conflicts:
+        raise EditConflict(conflicts)
+    return PatchResult(compose(content, spans), counts, content)
+
+
+def _delta(found):
+    return sum(len(text) - (end - start) for start, end, text in found)
+
+
+def _literal_stats(stats, literal, counts, spans, seconds):
+    stats.append(EditStat(
+        'engine', f'{sum(map(len, literal.values()))} literal edits', len(spans),
+        sum(len(span.replacement) - (span.end - span.start) for span in spans), seconds,
+    ))
+    replacements = {edit.anchor: edit.replacement for group in literal.values() for edit in group}
+    for anchor, matches in counts.items():
+        stats.append(EditStat('literal', anchor, matches, matches * (len(replacements[anchor]) - len(anchor))))
@@ -0,0 +1,11 @@
+"""
+Locations shared by the patchkit modules.
+
+Deliberately imports nothing from the package, so modules that only need
+a path (the anchor index, the cache, the benchmark) do not load the runner
+and the engine with it.
+"""
+
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,228 @@
+"""
+Bounded-time regex edits.
+
+Patterns such as ``\\s*{/\\* PDF Preview Overlay \\*/}.*?}\\s*\\)...`` with
+``re.DOTALL`` can backtrack for a long time over a large file that does not
+contain a match. This module layers three guards over ``re``:
+
+* a process-wide cache of compiled patterns;
+* a literal prefilter: the longest mandatory literal in the pattern is
+  checked with ``str.find`` first, and the regex is skipped entirely when it
+  is missing;
+* a wall-clock budget per call. When it runs out a ``PatternTimeout`` is
+  raised instead of letting the run hang.
+
+``safe=True`` additionally rewrites unbounded lazy ``.*?``/``.+?`` into
+``.{0,max_span}?`` so the amount of backtracking per offset is bounded.
+"""
+
+import re
+import signal
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+DEFAULT_BUDGET = 2.0
+DEFAULT_MAX_SPAN = 10_000
+MIN_PREFILTER_LENGTH = 3
+
+
+class PatternTimeout(RuntimeError):
+    """A regex edit exceeded its time budget."""
+
+
+def required_literal(pattern, flags=0):
+    """
+    Longest run of literal characters every match of ``pattern`` must contain.
+
+    Only top-level literals are considered, so anything inside an optional
+    group or alternation is ignored. Returns ``None`` when no run of at least
+    ``MIN_PREFILTER_LENGTH`` characters exists or the pattern is
+    case-insensitive.
+    """
+    if flags & re.IGNORECASE:
+        return None
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+
+    best = ''
+    run = []
+    for op, arg in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(arg))
+            continue
+        if len(run) > len(best):
+            best = ''.join(run)
+        run = []
+    if len(run) > len(best):
+        best = ''.join(run)
+    return best if len(best) >= MIN_PREFILTER_LENGTH else None
+
+
+def bound_lazy_dots(pattern, max_span=DEFAULT_MAX_SPAN):
+    """
+    Rewrite ``.*?`` / ``.+?`` into ``.{0,N}?`` / ``.{1,N}?``.
+
+    Only a ``.`` that is a wildcard is rewritten. Escapes are copied as
+    they are (``\\.*?`` is a literal dot, while in ``\\\\.*?`` the dot is
+    a wildcard after an escaped backslash), and so are character classes
+    such as ``[.*?]``.
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            out.append(pattern[i:i + 2])
+            i += 2
+        elif char == '[':
+            end = _class_end(pattern, i)
+            out.append(pattern[i:end])
+            i = end
+        elif char == '.' and pattern[i + 1:i + 2] in ('*', '+') and pattern[i + 2:i + 3] == '?':
+            out.append('.{%d,%d}?' % (0 if pattern[i + 1] == '*' else 1, max_span))
+            i += 3
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out)
+
+
+def _class_end(pattern, start):
+    # Offset just past the character class opening at ``start``. A ``]``
+    # right after ``[`` or ``[^`` is a member, not the end.
+    i = start + 1
+    if pattern[i:i + 1] == '^':
+        i += 1
+    if pattern[i:i + 1] == ']':
+        i += 1
+    while i < len(pattern):
+        if pattern[i] == '\\':
+            i += 2
+        elif pattern[i] == ']':
+            return i + 1
+        else:
+            i += 1
+    return len(pattern)
+
+
+class SafePattern:
+    """A compiled pattern with its literal prefilter and time budget."""
+
+    __slots__ = ('pattern', 'flags', 'regex', 'literal', 'budget')
+
+    def __init__(self, pattern, flags=0, literal=None, budget=DEFAULT_BUDGET, safe=False, max_span=DEFAULT_MAX_SPAN):
+        self.pattern = pattern
+        self.flags = flags
+        self.literal = literal if literal is not None else required_literal(pattern, flags)
+        self.budget = budget
+        self.regex = re.compile(bound_lazy_dots(pattern, max_span) if safe else pattern, flags)
+
+    def may_match(self, content):
+        return self.literal is None or self.literal in content
+
+    def search(self, content):
+        if not self.may_match(content):
+            return None
+        with _deadline(self.budget, self.pattern):
+            return self.regex.search(content)
+
+    def subn(self, repl, content, count=0):
+        if not self.may_match(content):
+            return content, 0
+        with _deadline(self.budget, self.pattern):
+            return self.regex.subn(repl, content, count)
+
+    def sub(self, repl, content, count=0):
+        return self.subn(repl, content, count)[0]
+
+    def spans(self, repl, content, count=0):
+        """``(start, end, replacement)`` for each match ``subn`` would substitute, without substituting."""
+        if not self.may_match(content):
+            return []
+        found = []
+        with _deadline(self.budget, self.pattern):
+            for match in self.regex.finditer(content):
+                found.append((match.start(), match.end(), repl(match) if callable(repl) else match.expand(repl)))
+                if count and len(found) == count:
+                    break
+        return found
+
+    def __repr__(self):
+        return f'SafePattern({self.pattern!r})'
+
+
+@lru_cache(maxsize=512)
+def compile_pattern(pattern, flags=0, literal=None, budget=DEFAULT_BUDGET, safe=False, max_span=DEFAULT_MAX_SPAN):
+    """Compile (or fetch from the process-wide cache) a ``SafePattern``."""
+    return SafePattern(pattern, flags, literal, budget, safe, max_span)
+
+
+def sub(pattern, repl, content, flags=0, **options):
+    """``re.sub`` with the prefilter and time budget applied."""
+    return compile_pattern(pattern, flags, **options).sub(repl, content)
+
+
+@contextmanager
+def _deadline(seconds, label):
+    # ``_sre`` checks for pending signals while it backtracks, so SIGALRM can
+    # interrupt a runaway match. Timers only work on the main thread of a
+    # process; elsewhere the prefilter and ``safe`` bound are the only guard.
+    if (
+        not seconds
+        or not hasattr(signal, 'setitimer')
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def on_timeout(signum, frame):
+        raise PatternTimeout(f'Pattern exceeded its {seconds:g}s budget: {label[:80]!r}')
+
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class RegexEdit:
+    """
+    Replace matches of a pattern (all of them, or the first ``count``).
+
+    See ``SafePattern`` for the guards applied to every call.
+    """
+
+    __slots__ = ('pattern', 'replacement', 'flags', 'count', 'options')
+
+    def __init__(self, pattern, replacement, flags=0, count=0, **options):
+        self.pattern = pattern
+        self.replacement = replacement
+        self.flags = flags
+        self.count = count
+        self.options = options
+
+    def compiled(self):
+        return compile_pattern(self.pattern, self.flags, **self.options)
+
+    def apply(self, content):
+        """Return ``(new_content, match_count)``."""
+        return self.compiled().subn(self.replacement, content, self.count)
+
+    def spans(self, content):
+        """Return ``[(start, end, replacement), ...]`` for the matches in ``content``."""
+        return self.compiled().spans(self.replacement, content, self.count)
+
+    def __repr__(self):
+        return f'RegexEdit({self.pattern!r})'
@@ -0,0 +1,587 @@
+"""
+Bulk verification of stored order prices against the TypeScript pricing rules.
+
+``update_pricing_files.py`` moved OrderDetails, Checkout and the
+confirmation email onto ``calculateOrderTotals`` from
+``src/lib/order-pricing.ts``, but nothing re-checks the orders already
+stored. This module loads an order export into NumPy columns and recomputes
+every item's line, rope, pole pocket and grommet cents and every order's
+discount, tax and total in whole-array operations, then reports where the
+stored numbers disagree.
+
+JavaScript numbers are IEEE doubles, so the columns are ``float64`` and each
+formula multiplies in the same order as the TypeScript; ``js_round`` is
+``Math.round`` (halves round up). The results match the TypeScript to the
+cent, which ``--golden`` checks against fixtures that
+``src/lib/__tests__/orderPricingGolden.test.ts`` keeps in step with
+``order-pricing.ts`` and ``bannerPricingEngine.ts``.
+
+Exports:
+    JSON   a list of orders, or ``{"orders": [...]}``; each order has ``id``,
+           the stored ``subtotal_cents``/``tax_cents``/``total_cents``, an
+           optional ``promo`` (``{code, discountPercentage,
+           discountAmountCents}``) and ``items`` with the ``order_items``
+           columns (``width_in``, ``quantity``, ``unit_price_cents``, ...).
+    JSONL  one such order per line.
+    CSV    one row per item with ``order_id``, the item columns and the
+           order's ``order_subtotal_cents``, ``order_tax_cents``,
+           ``order_total_cents``, ``promo_percentage`` and
+           ``promo_amount_cents`` (an ``order_items JOIN orders`` dump).
+
+Usage:
+    python -m patchkit.pricing EXPORT [EXPORT ...] [--skip CHECK] [--limit N] [--report FILE]
+    python -m patchkit.pricing --golden [--fixtures FILE]
+
+Needs NumPy (``pip install numpy``), unlike the rest of patchkit, which is
+standard library only.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # only this module needs it; main() says so
+    np = None
+
+from .paths import REPO_ROOT
+
+DEFAULT_FIXTURES = os.path.join(REPO_ROOT, 'src', 'lib', '__tests__', 'fixtures', 'order-pricing-golden.json')
+
+# The banner product config in src/lib/products/registry.ts; the golden
+# fixtures fail if these drift from it.
+TAX_RATE = 0.06
+ROPE_PRICE_PER_FOOT_CENTS = 200
+POLE_POCKET_SETUP_FEE_CENTS = 1500
+POLE_POCKET_PRICE_PER_LINEAR_FOOT_CENTS = 200
+MINIMUM_UNIT_PRICE_CENTS = 2000
+MATERIAL_PRICE_MAP = {'13oz': 4.5, '15oz': 6.0, '18oz': 7.5, 'mesh': 6.0}
+DEFAULT_MATERIAL = '13oz'
+# src/lib/quantity-discount.ts
+QUANTITY_TIER_MINIMUMS = (1.0, 2.0, 3.0, 4.0, 5.0)
+QUANTITY_TIER_RATES = (0.0, 0.05, 0.07, 0.10, 0.13)
+
+# Pole pocket positions, as the two pricing modules tell them apart.
+POCKETS_NONE = 0
+POCKETS_WIDTH = 1      # top or bottom: one width
+POCKETS_BOTH = 2       # top-bottom: two widths
+POCKETS_HEIGHT = 3     # left or right: one height in the quote engine, nothing in order-pricing
+POCKETS_OTHER = 4      # any other truthy value, e.g. the old BOOLEAN column: setup fee only
+_POCKET_CODES = {'top': POCKETS_WIDTH, 'bottom': POCKETS_WIDTH, 'top-bottom': POCKETS_BOTH,
+                 'left': POCKETS_HEIGHT, 'right': POCKETS_HEIGHT}
+
+ROPE_WIDTH = 1
+ROPE_BOTH = 2
+_ROPE_CODES = {'top': ROPE_WIDTH, 'bottom': ROPE_WIDTH, 'top-bottom': ROPE_BOTH}
+
+CHECKS = ('unit_price', 'rope', 'pole_pocket', 'grommets', 'line_total', 'subtotal', 'tax', 'total')
+
+
+def js_round(values):
+    """``Math.round`` over an array: the nearest integer, halves towards +infinity."""
+    floor = np.floor(values)
+    # ``values - floor`` is exact, unlike ``floor(values + 0.5)``, which
+    # rounds 0.49999999999999994 up.
+    return floor + (values - floor >= 0.5)
+
+
+def quantity_discount_rate(quantity):
+    """``getQuantityDiscountRate``: the highest tier at or below each quantity, 0 below 1."""
+    tier = np.searchsorted(QUANTITY_TIER_MINIMUMS, quantity, side='right') - 1
+    return np.where(quantity >= 1, np.asarray(QUANTITY_TIER_RATES)[np.maximum(tier, 0)], 0.0)
+
+
+def _number(value):
+    # Missing, null and unparsable values become NaN, which every formula
+    # below treats as JavaScript treats ``undefined``.
+    if value is None or value == '' or isinstance(value, bool):
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _column(values):
+    # numpy already reads None as NaN and numeric strings as numbers, so only
+    # a column holding blanks, booleans or junk is converted value by value.
+    if not any(isinstance(value, bool) for value in values):
+        try:
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            pass
+    return np.array([_number(value) for value in values], dtype=np.float64)
+
+
+def _pocket_code(value):
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ('', 'none', 'false', 'f'):
+            return POCKETS_NONE
+        if lowered in ('true', 't'):
+            return POCKETS_OTHER
+        return _POCKET_CODES.get(lowered, POCKETS_OTHER)
+    return POCKETS_OTHER if value else POCKETS_NONE
+
+
+def _per_item(mode):
+    # ``(mode || 'per_item') === 'per_item'``
+    return not mode or mode == 'per_item'
+
+
+class OrderExport:
+    """An order export as columns: one entry per item, plus per-order arrays indexed by ``order_index``."""
+
+    ITEM_NUMBERS = (
+        'width_in', 'height_in', 'quantity', 'unit_price_cents', 'rope_feet', 'rope_cost_cents',
+        'pole_pocket_cost_cents', 'poles_quantity', 'poles_unit_price_cents', 'poles_total_cents',
+        'line_total_cents', 'grommets_cost_cents',
+    )
+    ORDER_NUMBERS = ('subtotal_cents', 'tax_cents', 'total_cents', 'promo_percentage', 'promo_amount_cents')
+
+    def __init__(self, order_ids, order_index, items, orders, material_rate, pockets, rope_per_item, pockets_per_item):
+        self.order_ids = order_ids
+        self.order_index = order_index
+        self.items = items
+        self.orders = orders
+        self.material_rate = material_rate
+        self.pockets = pockets
+        self.rope_per_item = rope_per_item
+        self.pockets_per_item = pockets_per_item
+
+    def __len__(self):
+        return len(self.order_index)
+
+    @classmethod
+    def from_orders(cls, orders):
+        """Build the columns from order dicts shaped like the JSON export."""
+        order_ids = []
+        totals = {name: [] for name in cls.ORDER_NUMBERS}
+        counts = []
+        flat = []
+        for order in orders:
+            index = len(order_ids)
+            order_ids.append(str(order.get('id', index)))
+            promo = order.get('promo') or {}
+            totals['subtotal_cents'].append(order.get('subtotal_cents'))
+            totals['tax_cents'].append(order.get('tax_cents'))
+            totals['total_cents'].append(order.get('total_cents'))
+            totals['promo_percentage'].append(promo.get('discountPercentage', order.get('promo_percentage')))
+            totals['promo_amount_cents'].append(promo.get('discountAmountCents', order.get('promo_amount_cents')))
+            order_items = order.get('items') or ()
+            counts.append(len(order_items))
+            flat.extend(order_items)
+        # A column at a time: one comprehension to gather it and one
+        # conversion, rather than a dozen calls per item.
+        default_rate = MATERIAL_PRICE_MAP[DEFAULT_MATERIAL]
+        return cls(
+            order_ids,
+            np.repeat(np.arange(len(order_ids), dtype=np.int64), counts),
+            {name: _column([item.get(name) for item in flat]) for name in cls.ITEM_NUMBERS},
+            {name: _column(values) for name, values in totals.items()},
+            np.array([MATERIAL_PRICE_MAP.get(item.get('material'), default_rate) for item in flat], dtype=np.float64),
+            np.array([_pocket_code(item.get('pole_pockets')) for item in flat], dtype=np.int8),
+            np.array([_per_item(item.get('rope_pricing_mode')) for item in flat], dtype=bool),
+            np.array([_per_item(item.get('pole_pocket_pricing_mode')) for item in flat], dtype=bool),
+        )
+
+
+def _csv_orders(path):
+    # Rows are grouped by order id in first-seen order, so an order's items
+    # are contiguous however the dump was sorted.
+    orders = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            order_id = row.get('order_id') or row.get('id')
+            order = orders.get(order_id)
+            if order is None:
+                order = orders[order_id] = {
+                    'id': order_id,
+                    'subtotal_cents': row.get('order_subtotal_cents'),
+                    'tax_cents': row.get('order_tax_cents'),
+                    'total_cents': row.get('order_total_cents'),
+                    'promo_percentage': row.get('promo_percentage'),
+                    'promo_amount_cents': row.get('promo_amount_cents'),
+                    'items': [],
+                }
+            order['items'].append(row)
+    return orders.values()
+
+
+def _json_orders(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('orders', [])
+    if not isinstance(data, list):
+        raise ValueError(f'expected a list of orders or {{"orders": [...]}}, found {type(data).__name__}')
+    return data
+
+
+def _jsonl_orders(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _checked(orders):
+    # JSON exports can hold any shape; anything ``from_orders`` cannot read
+    # is a ValueError, reported like any other unreadable export.
+    for number, order in enumerate(orders, 1):
+        if not isinstance(order, dict):
+            raise ValueError(f'order {number} is a {type(order).__name__}, not an object')
+        items = order.get('items')
+        if items and not (isinstance(items, list) and all(isinstance(item, dict) for item in items)):
+            raise ValueError(f'order {number}: items must be a list of objects')
+        promo = order.get('promo')
+        if promo and not isinstance(promo, dict):
+            raise ValueError(f'order {number}: promo must be an object')
+        yield order
+
+
+def load_export(path):
+    """
+    Read a JSON, JSONL (``.jsonl``/``.ndjson``) or CSV export into an ``OrderExport``.
+
+    Raises ``OSError``, ``csv.Error`` or ``ValueError`` (also for a JSON
+    export of the wrong shape) when the file cannot be read as an export.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        orders = _csv_orders(path)
+    elif extension in ('.jsonl', '.ndjson'):
+        orders = _jsonl_orders(path)
+    else:
+        orders = _json_orders(path)
+    return OrderExport.from_orders(_checked(orders))
+
+
+def price_items(export):
+    """
+    ``getItemPricingBreakdown`` for every item, plus the rope and pole pocket formulas on their own.
+
+    The breakdown takes a stored component cost over the formula, as
+    ``order-pricing.ts`` does; ``rope_formula``/``pole_pocket_formula`` are
+    what the formula alone gives, to check the stored costs against.
+    """
+    items = export.items
+    quantity = items['quantity']
+    unit_price = items['unit_price_cents']
+    base = np.where(np.isnan(unit_price), 0.0, unit_price * quantity)
+
+    rope_feet = np.nan_to_num(items['rope_feet'])
+    rope_formula = np.where(
+        rope_feet != 0,
+        js_round(rope_feet * ROPE_PRICE_PER_FOOT_CENTS * np.where(export.rope_per_item, quantity, 1.0)),
+        0.0,
+    )
+    rope = np.where(np.isnan(items['rope_cost_cents']), rope_formula, items['rope_cost_cents'])
+
+    width_feet = items['width_in'] / 12
+    linear_feet = np.select(
+        [export.pockets == POCKETS_WIDTH, export.pockets == POCKETS_BOTH], [width_feet, width_feet * 2], 0.0,
+    )
+    linear_cost = js_round(linear_feet * POLE_POCKET_PRICE_PER_LINEAR_FOOT_CENTS)
+    pole_pocket_formula = np.where(
+        export.pockets != POCKETS_NONE,
+        (POLE_POCKET_SETUP_FEE_CENTS + linear_cost) * np.where(export.pockets_per_item, quantity, 1.0),
+        0.0,
+    )
+    pole_pocket = np.where(
+        np.isnan(items['pole_pocket_cost_cents']), pole_pocket_formula, items['pole_pocket_cost_cents'],
+    )
+
+    poles_quantity = np.nan_to_num(items['poles_quantity'])
+    poles_formula = np.where(poles_quantity != 0, np.nan_to_num(items['poles_unit_price_cents']) * poles_quantity, 0.0)
+    poles = np.where(np.isnan(items['poles_total_cents']), poles_formula, items['poles_total_cents'])
+
+    return {
+        'base_banner_cents': base,
+        'rope_cents': rope,
+        'pole_pocket_cents': pole_pocket,
+        'poles_cents': poles,
+        'subtotal_cents': base + rope + pole_pocket + poles,
+        'rope_formula': rope_formula,
+        'pole_pocket_formula': pole_pocket_formula,
+        # bannerPricingEngine.ts: grommets are included in the base price.
+        'grommets_cents': np.zeros(len(export)),
+        'quote_unit_price_cents': quote_unit_price(items['width_in'], items['height_in'], export.material_rate),
+    }
+
+
+def price_orders(export, priced):
+    """``calculateOrderTotals`` for every order (best discount wins, then 6% tax)."""
+    count = len(export.order_ids)
+    subtotal = np.bincount(export.order_index, weights=priced['subtotal_cents'], minlength=count)
+    quantity = np.bincount(export.order_index, weights=export.items['quantity'], minlength=count)
+
+    quantity_discount = js_round(subtotal * quantity_discount_rate(quantity))
+    percentage = np.nan_to_num(export.orders['promo_percentage'])
+    amount = np.nan_to_num(export.orders['promo_amount_cents'])
+    promo_discount = np.select(
+        [percentage != 0, amount != 0], [js_round(subtotal * (percentage / 100)), np.minimum(amount, subtotal)], 0.0,
+    )
+    has_quantity = quantity_discount > 0
+    has_promo = promo_discount > 0
+    use_quantity = has_quantity & (~has_promo | (quantity_discount >= promo_discount))
+    applied = np.where(use_quantity, quantity_discount, np.where(has_promo, promo_discount, 0.0))
+
+    after = subtotal - applied
+    tax = js_round(after * TAX_RATE)
+    return {
+        'subtotal_cents': subtotal,
+        'total_quantity': quantity,
+        'applied_discount_type': np.where(use_quantity, 'quantity', np.where(has_promo, 'promo', 'none')),
+        'applied_discount_cents': applied,
+        'quantity_discount_cents': quantity_discount,
+        'subtotal_after_discount_cents': after,
+        'tax_cents': tax,
+        'total_cents': after + tax,
+    }
+
+
+def quote_unit_price(width_in, height_in, material_rate):
+    """``unitBasePriceCents`` of ``calculateBannerPricing``: area times material rate, at least the minimum."""
+    width = np.maximum(0.0, np.nan_to_num(width_in))
+    height = np.maximum(0.0, np.nan_to_num(height_in))
+    area = (width * height) / 144
+    unit = np.maximum(MINIMUM_UNIT_PRICE_CENTS, js_round(area * material_rate * 100))
+    return np.where((width > 0) & (height > 0), unit, 0.0)
+
+
+def quote_banners(width_in, height_in, quantity, material_rate, add_rope, rope_placement, pockets):
+    """``calculateBannerPricing`` over arrays of quote inputs; returns its cent fields."""
+    width = np.maximum(0.0, np.nan_to_num(width_in))
+    height = np.maximum(0.0, np.nan_to_num(height_in))
+    raw_quantity = np.nan_to_num(quantity)
+    count = np.maximum(1.0, np.floor(np.where(raw_quantity != 0, raw_quantity, 1.0)))
+    sized = (width > 0) & (height > 0)
+
+    unit = quote_unit_price(width, height, material_rate)
+    base = unit * count
+
+    rope_feet = np.where(rope_placement == ROPE_BOTH, (width / 12) * 2, width / 12)
+    rope_feet = np.where(sized & add_rope, rope_feet, 0.0)
+    rope = np.where(add_rope, js_round(rope_feet * count * ROPE_PRICE_PER_FOOT_CENTS), 0.0)
+
+    pocket_feet = np.select(
+        [pockets == POCKETS_WIDTH, pockets == POCKETS_HEIGHT, pockets == POCKETS_BOTH],
+        [width / 12, height / 12, (width / 12) * 2],
+        0.0,
+    )
+    pocket_feet = np.where(sized, pocket_feet, 0.0)
+    has_pockets = pocket_feet > 0
+    pole_pocket = np.where(has_pockets, POLE_POCKET_SETUP_FEE_CENTS, 0.0) + np.where(
+        has_pockets, js_round(pocket_feet * count * POLE_POCKET_PRICE_PER_LINEAR_FOOT_CENTS), 0.0,
+    )
+
+    before = base + rope + pole_pocket
+    discount = js_round(before * quantity_discount_rate(count))
+    subtotal = before - discount
+    tax = js_round(subtotal * TAX_RATE)
+    return {
+        'unitBasePriceCents': unit,
+        'baseBannerPriceCents': base,
+        'grommetsCostCents': np.zeros(len(width)),
+        'ropeCostCents': rope,
+        'polePocketCostCents': pole_pocket,
+        'subtotalBeforeDiscountCents': before,
+        'quantityDiscountCents': discount,
+        'subtotalCents': subtotal,
+        'taxCents': tax,
+        'totalCents': subtotal + tax,
+    }
+
+
+class Mismatches:
+    """Rows where a stored value disagrees with the recomputed one, for one check."""
+
+    __slots__ = ('check', 'level', 'rows', 'stored', 'expected')
+
+    def __init__(self, check, level, rows, stored, expected):
+        self.check = check
+        self.level = level
+        self.rows = rows
+        self.stored = stored
+        self.expected = expected
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def _compare(check, level, stored, expected, where=None):
+    present = ~np.isnan(stored)
+    if where is not None:
+        present &= where
+    rows = np.flatnonzero(present & (stored != expected))
+    return Mismatches(check, level, rows, stored[rows], expected[rows])
+
+
+def verify(export, skip=()):
+    """Recompute ``export`` and return a ``Mismatches`` per check (``CHECKS`` minus ``skip``)."""
+    priced = price_items(export)
+    totals = price_orders(export, priced)
+    items = export.items
+    sized = (np.nan_to_num(items['width_in']) > 0) & (np.nan_to_num(items['height_in']) > 0)
+    comparisons = {
+        'unit_price': lambda: _compare(
+            'unit_price', 'item', items['unit_price_cents'], priced['quote_unit_price_cents'], sized,
+        ),
+        'rope': lambda: _compare('rope', 'item', items['rope_cost_cents'], priced['rope_formula']),
+        'pole_pocket': lambda: _compare(
+            'pole_pocket', 'item', items['pole_pocket_cost_cents'], priced['pole_pocket_formula'],
+        ),
+        'grommets': lambda: _compare('grommets', 'item', items['grommets_cost_cents'], priced['grommets_cents']),
+        'line_total': lambda: _compare('line_total', 'item', items['line_total_cents'], priced['subtotal_cents']),
+        'subtotal': lambda: _compare('subtotal', 'order', export.orders['subtotal_cents'], totals['subtotal_cents']),
+        'tax': lambda: _compare('tax', 'order', export.orders['tax_cents'], totals['tax_cents']),
+        'total': lambda: _compare('total', 'order', export.orders['total_cents'], totals['total_cents']),
+    }
+    return [comparisons[check]() for check in CHECKS if check not in skip]
+
+
+def _item_numbers(export):
+    # 1-based position of each item within its order.
+    starts = np.flatnonzero(np.r_[True, export.order_index[1:] != export.order_index[:-1]])
+    first = np.repeat(starts, np.diff(np.r_[starts, len(export)]))
+    return np.arange(len(export)) - first + 1
+
+
+def _cents(value):
+    if isinstance(value, str):
+        return value
+    return f'{value:.0f}' if float(value).is_integer() else f'{value:g}'
+
+
+def print_mismatches(export, results, limit=20, out=sys.stdout):
+    numbers = _item_numbers(export) if len(export) else None
+    for result in results:
+        icon = '✅' if not len(result) else '❌'
+        print(f'{icon} {result.check:<12} {len(result):>10} mismatches', file=out)
+        for row, stored, expected in list(zip(result.rows, result.stored, result.expected))[:limit]:
+            if result.level == 'item':
+                where = f'order {export.order_ids[export.order_index[row]]} item {numbers[row]}'
+            else:
+                where = f'order {export.order_ids[row]}'
+            print(f'     {where}: stored {_cents(stored)}, expected {_cents(expected)}', file=out)
+        if len(result) > limit:
+            print(f'     ... {len(result) - limit} more', file=out)
+
+
+def mismatch_report(export, results):
+    numbers = _item_numbers(export) if len(export) else None
+    report = {'items': len(export), 'orders': len(export.order_ids), 'checks': {}}
+    for result in results:
+        rows = []
+        for row, stored, expected in zip(result.rows, result.stored, result.expected):
+            entry = {'stored': float(stored), 'expected': float(expected)}
+            if result.level == 'item':
+                entry['order'] = export.order_ids[export.order_index[row]]
+                entry['item'] = int(numbers[row])
+            else:
+                entry['order'] = export.order_ids[row]
+            rows.append(entry)
+        report['checks'][result.check] = {'mismatches': len(result), 'rows': rows}
+    return report
+
+
+def check_golden(path=DEFAULT_FIXTURES, out=sys.stdout):
+    """Compare this module's arithmetic with the TypeScript-produced fixtures; returns the number of disagreements."""
+    with open(path, encoding='utf-8') as f:
+        fixtures = json.load(f)
+    problems = 0
+
+    orders = fixtures['orders']
+    export = OrderExport.from_orders(orders)
+    priced = price_items(export)
+    totals = price_orders(export, priced)
+    row = 0
+    for index, order in enumerate(orders):
+        for expected in order['expected']['items']:
+            for field, value in expected.items():
+                if priced[field][row] != value:
+                    problems += 1
+                    print(f'❌ {order["id"]} item {field}: got {_cents(priced[field][row])}, want {value}', file=out)
+            row += 1
+        for field, value in order['expected']['totals'].items():
+            if totals[field][index] != value:
+                problems += 1
+                print(f'❌ {order["id"]} {field}: got {_cents(totals[field][index])}, want {value}', file=out)
+
+    banners = [case['input'] for case in fixtures['banners']]
+    quoted = quote_banners(
+        np.array([_number(b.get('widthIn')) for b in banners]),
+        np.array([_number(b.get('heightIn')) for b in banners]),
+        np.array([_number(b.get('quantity')) for b in banners]),
+        np.array([MATERIAL_PRICE_MAP.get(b.get('material'), MATERIAL_PRICE_MAP[DEFAULT_MATERIAL]) for b in banners]),
+        np.array([bool(b.get('addRope')) for b in banners]),
+        np.array([_ROPE_CODES.get(b.get('ropePlacement') or 'top', ROPE_WIDTH) for b in banners]),
+        np.array([_pocket_code(b.get('polePockets') or 'none') for b in banners]),
+    )
+    for index, case in enumerate(fixtures['banners']):
+        for field, value in case['expected'].items():
+            if quoted[field][index] != value:
+                problems += 1
+                print(f'❌ banner case {index} {field}: got {_cents(quoted[field][index])}, want {value}', file=out)
+
+    cases = len(orders) + len(banners)
+    if not problems:
+        print(f'✅ {cases} golden cases match the TypeScript pricing modules', file=out)
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check stored order prices against the unified pricing rules.')
+    parser.add_argument('exports', nargs='*', help='order exports (.json, .jsonl/.ndjson or .csv)')
+    parser.add_argument('--golden', action='store_true', help='check the arithmetic against the TypeScript fixtures')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help='golden fixture file for --golden')
+    parser.add_argument('--skip', action='append', default=[], choices=CHECKS, help='leave out a check (repeatable)')
+    parser.add_argument('--limit', type=int, default=20, help='mismatches to print per check')
+    parser.add_argument('--report', help='write every mismatch to this JSON file')
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print('❌ patchkit.pricing needs NumPy: pip install numpy', file=sys.stderr)
+        return 2
+    if args.golden:
+        try:
+            return 1 if check_golden(args.fixtures) else 0
+        except (OSError, ValueError) as e:
+            print(f'❌ {args.fixtures}: unreadable fixtures ({e})', file=sys.stderr)
+            return 2
+    if not args.exports:
+        parser.error('name an export to verify, or pass --golden')
+
+    failed = False
+    reports = {}
+    for path in args.exports:
+        started = time.perf_counter()
+        try:
+            export = load_export(path)
+        except (OSError, ValueError, csv.Error) as e:
+            print(f'❌ {path}: unreadable export ({e})')
+            failed = True
+            continue
+        loaded = time.perf_counter()
+        results = verify(export, skip=args.skip)
+        elapsed = time.perf_counter() - loaded
+        print(f'📄 {path}: {len(export.order_ids)} orders, {len(export)} items '
+              f'(loaded in {(loaded - started) * 1000:.0f} ms, checked in {elapsed * 1000:.0f} ms)')
+        print_mismatches(export, results, args.limit)
+        failed = failed or any(len(result) for result in results)
+        if args.report:
+            reports[path] = mismatch_report(export, results)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+        print(f'\n📄 Report written to {args.report}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
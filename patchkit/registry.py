@@ -0,0 +1,159 @@
+"""
+Declarative patch registry.
+
+Each historical script in the repo root becomes one or more ``PatchDef``
+entries: a target path (or glob) relative to the repo root, a list of edit
+specs and an optional ``Guard``. A ``target`` of ``None`` means "the one
+file under ``src/`` or ``netlify/functions/`` containing every literal
+anchor", resolved through the anchor index. Specs are plain tuples, so
+importing the registry and listing it never compiles a regex or loads the
+engine; the engine objects are only built when a patch is selected for a
+run.
+"""
+
+import os
+
+from .guards import Guard
+
+__all__ = ['Guard', 'PatchDef', 'all_patches', 'block', 'literal', 'node', 'patch_text', 'regex', 'select']
+
+
+def literal(anchor, replacement):
+    """Replace every occurrence of ``anchor``."""
+    return ('literal', anchor, replacement)
+
+
+def block(marker, replacement):
+    """Replace the marker comment and the JSX element that follows it."""
+    return ('block', marker, replacement)
+
+
+def node(query, text, position='replace'):
+    """Edit the TSX node ``query`` selects (see ``patchkit.tsx``): ``replace``, ``before``, ``after`` or ``append``."""
+    return ('node', query, text, position)
+
+
+def regex(pattern, replacement, flags=0, count=0, **options):
+    """Regex substitution; prefer inline flags such as ``(?s)`` over ``re`` constants."""
+    return ('regex', pattern, replacement, flags, count, options)
+
+
+class PatchDef:
+    """One registered patch: edits for a target path or glob, optionally guarded."""
+
+    __slots__ = ('id', 'groups', 'target', 'edits', 'guard', 'description')
+
+    def __init__(self, id, groups, target, edits, guard=None, description=''):
+        self.id = id
+        self.groups = (groups,) if isinstance(groups, str) else tuple(groups)
+        self.target = target
+        self.edits = list(edits)
+        self.guard = guard
+        self.description = description
+
+    def anchors(self):
+        """Literal anchors and block markers; regex and node edits have no fixed anchor."""
+        return [spec[1] for spec in self.edits if spec[0] in ('literal', 'block')]
+
+    def paths(self, root, index=None):
+        """
+        Target paths relative to ``root``.
+
+        A glob is expanded, a plain path is taken as is, and no target is
+        looked up in ``index`` (an ``AnchorIndex``), raising
+        ``AmbiguousAnchor`` unless exactly one file holds every anchor.
+        """
+        if self.target is None:
+            if index is None:
+                from .index import load_index
+
+                index = load_index(root)
+            return [index.find_target(self.anchors())]
+        if not any(char in self.target for char in '*?['):
+            return [self.target]
+        import glob
+
+        matches = glob.glob(self.target, root_dir=root, recursive=True)
+        return sorted(path.replace(os.sep, '/') for path in matches)
+
+    def build(self):
+        """Engine edit objects for the specs."""
+        from .engine import Edit
+        from .jsx import BlockEdit
+        from .patterns import RegexEdit
+        from .tsx import NodeEdit
+
+        built = []
+        for spec in self.edits:
+            kind = spec[0]
+            if kind == 'literal':
+                built.append(Edit(spec[1], spec[2]))
+            elif kind == 'block':
+                built.append(BlockEdit(spec[1], spec[2]))
+            elif kind == 'node':
+                built.append(NodeEdit(spec[1], spec[2], spec[3]))
+            elif kind == 'regex':
+                _, pattern, replacement, flags, count, options = spec
+                built.append(RegexEdit(pattern, replacement, flags, count, **options))
+            else:
+                raise ValueError(f'Unknown edit kind {kind!r} in patch {self.id!r}')
+        return built
+
+    def patch_set(self, root, index=None):
+        """A ``PatchSet`` applying this definition to every matching path under ``root``."""
+        from .patchset import PatchSet
+
+        patch_set = PatchSet(self.id)
+        edits = self.build()
+        for path in self.paths(root, index):
+            for edit in edits:
+                patch_set.add(path, edit, self.guard)
+        return patch_set
+
+    def __repr__(self):
+        return f'PatchDef({self.id!r}, {self.target!r})'
+
+
+def all_patches():
+    """Every registered ``PatchDef``, in declaration order."""
+    from .patches import PATCHES
+
+    return PATCHES
+
+
+def select(names, patches=None):
+    """
+    Patches whose id or group is in ``names``, in registry order.
+
+    Raises ``KeyError`` naming anything that matched nothing.
+    """
+    patches = all_patches() if patches is None else patches
+    wanted = set(names)
+    chosen = [patch for patch in patches if patch.id in wanted or wanted.intersection(patch.groups)]
+    known = {patch.id for patch in patches}.union(*(patch.groups for patch in patches))
+    unknown = sorted(wanted - known)
+    if unknown:
+        raise KeyError(', '.join(unknown))
+    return chosen
+
+
+def patch_text(content, names, target=None):
+    """
+    Apply the patches ``select(names)`` picks (only those for ``target``, if given) to ``content``.
+
+    The edits, guards and conflict checks are those ``python -m patchkit``
+    applies to the file, so the repo-root scripts can patch text in memory
+    without keeping their own copy of the edits. Returns a ``PatchResult``.
+    """
+    from .guards import Guarded
+    from .patchset import apply_patch
+
+    edits = []
+    origins = []
+    for patch in select(names):
+        if target is not None and patch.target != target:
+            continue
+        for edit in patch.build():
+            edits.append(edit if patch.guard is None else Guarded(edit, patch.guard))
+            origins.append(patch.id)
+    return apply_patch(content, edits, origins=origins)
@@ -0,0 +1,165 @@
+"""
+Per-edit instrumentation and the machine-readable run report.
+
+The old scripts all end with an unconditional "✅ All changes applied
+successfully!", even when ``str.replace`` matched nothing. The runner
+instead records, for every edit, how often it matched, how much it changed
+the file size and how long it took, plus read/patch/write times per file,
+and writes them as JSON next to a compact table.
+
+Set ``--profile DIR`` on ``python -m patchkit`` or the runner (or
+``PATCHKIT_PROFILE=DIR``) to wrap each file's patch step in ``cProfile``
+and dump one ``.prof`` per file.
+"""
+
+import json
+import os
+import sys
+import time
+
+PROFILE_ENV = 'PATCHKIT_PROFILE'
+
+
+class EditStat:
+    """
+    Instrumentation for one edit, or for a pass shared by several edits.
+
+    ``size_delta`` is the change in file length in characters. ``seconds``
+    is ``None`` for literal and block edits, whose time is only measurable
+    for the whole single-pass stage they share (the ``engine``/``jsx``/``tsx`` rows).
+    Edits skipped by their guard are recorded with kind ``guarded``.
+    """
+
+    __slots__ = ('kind', 'label', 'matches', 'size_delta', 'seconds')
+
+    def __init__(self, kind, label, matches, size_delta, seconds=None):
+        self.kind = kind
+        self.label = label
+        self.matches = matches
+        self.size_delta = size_delta
+        self.seconds = seconds
+
+    @property
+    def unmatched(self):
+        """True for a real edit that was attempted and matched nothing."""
+        return self.matches == 0 and self.kind not in ('engine', 'jsx', 'tsx', 'guarded')
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'label': self.label,
+            'matches': self.matches,
+            'size_delta': self.size_delta,
+            'seconds': self.seconds,
+        }
+
+
+def short_label(text, width=60):
+    """First non-blank line of an anchor, trimmed for tables."""
+    for line in text.splitlines():
+        if line.strip():
+            text = line.strip()
+            break
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
+class Profiler:
+    """Optional cProfile wrapper; a no-op unless ``directory`` is set."""
+
+    def __init__(self, directory, name):
+        self.directory = directory
+        self.name = name
+        self.profile = None
+
+    def __enter__(self):
+        if self.directory:
+            import cProfile
+
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profile is not None:
+            self.profile.disable()
+            os.makedirs(self.directory, exist_ok=True)
+            filename = self.name.replace(os.sep, '__').replace('/', '__') + '.prof'
+            self.profile.dump_stats(os.path.join(self.directory, filename))
+        return False
+
+
+def profile_directory(explicit=None):
+    return explicit or os.environ.get(PROFILE_ENV) or None
+
+
+def summary_to_dict(summary):
+    return {
+        'path': summary.path,
+        'status': summary.status,
+        'error': summary.error,
+        'cache': summary.cache,
+        'size': summary.size,
+        'read_seconds': summary.read_seconds,
+        'patch_seconds': summary.patch_seconds,
+        'write_seconds': summary.write_seconds,
+        'seconds': summary.seconds,
+        'edits': [stat.to_dict() for stat in summary.edits],
+    }
+
+
+def build_report(summaries, seconds, cache=None):
+    """The JSON run report; ``cache`` is the run's ``CacheCounters``, if a cache was used."""
+    files = [summary_to_dict(summary) for summary in sorted(summaries, key=lambda s: s.path)]
+    edits = [stat for summary in summaries for stat in summary.edits if stat.kind not in ('engine', 'jsx', 'tsx')]
+    attempted = [stat for stat in edits if stat.kind != 'guarded']
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seconds': seconds,
+        'totals': {
+            'files': len(files),
+            'updated': sum(1 for f in files if f['status'] == 'updated'),
+            'skipped': sum(1 for f in files if f['status'] == 'skipped'),
+            'failed': sum(1 for f in files if f['status'] == 'failed'),
+            'edits': len(edits),
+            'guarded_edits': len(edits) - len(attempted),
+            'unmatched_edits': sum(1 for stat in attempted if stat.unmatched),
+        },
+        'cache': cache.to_dict() if cache is not None else None,
+        'files': files,
+    }
+
+
+def write_report(report, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def _ms(seconds):
+    return '-' if seconds is None else f'{seconds * 1000:.1f}'
+
+
+def print_table(summaries, out=sys.stdout):
+    """Compact per-file / per-edit table."""
+    print(f'{"":2} {"file / edit":<64} {"kind":<7} {"matches":>7} {"Δsize":>7} {"ms":>7}', file=out)
+    for summary in sorted(summaries, key=lambda s: s.path):
+        icon = {'skipped': '⏭️', 'failed': '❌'}.get(summary.status)
+        if icon is None:
+            unmatched = any(stat.unmatched for stat in summary.edits)
+            icon = '⚠️' if unmatched else '✅'
+        print(f'{icon:2} {summary.path:<64} {summary.status:<7} {"":>7} {"":>7} {_ms(summary.seconds):>7}', file=out)
+        if summary.error:
+            print(f'{"":2}   {summary.error}', file=out)
+            continue
+        if summary.status != 'skipped':
+            print(
+                f'{"":2}   {"read / write":<62} {"io":<7} {"":>7} {"":>7} '
+                f'{_ms((summary.read_seconds or 0) + (summary.write_seconds or 0)):>7}',
+                file=out,
+            )
+        for stat in summary.edits:
+            print(
+                f'{"":2}   {short_label(stat.label):<62} {stat.kind:<7} {stat.matches:>7} '
+                f'{stat.size_delta:>+7} {_ms(stat.seconds):>7}',
+                file=out,
+            )
@@ -0,0 +1,384 @@
+"""
+Apply declared patch sets across the tree on a process pool.
+
+Usage:
+    python -m patchkit.runner some.module [other.module ...] [--workers N]
+        [--report FILE] [--profile DIR] [--transaction | --dry-run]
+        [--stream-mb N | --no-stream] [--io-workers N]
+
+Each module must define ``PATCH_SET`` or ``PATCH_SETS``. Edits from every
+set are grouped by target file, so each file is read once and written at
+most once, and files are patched in parallel (largest first) so a run takes
+about as long as its largest file. Files the manifest already records as
+patched are skipped without being parsed or written. Every run prints a
+per-edit table, and ``--report`` writes the same data as JSON. A file
+where any edit matches nothing fails and is not written, and the run exits
+non-zero. ``--transaction`` writes every changed file together, or none of
+them; ``--dry-run`` prints unified diffs instead of writing anything. Files
+of ``--stream-mb`` or more with only literal edits are patched through a
+memory map in bounded memory. ``--io-workers`` reads and writes files
+concurrently from an event loop (see ``patchkit.aio``), for sweeps over many
+small files.
+"""
+
+import argparse
+import os
+import sys
+import time
+from importlib import import_module
+
+from .diff import print_diffs
+from .manifest import Manifest, content_hash, manifest_path
+from .options import add_run_options, stream_threshold
+from .patchset import apply_patch, group_by_file, group_origins, patch_id
+from .paths import REPO_ROOT
+from .patterns import PatternTimeout
+from .report import Profiler, build_report, print_table, profile_directory, short_label, write_report
+from .transaction import Transaction
+
+
+
+class FileSummary:
+    """Outcome of patching one file."""
+
+    __slots__ = (
+        'path', 'counts', 'changed', 'seconds', 'size', 'error',
+        'skipped', 'pre_hash', 'post_hash', 'stat',
+        'edits', 'read_seconds', 'patch_seconds', 'write_seconds',
+        'original', 'output', 'cache',
+    )
+
+    def __init__(self, path, counts=None, changed=False, seconds=0.0, size=0, error=None, skipped=False):
+        self.path = path
+        self.counts = counts or {}
+        self.changed = changed
+        self.seconds = seconds
+        self.size = size
+        self.error = error
+        self.skipped = skipped
+        self.pre_hash = None
+        self.post_hash = None
+        self.stat = None
+        self.edits = []
+        self.read_seconds = None
+        self.patch_seconds = None
+        self.write_seconds = None
+        # Old and new bytes of a changed file that was not written in place.
+        self.original = None
+        self.output = None
+        # 'hit', 'miss' or 'stored' when a patch cache was in use.
+        self.cache = None
+
+    @property
+    def status(self):
+        if self.skipped:
+            return 'skipped'
+        if self.error:
+            return 'failed'
+        return 'updated' if self.changed else 'unchanged'
+
+    @property
+    def missing(self):
+        return [anchor for anchor, count in self.counts.items() if count == 0]
+
+
+def unmatched_error(counts):
+    """
+    Why a file with edits that matched nothing fails, or ``None`` if every edit matched.
+
+    Such a file is never written: writing the edits that did match would
+    leave it half patched while the run looked like a success.
+    """
+    missing = [anchor for anchor, count in counts.items() if count == 0]
+    if not missing:
+        return None
+    labels = ', '.join(repr(short_label(anchor)) for anchor in missing)
+    return f'{len(missing)} of {len(counts)} edits matched nothing, file not written: {labels}'
+
+
+def apply_file(
+    root, path, edits, profile_dir=None, write=True, cache=None, pid=None, origins=None, stream_bytes=None,
+):
+    """
+    Read ``path`` once, apply every edit for it and write it back if it changed (and ``write`` is set).
+
+    If any edit that was not guarded out matches nothing, the file fails
+    (see ``unmatched_error``) and is left as it was.
+    With a ``PatchCache`` and the edits' ``pid``, a file whose exact bytes
+    were patched before takes its output from the cache without running any
+    edit; a miss stores the new result. ``origins`` (see ``group_origins``)
+    names each edit's patch set in conflict errors.
+
+    Files of at least ``stream_bytes`` whose edits are all literal are
+    patched through ``stream_file`` in bounded memory instead, without the
+    cache and without keeping their bytes for a diff.
+    """
+    if stream_bytes is not None and _file_size(root, path) >= max(stream_bytes, 1):
+        from .stream import stream_file, streamable
+
+        if streamable(edits):
+            return stream_file(root, path, edits, origins, write, strict=True)
+    timer = time.perf_counter
+    started = timer()
+    full_path = os.path.join(root, path)
+    stats = []
+    read_seconds = patch_seconds = write_seconds = None
+    cache_state = None
+    try:
+        with open(full_path, 'rb') as f:
+            raw = f.read()
+        read_seconds = timer() - started
+        pre_hash = content_hash(raw)
+
+        patch_started = timer()
+        hit = cache.get(raw, pre_hash, pid) if cache is not None else None
+        if hit is not None:
+            cache_state = 'hit'
+            counts, stats = hit.counts, hit.edits
+            output = raw if hit.output == raw else hit.output
+        else:
+            with Profiler(profile_dir, path):
+                result = apply_patch(raw.decode('utf-8'), edits, stats, origins)
+            counts = result.counts
+            output = result.text.encode('utf-8') if result.changed else raw
+        changed = output is not raw
+        post_hash = content_hash(output) if changed else pre_hash
+        if hit is None and cache is not None:
+            cache_state = 'stored' if cache.put(raw, pre_hash, pid, output, post_hash, counts, stats) else 'miss'
+        patch_seconds = timer() - patch_started
+        error = unmatched_error(counts)
+        if error is not None:
+            raise ValueError(error)
+
+        write_started = timer()
+        if changed and write:
+            with open(full_path, 'wb') as f:
+                f.write(output)
+        stat = os.stat(full_path)
+        write_seconds = timer() - write_started
+    except (OSError, ValueError, PatternTimeout, RecursionError) as e:
+        summary = FileSummary(path, seconds=timer() - started, error=str(e))
+        summary.edits = stats
+        summary.read_seconds = read_seconds
+        summary.patch_seconds = patch_seconds
+        return summary
+
+    summary = FileSummary(path, counts, changed, timer() - started, len(raw))
+    summary.edits = stats
+    summary.read_seconds = read_seconds
+    summary.patch_seconds = patch_seconds
+    summary.write_seconds = write_seconds
+    summary.pre_hash = pre_hash
+    summary.post_hash = post_hash
+    summary.stat = stat
+    summary.cache = cache_state
+    if changed and not write:
+        summary.original = raw
+        summary.output = output
+    return summary
+
+
+def _file_size(root, path):
+    try:
+        return os.path.getsize(os.path.join(root, path))
+    except OSError:
+        return 0
+
+
+def run(
+    patch_sets, root=REPO_ROOT, workers=None, manifest=None, profile_dir=None, write=True, transaction=None,
+    cache=None, stream_bytes=None, io_workers=None,
+):
+    """
+    Apply ``patch_sets`` under ``root`` and return one ``FileSummary`` per file.
+
+    With a ``Manifest`` for ``root``, files already holding the recorded
+    post-image are skipped before any worker starts, and the manifest is
+    updated (but not saved) with the outcome of every file that was patched.
+    ``profile_dir`` enables a cProfile dump per patched file. With
+    ``write=False`` nothing is written and the manifest is left untouched.
+
+    With a ``Transaction`` no file is written while patching: every changed
+    file is staged and the transaction is committed only if every file
+    patched cleanly. If any file failed, or the commit does, nothing is
+    written and the changed files are reported as failed too.
+
+    A ``PatchCache`` lets files whose exact content was patched before skip
+    the edits entirely; it is not pruned here.
+
+    Files of at least ``stream_bytes`` with only literal edits are streamed
+    (see ``patchkit.stream``), except in a transaction, which has to hold
+    every new file in memory until it commits.
+
+    With ``io_workers``, file I/O is issued concurrently on that many
+    threads and only matching runs on the process pool (``patchkit.aio``).
+    """
+    if manifest is not None and manifest.root != os.path.abspath(root):
+        raise ValueError(f'manifest {manifest.path} is for {manifest.root}, not {os.path.abspath(root)}')
+    in_place = write and transaction is None
+    if transaction is not None:
+        stream_bytes = None
+    grouped = group_by_file(patch_sets)
+    origins = group_origins(patch_sets)
+    summaries = []
+    jobs = []
+    for path, edits in grouped.items():
+        pid = patch_id(edits, origins[path])
+        if write and manifest is not None and manifest.is_applied(pid, path, os.path.join(root, path)):
+            summaries.append(FileSummary(path, skipped=True))
+        else:
+            jobs.append((path, edits, pid))
+
+    # Largest files first: the slowest job starts immediately and the small
+    # ones fill in around it.
+    jobs.sort(key=lambda job: _file_size(root, job[0]), reverse=True)
+    if io_workers is not None and len(jobs) > 1:
+        from .aio import sweep
+
+        applied = sweep(jobs, root, origins, workers, io_workers, profile_dir, in_place, cache, stream_bytes)
+    elif len(jobs) <= 1 or workers == 1:
+        applied = [
+            apply_file(root, path, edits, profile_dir, in_place, cache, pid, origins[path], stream_bytes)
+            for path, edits, pid in jobs
+        ]
+    else:
+        # Imported here: concurrent.futures/multiprocessing dominate start-up
+        # time and are not needed for single-file or serial runs.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    apply_file, root, path, edits, profile_dir, in_place, cache, pid, origins[path], stream_bytes,
+                )
+                for path, edits, pid in jobs
+            ]
+            applied = [future.result() for future in futures]
+
+    if write and transaction is not None:
+        _commit(transaction, applied)
+
+    if write and manifest is not None:
+        for (path, _, pid), summary in zip(jobs, applied):
+            if summary.error is None:
+                manifest.record(pid, path, summary.pre_hash, summary.post_hash, summary.stat)
+    return summaries + applied
+
+
+def _commit(transaction, summaries):
+    from .transaction import TransactionError
+
+    changed = [summary for summary in summaries if summary.error is None and summary.output is not None]
+    failed = [summary.path for summary in summaries if summary.error]
+    if failed:
+        reason = f'not written: {", ".join(failed)} failed'
+    else:
+        for summary in changed:
+            transaction.stage(summary.path, summary.output, summary.original, summary.stat)
+        try:
+            stats = transaction.commit()
+        except (OSError, TransactionError) as e:
+            reason = f'not written: {e}'
+        else:
+            for summary in changed:
+                summary.stat = stats[summary.path]
+            return
+    for summary in changed:
+        summary.error = reason
+
+
+def open_cache(max_mb=None):
+    from .cache import PatchCache
+
+    cache = PatchCache()
+    if max_mb is not None:
+        cache.max_bytes = int(max_mb * 1024 * 1024)
+    return cache
+
+
+def close_cache(cache, summaries):
+    """Count this run's hits and misses and evict down to the cache limits; ``None`` without a cache."""
+    if cache is None:
+        return None
+    from .cache import CacheCounters
+
+    counters = CacheCounters().count(summaries)
+    counters.evictions = cache.prune()
+    return counters
+
+
+def cache_note(counters):
+    if counters is None:
+        return ''
+    return f' (cache: {counters.hits} hits, {counters.misses} misses)'
+
+
+def load_patch_sets(module_names):
+    patch_sets = []
+    for name in module_names:
+        module = import_module(name)
+        if hasattr(module, 'PATCH_SETS'):
+            patch_sets.extend(module.PATCH_SETS)
+        elif hasattr(module, 'PATCH_SET'):
+            patch_sets.append(module.PATCH_SET)
+        else:
+            raise SystemExit(f'❌ {name} defines neither PATCH_SET nor PATCH_SETS')
+    return patch_sets
+
+
+def run_from_args(patch_sets, args):
+    """
+    ``run`` configured by the ``add_run_options`` arguments in ``args``.
+
+    Opens and saves the manifest, opens and prunes the cache, and in a dry
+    run keeps TSX tables in memory. Returns the summaries and the cache
+    counters (``None`` without a cache).
+    """
+    manifest = None
+    if not args.no_manifest and not args.dry_run:
+        manifest = Manifest(args.manifest or manifest_path(args.root), args.root)
+    # A dry run writes nothing, cache entries included.
+    cache = None if args.no_cache or args.dry_run else open_cache(args.cache_mb)
+    if args.dry_run:
+        from .tsx import memory_tables
+
+        memory_tables()
+    summaries = run(
+        patch_sets, root=args.root, workers=1 if args.dry_run else args.workers,
+        manifest=manifest, profile_dir=profile_directory(args.profile), write=not args.dry_run,
+        transaction=Transaction(args.root) if args.transaction and not args.dry_run else None,
+        cache=cache, stream_bytes=stream_threshold(args), io_workers=args.io_workers,
+    )
+    if manifest is not None:
+        manifest.save()
+    return summaries, close_cache(cache, summaries)
+
+
+def print_run(summaries, counters, elapsed, args):
+    """Dry-run diffs, the per-edit table and the ``--report`` file for a ``run_from_args`` run."""
+    if args.dry_run and print_diffs(summaries):
+        print()
+    print_table(summaries)
+    if args.report:
+        write_report(build_report(summaries, elapsed, counters), args.report)
+        print(f'\n📄 Report written to {args.report}')
+    if args.dry_run:
+        print('\n🧪 Dry run: no files were written')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply declared patch sets in parallel.')
+    parser.add_argument('modules', nargs='+', help='modules defining PATCH_SET or PATCH_SETS')
+    add_run_options(parser)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    summaries, counters = run_from_args(load_patch_sets(args.modules), args)
+    elapsed = time.perf_counter() - started
+    print_run(summaries, counters, elapsed, args)
+    print(f'\n🏁 {len(summaries)} files in {elapsed * 1000:.1f} ms{cache_note(counters)}')
+    return 1 if any(summary.error for summary in summaries) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+Streaming patch mode for very large files.
+
+``apply_file`` reads a whole file, decodes it and builds the patched text
+and its encoding next to it, so peak memory is several times the file size,
+just as it was in the scripts' ``content[:start] + new + content[end:]``.
+That is fine for components but not for large generated files such as SQL
+dumps (``database-schema-neon.sql``) or bundled builds.
+
+``stream_file`` maps the file with ``mmap`` instead and walks it in windows
+of ``window`` bytes. Each window is scanned in place with the literal trie
+matcher compiled for bytes, and the output is written with ``writelines``
+over memoryview slices of the map plus the replacement bytes, so the only
+copies ever made are the replacements. Pages of the map are released once
+their window is written, the file is hashed and checked for UTF-8 window by
+window, and the result goes to a temp file that replaces the target, so
+peak memory depends on ``window``, not on the size of the file. Nothing is
+written unless an anchor matches.
+
+Only literal edits (guarded or not) can stream: regexes and JSX blocks
+need the whole text, and files that have them go through ``apply_file``.
+"""
+
+import codecs
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+from .conflicts import EditConflict, Span, dedupe, find_conflicts
+from .engine import Edit, _byte_matcher
+from .guards import Guarded
+from .report import EditStat
+from .runner import FileSummary, unmatched_error
+
+DEFAULT_WINDOW = 1024 * 1024
+
+
+def streamable(edits):
+    """True if every edit is a literal ``Edit``, so the file can be patched without loading it."""
+    return all(isinstance(edit.edit if isinstance(edit, Guarded) else edit, Edit) for edit in edits)
+
+
+def _allows(guard, mm):
+    if guard.present is not None and mm.find(guard.present.encode('utf-8')) == -1:
+        return False
+    if guard.absent is not None and mm.find(guard.absent.encode('utf-8')) != -1:
+        return False
+    return True
+
+
+def _release(mm, start, end):
+    """Drop the pages of ``mm[start:end]`` from memory; they are reloaded from the file if touched again."""
+    if not hasattr(mmap, 'MADV_DONTNEED'):
+        return
+    start -= start % mmap.PAGESIZE
+    end -= end % mmap.PAGESIZE
+    if end > start:
+        mm.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+
+class _Output:
+    """Sink for the patched bytes: a temp file beside the target (opened on first use) and a running hash."""
+
+    def __init__(self, full_path, write):
+        self.full_path = full_path
+        self.write = write
+        self.file = None
+        self.tmp_path = None
+        self.hash = hashlib.sha256()
+
+    def writelines(self, pieces):
+        if self.write:
+            if self.file is None:
+                fd, self.tmp_path = tempfile.mkstemp(
+                    dir=os.path.dirname(self.full_path), prefix='.patchkit-', suffix='.tmp',
+                )
+                self.file = os.fdopen(fd, 'wb')
+            self.file.writelines(pieces)
+        update = self.hash.update
+        for piece in pieces:
+            update(piece)
+
+    def commit(self):
+        if self.file is None:
+            return
+        self.file.close()
+        os.chmod(self.tmp_path, os.stat(self.full_path).st_mode & 0o7777)
+        os.replace(self.tmp_path, self.full_path)
+        self.tmp_path = None
+
+    def discard(self):
+        if self.file is not None:
+            self.file.close()
+        if self.tmp_path is not None:
+            try:
+                os.unlink(self.tmp_path)
+            except OSError:
+                pass
+
+
+def _windows(mm, size, matchers, window):
+    """
+    Yield ``(base, limit, found)`` for consecutive windows ``mm[base:limit]``.
+
+    ``found`` holds the ``(start, end, matcher index, anchor bytes)``
+    matches that start in the window, in text order. Each matcher scans
+    with its own cursor, so the matches are exactly those of one pass over
+    the whole file: a match starting in the window is found whole because
+    the search runs up to ``longest - 1`` bytes past the window's end.
+    """
+    longest = max(len(anchor) for _, anchors in matchers for anchor in anchors)
+    cursors = [0] * len(matchers)
+    for base in range(0, size, window):
+        limit = min(size, base + window)
+        endpos = min(size, limit + longest - 1)
+        found = []
+        for index, (matcher, _) in enumerate(matchers):
+            pos = cursors[index]
+            if pos < limit:
+                for match in matcher.finditer(mm, pos, endpos):
+                    start, pos = match.span()
+                    if start >= limit:
+                        pos = start
+                        break
+                    found.append((start, pos, index, match.group()))
+            cursors[index] = max(pos, limit)
+        if len(matchers) > 1:
+            found.sort()
+        yield base, limit, found
+
+
+def stream_file(root, path, edits, origins=None, write=True, window=DEFAULT_WINDOW, strict=False):
+    """
+    Patch ``path`` with literal ``edits`` through a memory map in bounded memory; returns a ``FileSummary``.
+
+    Matches, conflicts, counts and hashes are those ``apply_file`` would
+    produce, but the summary never holds the file's bytes, so a dry run
+    reports what would change without a diff. With ``strict``, as in
+    ``apply_file``, an edit that matches nothing fails the file and the
+    patched copy is discarded.
+    """
+    timer = time.perf_counter
+    started = timer()
+    full_path = os.path.join(root, path)
+    if origins is None:
+        origins = [None] * len(edits)
+    stats = []
+    output = _Output(full_path, write)
+    write_seconds = None
+    try:
+        with open(full_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                raise ValueError('cannot stream an empty file')
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                counts, pre_hash, changed = _stream(mm, size, edits, origins, window, stats, output)
+        error = unmatched_error(counts) if strict else None
+        if error is not None:
+            raise ValueError(error)
+        patch_seconds = timer() - started
+        write_started = timer()
+        if write:
+            output.commit()
+        stat = os.stat(full_path)
+        write_seconds = timer() - write_started
+    except (OSError, ValueError, RecursionError) as e:
+        output.discard()
+        summary = FileSummary(path, seconds=timer() - started, error=str(e))
+        summary.edits = stats
+        return summary
+
+    summary = FileSummary(path, counts, changed, timer() - started, size)
+    summary.edits = stats
+    summary.patch_seconds = patch_seconds
+    summary.write_seconds = write_seconds
+    summary.pre_hash = pre_hash
+    summary.post_hash = output.hash.hexdigest() if changed else pre_hash
+    summary.stat = stat
+    return summary
+
+
+def _tables(mm, size, edits, origins, stats):
+    # Guards are checked first, one scan of the map each, and decide which
+    # edits take part in the windowed pass. Edits are then grouped by
+    # origin, each group with its own matcher, as in ``apply_patch``.
+    tables = OrderedDict()
+    literal = []
+    for edit, origin in zip(edits, origins):
+        if isinstance(edit, Guarded):
+            allowed = _allows(edit.guard, mm)
+            _release(mm, 0, size)
+            if not allowed:
+                stats.append(EditStat('guarded', edit.edit.anchor, 0, 0))
+                continue
+            edit = edit.edit
+        table = tables.setdefault(origin, {})
+        key = edit.anchor.encode('utf-8')
+        previous = table.setdefault(key, (edit.anchor, edit.replacement.encode('utf-8'), origin))
+        if previous[1] != edit.replacement.encode('utf-8'):
+            raise ValueError(f'Conflicting replacements for anchor {edit.anchor[:60]!r}')
+        literal.append(edit)
+    return list(tables.values()), literal
+
+
+def _stream(mm, size, edits, origins, window, stats, output):
+    tables, literal = _tables(mm, size, edits, origins, stats)
+    counts = OrderedDict((edit.anchor, 0) for edit in literal)
+    matchers = [(_byte_matcher(tuple(sorted(anchor for anchor, _, _ in table.values()))), table) for table in tables]
+
+    scan_started = time.perf_counter()
+    pre = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    if matchers:
+        windows = _windows(mm, size, matchers, window)
+    else:
+        # Every edit was guarded out; the file is still hashed and checked.
+        windows = ((base, min(size, base + window), []) for base in range(0, size, window))
+    # ``cursor`` is how far into the original the output has been written;
+    # the output only starts with the first match.
+    cursor = None
+    carried = []
+    with memoryview(mm) as view:
+        for base, limit, found in windows:
+            pre.update(view[base:limit])
+            decoder.decode(view[base:limit])
+            spans = []
+            for start, end, index, key in found:
+                anchor, replacement, origin = matchers[index][1][key]
+                counts[anchor] += 1
+                spans.append((start, end, replacement, anchor, origin))
+            if len(matchers) > 1 and (spans or carried):
+                # Only edits from different patch sets can overlap; matches
+                # still open at the end of the last window are checked too.
+                checked = dedupe([
+                    Span(start, end, text, 'literal', anchor, origin) for start, end, text, anchor, origin in spans
+                ])
+                conflicts = find_conflicts(carried + checked)
+                if conflicts:
+                    raise EditConflict(conflicts)
+                carried = [span for span in carried + checked if span.end > limit]
+                spans = [(span.start, span.end, span.replacement) for span in checked]
+            if spans and cursor is None:
+                # First match: copy the untouched prefix, a window at a time.
+                for start in range(0, spans[0][0], window):
+                    stop = min(spans[0][0], start + window)
+                    output.writelines([view[start:stop]])
+                    _release(mm, start, stop)
+                cursor = spans[0][0]
+            pieces = []
+            for start, end, replacement, *_ in spans:
+                if start > cursor:
+                    pieces.append(view[cursor:start])
+                pieces.append(replacement)
+                cursor = end
+            if cursor is not None and cursor < limit:
+                pieces.append(view[cursor:limit])
+                cursor = limit
+            if pieces:
+                output.writelines(pieces)
+            # Drop the slices before the pages they point into.
+            del pieces, spans
+            _release(mm, base, limit)
+        decoder.decode(b'', final=True)
+
+    if not literal:
+        return counts, pre.hexdigest(), False
+    sizes = {edit.anchor: len(edit.replacement) - len(edit.anchor) for edit in literal}
+    stats.append(EditStat(
+        'engine', f'{len(literal)} literal edits, streamed', sum(counts.values()),
+        sum(count * sizes[anchor] for anchor, count in counts.items()), time.perf_counter() - scan_started,
+    ))
+    for anchor, count in counts.items():
+        stats.append(EditStat('literal', anchor, count, count * sizes[anchor]))
+    return counts, pre.hexdigest(), cursor is not None
@@ -0,0 +1,190 @@
+"""
+All-or-nothing multi-file writes.
+
+``update_checkout_and_email.py`` rewrote Checkout.tsx and then
+OrderConfirmation.tsx in place, so an exception in the second step left
+the tree half-patched; ``fix_upload.py`` wrote a ``.backup`` copy first. A
+``Transaction`` instead stages every patched file in memory, validates the
+whole set, and only then writes each one to a temp file beside its target,
+syncs them and renames them into place. The original
+bytes stay in memory, so a failure while renaming is rolled back without
+backup files, and a run that fails validation has written nothing and can
+simply be retried.
+"""
+
+import os
+import tempfile
+
+JSX_SUFFIXES = ('.tsx', '.jsx')
+
+
+class TransactionError(RuntimeError):
+    """Validation or commit of a transaction failed; nothing was left half-written."""
+
+
+class Staged:
+    """A pending write: new bytes for a file plus what it held when it was read."""
+
+    __slots__ = ('path', 'full_path', 'data', 'original', 'size', 'mtime_ns')
+
+    def __init__(self, path, full_path, data, original, stat):
+        self.path = path
+        self.full_path = full_path
+        self.data = data
+        self.original = original
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+
+
+class Transaction:
+    """In-memory overlay of pending file contents, committed together."""
+
+    def __init__(self, root):
+        self.root = root
+        self.staged = {}
+
+    def __contains__(self, path):
+        return path in self.staged
+
+    def __len__(self):
+        return len(self.staged)
+
+    def read(self, path):
+        """Current bytes of ``path``: the staged version if any, else the file on disk."""
+        staged = self.staged.get(path)
+        if staged is not None:
+            return staged.data
+        with open(os.path.join(self.root, path), 'rb') as f:
+            return f.read()
+
+    def stage(self, path, data, original, stat):
+        """
+        Queue ``data`` for ``path``.
+
+        ``original`` and ``stat`` describe the file as it was read; the commit
+        refuses to overwrite it if it has changed on disk since.
+        """
+        self.staged[path] = Staged(path, os.path.join(self.root, path), data, original, stat)
+
+    # -- validation --------------------------------------------------------
+
+    def validate(self):
+        """Raise ``TransactionError`` listing every staged file that must not be written."""
+        problems = []
+        for staged in self.staged.values():
+            problem = self._check(staged)
+            if problem:
+                problems.append(f'{staged.path}: {problem}')
+        if problems:
+            raise TransactionError('; '.join(problems))
+
+    def _check(self, staged):
+        try:
+            stat = os.stat(staged.full_path)
+        except OSError as e:
+            return f'cannot stat target ({e.strerror})'
+        if stat.st_size != staged.size or stat.st_mtime_ns != staged.mtime_ns:
+            return 'changed on disk since it was read'
+        try:
+            text = staged.data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            return f'patched text is not valid UTF-8 ({e.reason})'
+        if staged.path.endswith(JSX_SUFFIXES):
+            from .jsx import JsxScanError, scan_jsx
+
+            try:
+                scan_jsx(text)
+            except JsxScanError as e:
+                # Only a regression counts: a file the scanner never
+                # understood is not the patch's fault.
+                try:
+                    scan_jsx(staged.original.decode('utf-8'))
+                except (JsxScanError, UnicodeDecodeError):
+                    return None
+                return f'patch breaks JSX structure ({e})'
+        return None
+
+    # -- commit ------------------------------------------------------------
+
+    def commit(self):
+        """
+        Validate, then write every staged file atomically; returns ``{path: os.stat_result}``.
+
+        Every temp file is fsynced before any rename, so no target is touched
+        until every new image is durable; the directories holding them are
+        fsynced after the renames.
+        """
+        self.validate()
+        temps = {}
+        modes = {}
+        try:
+            for staged in self.staged.values():
+                modes[staged.path] = os.stat(staged.full_path).st_mode & 0o7777
+                temps[staged.path] = _write_temp(staged.full_path, staged.data, modes[staged.path])
+        except BaseException:
+            self._discard(temps)
+            raise
+
+        replaced = []
+        try:
+            for staged in self.staged.values():
+                os.replace(temps[staged.path], staged.full_path)
+                del temps[staged.path]
+                replaced.append(staged)
+            _sync_directories(staged.full_path for staged in replaced)
+        except BaseException as e:
+            self._discard(temps)
+            self._rollback(replaced, modes)
+            raise TransactionError(f'commit failed and was rolled back: {e}') from e
+
+        stats = {staged.path: os.stat(staged.full_path) for staged in replaced}
+        self.staged.clear()
+        return stats
+
+    @staticmethod
+    def _discard(temps):
+        for tmp_path in temps.values():
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _rollback(replaced, modes):
+        for staged in reversed(replaced):
+            os.replace(_write_temp(staged.full_path, staged.original, modes[staged.path]), staged.full_path)
+        _sync_directories(staged.full_path for staged in replaced)
+
+
+def _write_temp(full_path, data, mode):
+    """Write ``data`` to a synced temp file beside ``full_path`` with permissions ``mode``; returns its path."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(full_path), prefix='.patchkit-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return tmp_path
+
+
+def _sync_directories(full_paths):
+    # Makes the renames durable. Directories cannot be opened for fsync on
+    # every platform (Windows); there the rename is as durable as it gets.
+    for directory in sorted({os.path.dirname(path) for path in full_paths}):
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
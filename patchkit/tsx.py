@@ -0,0 +1,497 @@
+"""
+Structural edits to TSX components, backed by a cached node table.
+
+``fix_preview_canvas.py`` found the ``PreviewCanvasProps`` interface by the
+literal ``'isUploading?: boolean;\\n}'`` and the props destructure by
+``'isUploading = false,}) => {'``, so both stopped matching as soon as another
+prop was declared after ``isUploading``. ``parse_tsx`` reads a file once into
+a ``NodeTable``: interfaces (and object type aliases) with their members,
+component props destructures with their bindings, and every JSX element,
+fragment and expression container. Each node is a kind, a span and a parent
+index in parallel ``array``s. A ``NodeEdit`` picks its nodes by query:
+
+    interface:PreviewCanvasProps               the whole declaration
+    interface:PreviewCanvasProps.isUploading   one member, with its ``;``
+    props:PreviewCanvas                        the ``{ ... }`` a component destructures
+    props:PreviewCanvas.isUploading            one binding, with its ``,``
+    marker:PDF Preview Overlay                 ``{/* PDF Preview Overlay */}`` and the JSX node after it
+
+Tables are cached by the sha256 of the text, in memory and as flat binary
+files under ``.patchkit/tsx``, so all the structural edits of a file share
+one parse, and a file parsed by an earlier run or process is not parsed
+again. ``PATCHKIT_TSX_CACHE=DIR`` moves the files; ``off`` keeps tables in
+memory only, which is how dry runs avoid writing anything.
+
+Usage:
+    python -m patchkit.tsx FILE [--query QUERY ...]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from array import array
+from collections import OrderedDict
+
+from .jsx import scan_jsx
+from .manifest import content_hash
+from .paths import REPO_ROOT
+
+TABLE_VERSION = 1
+DEFAULT_TABLE_DIR = os.path.join(REPO_ROOT, '.patchkit', 'tsx')
+TABLE_CACHE_ENV = 'PATCHKIT_TSX_CACHE'
+MAX_TABLES = 512
+MEMORY_TABLES = 64
+
+INTERFACE, MEMBER, PROPS, BINDING, ELEMENT, FRAGMENT, EXPRESSION = range(1, 8)
+KIND_NAMES = {
+    INTERFACE: 'interface', MEMBER: 'member', PROPS: 'props', BINDING: 'binding',
+    ELEMENT: 'element', FRAGMENT: 'fragment', EXPRESSION: 'expression',
+}
+
+# The opening brace ends each match; the brace pairs from ``scan_jsx`` say
+# whether it is real code and where it closes.
+_TYPE_PARAMS = r'(?:<(?:[^<>]|<[^<>]*>)*>)?'
+_INTERFACE = re.compile(r'''
+      \binterface\s+([A-Za-z_$][\w$]*)\s*''' + _TYPE_PARAMS + r'''[^{;]*\{
+    | \btype\s+([A-Za-z_$][\w$]*)\s*''' + _TYPE_PARAMS + r'''\s*=\s*\{
+''', re.VERBOSE)
+_COMPONENT = re.compile(r'''
+      \b(?:const|let)\s+([A-Z][\w$]*)\s*(?::[^=;\n]+)?=\s*
+        (?:(?:React\.)?(?:memo|forwardRef)(?:<[^>]*>)?\(\s*)?(?:async\s*)?\(\s*\{
+    | \bfunction\s+([A-Z][\w$]*)\s*(?:<[^>]*>)?\s*\(\s*\{
+''', re.VERBOSE)
+_GAP = re.compile(r'(?:\s+|//[^\n]*|/\*[\s\S]*?\*/)*')
+_PART_TOKEN = re.compile(r'''
+      //[^\n]*
+    | /\*[\s\S]*?\*/
+    | '(?:[^'\\\n]|\\.)*'
+    | "(?:[^"\\\n]|\\.)*"
+    | `(?:[^`\\]|\\.)*`
+    | =>
+    | [(\[{<]
+    | [)\]}>]
+    | [;,\n]
+''', re.VERBOSE)
+_MEMBER_NAME = re.compile(r'''(?:readonly\s+)?([A-Za-z_$][\w$]*|'[^']*'|"[^"]*")\s*\??\s*[:(<]''')
+_BINDING_NAME = re.compile(r'(?:\.\.\.\s*)?([A-Za-z_$][\w$]*)')
+_MARKER = re.compile(r'\{\s*/\*\s*([\s\S]*?)\s*\*/\s*\}')
+
+
+class NodeTable:
+    """
+    The nodes of one file as parallel arrays.
+
+    Node ``i`` has kind ``kinds[i]``, spans ``starts[i]:ends[i]`` and sits
+    under node ``parents[i]`` (-1 at the top); ``name_ids[i]`` indexes
+    ``names`` (-1 for unnamed nodes).
+    """
+
+    __slots__ = ('kinds', 'starts', 'ends', 'parents', 'name_ids', 'names', '_name_ids', '_lookup')
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.parents = array('i')
+        self.name_ids = array('i')
+        self.names = []
+        self._name_ids = {}
+        self._lookup = None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add(self, kind, start, end, parent=-1, name=None):
+        """Append a node and return its index."""
+        name_id = -1
+        if name is not None:
+            name_id = self._name_ids.get(name)
+            if name_id is None:
+                name_id = self._name_ids[name] = len(self.names)
+                self.names.append(name)
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.parents.append(parent)
+        self.name_ids.append(name_id)
+        self._lookup = None
+        return len(self.kinds) - 1
+
+    def name(self, index):
+        name_id = self.name_ids[index]
+        return None if name_id < 0 else self.names[name_id]
+
+    def find(self, kind, name, parent=None):
+        """Indices of the nodes of ``kind`` called ``name``, under ``parent`` (any parent if ``None``)."""
+        if self._lookup is None:
+            lookup = {}
+            for index, key in enumerate(zip(self.kinds, self.name_ids)):
+                lookup.setdefault(key, []).append(index)
+            self._lookup = lookup
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            return []
+        found = self._lookup.get((kind, name_id), [])
+        if parent is None:
+            return found
+        return [index for index in found if self.parents[index] == parent]
+
+    def select(self, query):
+        """``(start, end)`` of every node ``query`` selects (see the module docstring), in text order."""
+        kind, owner, member = parse_query(query)
+        if kind == 'marker':
+            return self._marked(owner)
+        owner_kind, member_kind = (INTERFACE, MEMBER) if kind == 'interface' else (PROPS, BINDING)
+        found = []
+        for parent in self.find(owner_kind, owner):
+            if member is None:
+                found.append((self.starts[parent], self.ends[parent]))
+            else:
+                found.extend((self.starts[i], self.ends[i]) for i in self.find(member_kind, member, parent))
+        return sorted(found)
+
+    def _marked(self, marker):
+        # A marker comment spans through its next sibling in the same parent.
+        found = []
+        for index in self.find(EXPRESSION, marker):
+            parent = self.parents[index]
+            limit = self.ends[parent] if parent >= 0 else None
+            for other in range(index + 1, len(self)):
+                if limit is not None and self.starts[other] >= limit:
+                    break
+                if self.parents[other] == parent and self.kinds[other] in (ELEMENT, FRAGMENT, EXPRESSION):
+                    found.append((self.starts[index], self.ends[other]))
+                    break
+        return found
+
+    def to_bytes(self):
+        header = {'version': TABLE_VERSION, 'byteorder': sys.byteorder, 'count': len(self), 'names': self.names}
+        return b''.join([
+            json.dumps(header, separators=(',', ':')).encode('utf-8'), b'\n',
+            self.kinds.tobytes(), self.starts.tobytes(), self.ends.tobytes(),
+            self.parents.tobytes(), self.name_ids.tobytes(),
+        ])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Inverse of ``to_bytes``; raises ``ValueError`` for anything else."""
+        newline = data.index(b'\n')
+        header = json.loads(data[:newline])
+        if header.get('version') != TABLE_VERSION or header.get('byteorder') != sys.byteorder:
+            raise ValueError('incompatible node table')
+        table = cls()
+        count = header['count']
+        offset = newline + 1
+        view = memoryview(data)
+        for column in (table.kinds, table.starts, table.ends, table.parents, table.name_ids):
+            size = count * column.itemsize
+            column.frombytes(view[offset:offset + size])
+            offset += size
+        if offset != len(data) or len(table.name_ids) != count:
+            raise ValueError('truncated node table')
+        table.names = header['names']
+        table._name_ids = {name: i for i, name in enumerate(table.names)}
+        return table
+
+
+def parse_query(query):
+    """``(kind, owner, member or None)`` for a query string; raises ``ValueError`` for unknown kinds."""
+    kind, _, path = query.partition(':')
+    if kind not in ('interface', 'props', 'marker') or not path:
+        raise ValueError(f'Unknown node query {query!r} (expected interface:, props: or marker:)')
+    if kind == 'marker':
+        return kind, path, None
+    owner, _, member = path.partition('.')
+    return kind, owner, member or None
+
+
+def parse_tsx(text):
+    """Build the ``NodeTable`` of ``text`` with one ``scan_jsx`` pass; raises ``JsxScanError`` on unbalanced JSX."""
+    braces = []
+    index = scan_jsx(text, braces)
+    closes = dict(braces)
+    table = NodeTable()
+
+    for match in _INTERFACE.finditer(text):
+        close = closes.get(match.end() - 1)
+        if close is None:
+            continue
+        parent = table.add(INTERFACE, match.start(), close + 1, name=match.group(1) or match.group(2))
+        for start, end in _parts(text, match.end(), close, newlines=True):
+            name = _MEMBER_NAME.match(text, start, end)
+            table.add(MEMBER, start, end, parent, name and name.group(1).strip('\'"'))
+
+    for match in _COMPONENT.finditer(text):
+        open_at = match.end() - 1
+        close = closes.get(open_at)
+        if close is None:
+            continue
+        parent = table.add(PROPS, open_at, close + 1, name=match.group(1) or match.group(2))
+        for start, end in _parts(text, open_at + 1, close, newlines=False):
+            name = _BINDING_NAME.match(text, start, end)
+            table.add(BINDING, start, end, parent, name and name.group(1))
+
+    positions = {}
+    for node in index.nodes:
+        parent = positions[id(node.parent)] if node.parent is not None else -1
+        if node.name is None:
+            marker = _MARKER.fullmatch(text, node.start, node.end)
+            position = table.add(EXPRESSION, node.start, node.end, parent, marker and marker.group(1))
+        else:
+            position = table.add(ELEMENT if node.name else FRAGMENT, node.start, node.end, parent, node.name or None)
+        positions[id(node)] = position
+    return table
+
+
+def _parts(text, start, end, newlines):
+    """
+    ``(start, end)`` of each top-level part of ``text[start:end]``.
+
+    Parts end at a ``;`` or ``,`` outside brackets, which stays with its
+    part, or (with ``newlines``) at a line break after a complete part, as in
+    an interface without semicolons. Comments and space between parts are
+    left out.
+    """
+    parts = []
+    pos = start
+    while True:
+        pos = _GAP.match(text, pos, end).end()
+        if pos >= end:
+            return parts
+        part_start = pos
+        part_end = None
+        depth = 0
+        for match in _PART_TOKEN.finditer(text, pos, end):
+            first = match.group()[0]
+            if first in '([{<':
+                depth += 1
+            elif first in ')]}>':
+                depth = max(0, depth - 1)
+            elif depth == 0:
+                if first in ';,':
+                    part_end = match.end()
+                    break
+                if first == '\n' and newlines and _complete(text, part_start, match.start(), end):
+                    part_end = match.start()
+                    break
+        if part_end is None:
+            part_end = end
+        pos = part_end
+        while part_end > part_start and text[part_end - 1].isspace():
+            part_end -= 1
+        parts.append((part_start, part_end))
+
+
+def _complete(text, start, newline, end):
+    # A line break ends a member unless the type obviously continues:
+    # ``a:\n  | 'x'\n  | 'y'`` is one member.
+    before = text[start:newline].rstrip()
+    if not before or before[-1] in '|&=:,(<?':
+        return False
+    after = _GAP.match(text, newline, end).end()
+    return after >= end or text[after] not in '|&=?:.'
+
+
+class TableCache:
+    """``NodeTable``s by the sha256 of their text: an in-process LRU in front of one file per table on disk."""
+
+    def __init__(self, directory=DEFAULT_TABLE_DIR, max_entries=MAX_TABLES, memory_entries=MEMORY_TABLES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.parses = 0
+
+    def get(self, text):
+        """The table of ``text``, parsing it only if neither memory nor disk has it."""
+        key = content_hash(text)
+        table = self._memory.get(key)
+        if table is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return table
+        table = self._load(key)
+        if table is not None:
+            self.disk_hits += 1
+        else:
+            table = parse_tsx(text)
+            self.parses += 1
+            self._store(key, table)
+        self._memory[key] = table
+        if len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+        return table
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.bin')
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                table = NodeTable.from_bytes(f.read())
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return table
+
+    def _store(self, key, table):
+        # Failures only cost a parse next time.
+        if self.directory is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.table-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(table.to_bytes())
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            return
+        if self.parses % 32 == 0:
+            self.prune()
+
+    def prune(self):
+        """Delete the least recently used tables beyond ``max_entries``; returns how many went."""
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith('.bin')]
+        except OSError:
+            return 0
+        if len(names) <= self.max_entries:
+            return 0
+        paths = [os.path.join(self.directory, name) for name in names]
+        stamps = {}
+        for path in paths:
+            try:
+                stamps[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                pass
+        removed = 0
+        for path in sorted(stamps, key=stamps.get)[:len(stamps) - self.max_entries]:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+_tables = None
+
+
+def load_table(text):
+    """The ``NodeTable`` of ``text`` from this process's shared ``TableCache``."""
+    global _tables
+    if _tables is None:
+        directory = os.environ.get(TABLE_CACHE_ENV) or DEFAULT_TABLE_DIR
+        _tables = TableCache(None if directory == 'off' else directory)
+    return _tables.get(text)
+
+
+def memory_tables():
+    """Keep tables in memory only, in this process and in the workers it starts (``--dry-run``)."""
+    os.environ[TABLE_CACHE_ENV] = 'off'
+    use_tables(None)
+
+
+def use_tables(cache):
+    """Make ``cache`` the shared ``TableCache`` (``None``: a default one on next use); returns the previous one."""
+    global _tables
+    previous = _tables
+    _tables = cache
+    return previous
+
+
+class NodeEdit:
+    """
+    Replace the nodes a query selects, or insert ``text`` before or after them.
+
+    ``append`` inserts before the closing brace of a whole interface or
+    props destructure. Inserting after a member or binding that has no
+    separator of its own (the last one, written without a trailing ``;``
+    or ``,``) adds one first, so the result still parses.
+    """
+
+    __slots__ = ('query', 'text', 'position')
+
+    POSITIONS = ('replace', 'before', 'after', 'append')
+
+    def __init__(self, query, text, position='replace'):
+        kind, _, member = parse_query(query)
+        if position not in self.POSITIONS:
+            raise ValueError(f'NodeEdit position must be one of {", ".join(self.POSITIONS)}, not {position!r}')
+        if position == 'append' and (kind == 'marker' or member is not None):
+            raise ValueError(f'append needs a whole interface or props query, not {query!r}')
+        self.query = query
+        self.text = text
+        self.position = position
+
+    @property
+    def label(self):
+        return self.query if self.position == 'replace' else f'{self.position} {self.query}'
+
+    def spans(self, table, text):
+        """``(start, end, replacement)`` for every node selected in ``table``, the table of ``text``."""
+        kind, _, member = parse_query(self.query)
+        separator = None
+        if member is not None:
+            separator = ';' if kind == 'interface' else ','
+        found = []
+        for start, end in table.select(self.query):
+            if self.position == 'replace':
+                found.append((start, end, self.text))
+            elif self.position == 'before':
+                found.append((start, start, self.text))
+            elif self.position == 'after':
+                if separator is not None and text[end - 1] not in ',;':
+                    found.append((end, end, separator + self.text))
+                else:
+                    found.append((end, end, self.text))
+            else:
+                found.append((end - 1, end - 1, self.text))
+        return found
+
+    def __repr__(self):
+        return f'NodeEdit({self.label!r})'
+
+
+def _line(text, offset):
+    return text.count('\n', 0, offset) + 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Show the structural nodes of TSX files and what queries select.')
+    parser.add_argument('files', nargs='+', help='TSX files')
+    parser.add_argument('--query', action='append', default=[], help='query to resolve (repeatable)')
+    args = parser.parse_args(argv)
+
+    cache = TableCache()
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        parses = cache.parses
+        table = cache.get(text)
+        source = 'parsed' if cache.parses > parses else 'cached'
+        kinds = {}
+        for kind in table.kinds:
+            kinds[KIND_NAMES[kind]] = kinds.get(KIND_NAMES[kind], 0) + 1
+        print(f'📄 {path}: {len(table)} nodes ({source}): ' + ', '.join(f'{n} {k}' for k, n in kinds.items()))
+        for index in range(len(table)):
+            if table.kinds[index] in (INTERFACE, PROPS):
+                prefix = 'interface' if table.kinds[index] == INTERFACE else 'props'
+                print(f'   {prefix}:{table.name(index)}  (line {_line(text, table.starts[index])})')
+        for query in args.query:
+            found = table.select(query)
+            icon = '✅' if found else '⚠️'
+            print(f'   {icon} {query}: ' + (', '.join(f'line {_line(text, start)}' for start, _ in found) or 'no match'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
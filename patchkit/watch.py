@@ -0,0 +1,212 @@
+"""
+Watch registered patch targets and re-apply their patches when they change.
+
+After an upstream merge overwrites ``PreviewCanvas.tsx`` or
+``BannerEditorLayout.tsx``, the matching fixes used to be re-run by hand,
+each in a fresh interpreter. ``watch()`` keeps the selected patches built,
+with their literal matchers and regexes compiled, and waits for changes:
+through inotify on Linux, or by polling ``os.stat`` elsewhere. Events for a
+file are debounced, then only that file's edits run. Guards decide what
+still applies, so a file that already holds the patch is left alone.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from .guards import Guarded
+from .patchset import apply_patch, group_by_file, group_origins
+from .runner import apply_file
+
+DEFAULT_DEBOUNCE = 0.05
+DEFAULT_POLL_INTERVAL = 0.25
+
+# <sys/inotify.h>
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0)
+_EVENT = struct.Struct('iIII')
+
+
+class InotifySource:
+    """Changed paths from inotify watches on the targets' directories."""
+
+    # Directories rather than files: editors and ``git checkout`` often
+    # replace a file by renaming over it, which ends a per-file watch.
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+
+    def __init__(self, root, paths):
+        libc_name = ctypes.util.find_library('c')
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.root = root
+        self._dirs = {}
+        by_dir = {}
+        for path in paths:
+            directory, name = os.path.split(path)
+            by_dir.setdefault(directory, set()).add(name)
+        for directory, names in by_dir.items():
+            wd = libc.inotify_add_watch(self.fd, os.path.join(root, directory).encode(), self.MASK)
+            if wd < 0:
+                self.close()
+                raise OSError(ctypes.get_errno(), f'cannot watch {directory or "."}')
+            self._dirs[wd] = (directory, names)
+
+    def wait(self, timeout):
+        """Relative paths of watched files that changed within ``timeout`` seconds (``None``: block)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, _, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += length
+            watched = self._dirs.get(wd)
+            if watched is not None and name in watched[1]:
+                changed.add(f'{watched[0]}/{name}' if watched[0] else name)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingSource:
+    """Changed paths found by comparing ``os.stat`` size and mtime every ``interval`` seconds."""
+
+    def __init__(self, root, paths, interval=DEFAULT_POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self._stamps = {path: self._stamp(path) for path in paths}
+
+    def _stamp(self, path):
+        try:
+            stat = os.stat(os.path.join(self.root, path))
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def wait(self, timeout):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        changed = set()
+        for path, stamp in self._stamps.items():
+            current = self._stamp(path)
+            if current != stamp:
+                self._stamps[path] = current
+                changed.add(path)
+        return changed
+
+    def close(self):
+        pass
+
+
+def open_source(root, paths, poll=False, interval=DEFAULT_POLL_INTERVAL):
+    """inotify where available, polling otherwise (or when ``poll`` is set)."""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifySource(root, paths)
+        except OSError:
+            pass
+    return PollingSource(root, paths, interval)
+
+
+def _warm(edits):
+    # Compile every literal matcher and regex now rather than on the first
+    # change; guards are unwrapped so guarded edits are compiled too.
+    apply_patch('', [edit.edit if isinstance(edit, Guarded) else edit for edit in edits])
+
+
+class Watcher:
+    """Re-applies each target's edits when the target changes."""
+
+    def __init__(self, patch_sets, root, debounce=DEFAULT_DEBOUNCE, out=sys.stdout):
+        self.root = root
+        self.debounce = debounce
+        self.out = out
+        self.targets = {}
+        origins = group_origins(patch_sets)
+        for path, edits in group_by_file(patch_sets).items():
+            _warm(edits)
+            self.targets[path] = (edits, origins[path])
+        # Stamps of files as we last wrote them, so our own writes do not
+        # trigger another round.
+        self._written = {}
+
+    def _stamp(self, path):
+        try:
+            stat = os.stat(os.path.join(self.root, path))
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def handle(self, path):
+        """Re-evaluate the patches for ``path``; returns its ``FileSummary``, or ``None`` if skipped."""
+        if path not in self.targets:
+            return None
+        stamp = self._stamp(path)
+        if stamp is None or stamp == self._written.get(path):
+            return None
+        edits, origins = self.targets[path]
+        summary = apply_file(self.root, path, edits, origins=origins)
+        if summary.error:
+            print(f'❌ {path}: {summary.error}', file=self.out)
+        elif summary.changed:
+            self._written[path] = (summary.stat.st_size, summary.stat.st_mtime_ns)
+            applied = sum(1 for stat in summary.edits if stat.kind not in ('engine', 'jsx', 'tsx', 'guarded') and stat.matches)
+            print(f'🔁 {path}: re-applied {applied} edits in {summary.seconds * 1000:.1f} ms', file=self.out)
+        self.out.flush()
+        return summary
+
+    def run(self, source, stop=None):
+        """Process events from ``source`` until ``stop()`` returns true (or forever)."""
+        pending = {}
+        while stop is None or not stop():
+            timeout = max(0.0, min(pending.values()) - time.monotonic()) if pending else 0.5
+            changed = source.wait(timeout)
+            now = time.monotonic()
+            for path in changed:
+                if path in self.targets:
+                    pending[path] = now + self.debounce
+            for path in [path for path, due in pending.items() if due <= now]:
+                del pending[path]
+                self.handle(path)
+
+
+def watch(patch_sets, root, debounce=DEFAULT_DEBOUNCE, poll=False, interval=DEFAULT_POLL_INTERVAL, out=sys.stdout):
+    """Block, re-applying ``patch_sets`` as their targets change, until interrupted."""
+    watcher = Watcher(patch_sets, root, debounce, out)
+    source = open_source(root, list(watcher.targets), poll, interval)
+    kind = 'inotify' if isinstance(source, InotifySource) else f'polling every {source.interval:g}s'
+    print(f'👀 Watching {len(watcher.targets)} files ({kind}); Ctrl-C to stop', file=out)
+    out.flush()
+    for path in watcher.targets:
+        watcher.handle(path)
+    try:
+        watcher.run(source)
+    except KeyboardInterrupt:
+        print('\n👋 Stopped watching', file=out)
+    finally:
+        source.close()
+    return 0
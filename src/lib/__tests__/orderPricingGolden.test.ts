@@ -0,0 +1,84 @@
+import { readFileSync, writeFileSync } from 'node:fs';
+import { fileURLToPath } from 'node:url';
+import { describe, expect, it } from 'vitest';
+import { calculateOrderTotals, getItemPricingBreakdown, OrderItemInput } from '../order-pricing';
+import { calculateBannerPricing, BannerPricingInput } from '../bannerPricingEngine';
+import { PromoDiscountInput } from '../discount-resolver';
+
+// Golden fixtures shared with the Python bulk order verifier
+// (`python -m patchkit.pricing --golden`). After an intentional pricing
+// change, regenerate them with UPDATE_PRICING_GOLDEN=1 npx vitest run <this file>.
+const fixturePath = fileURLToPath(new URL('./fixtures/order-pricing-golden.json', import.meta.url));
+
+interface GoldenOrder {
+  id: string;
+  promo: PromoDiscountInput | null;
+  items: OrderItemInput[];
+  expected?: unknown;
+}
+
+interface GoldenBanner {
+  input: BannerPricingInput;
+  expected?: unknown;
+}
+
+const fixtures: { orders: GoldenOrder[]; banners: GoldenBanner[] } = JSON.parse(readFileSync(fixturePath, 'utf8'));
+
+function orderExpectation(order: GoldenOrder) {
+  const totals = calculateOrderTotals(order.items, order.promo);
+  return {
+    items: order.items.map((item) => getItemPricingBreakdown(item)),
+    totals: {
+      subtotal_cents: totals.subtotal_cents,
+      total_quantity: totals.total_quantity,
+      applied_discount_type: totals.applied_discount_type,
+      applied_discount_cents: totals.applied_discount_cents,
+      quantity_discount_cents: totals.quantity_discount_cents,
+      subtotal_after_discount_cents: totals.subtotal_after_discount_cents,
+      tax_cents: totals.tax_cents,
+      total_cents: totals.total_cents,
+    },
+  };
+}
+
+function bannerExpectation(banner: GoldenBanner) {
+  const result = calculateBannerPricing(banner.input);
+  return {
+    unitBasePriceCents: result.unitBasePriceCents,
+    baseBannerPriceCents: result.baseBannerPriceCents,
+    grommetsCostCents: result.grommetsCostCents,
+    ropeCostCents: result.ropeCostCents,
+    polePocketCostCents: result.polePocketCostCents,
+    subtotalBeforeDiscountCents: result.subtotalBeforeDiscountCents,
+    quantityDiscountCents: result.quantityDiscountCents,
+    subtotalCents: result.subtotalCents,
+    taxCents: result.taxCents,
+    totalCents: result.totalCents,
+  };
+}
+
+if (process.env.UPDATE_PRICING_GOLDEN) {
+  for (const order of fixtures.orders) {
+    order.expected = orderExpectation(order);
+  }
+  for (const banner of fixtures.banners) {
+    banner.expected = bannerExpectation(banner);
+  }
+  writeFileSync(fixturePath, `${JSON.stringify(fixtures, null, 2)}\n`);
+}
+
+describe('order pricing golden fixtures', () => {
+  it.each(fixtures.orders.map((order) => [order.id, order] as const))(
+    'matches calculateOrderTotals for %s',
+    (_id, order) => {
+      expect(orderExpectation(order)).toEqual(order.expected);
+    },
+  );
+
+  it.each(fixtures.banners.map((banner, index) => [index, banner] as const))(
+    'matches calculateBannerPricing for banner case %i',
+    (_index, banner) => {
+      expect(bannerExpectation(banner)).toEqual(banner.expected);
+    },
+  );
+});
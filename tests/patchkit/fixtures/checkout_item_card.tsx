@@ -0,0 +1,27 @@
+import { usd, formatDimensions, getFeatureFlags, getPricingOptions, computeTotals, PricingItem } from '@/lib/pricing';
+const CheckoutItemCard: React.FC<{ item: PricingItem }> = ({ item }) => {
+  return (
+    <div className="border border-gray-200 rounded-lg p-4">
+      <div className="flex justify-between">
+        <span className="font-medium">{formatDimensions(item.width_in, item.height_in)}</span>
+        <span>{usd(item.line_total_cents / 100)}</span>
+      </div>
+      {/* Cost Breakdown */}
+      <div className="mt-3 bg-gray-50 rounded-md p-3">
+        <h4 className="text-sm font-medium text-gray-900 mb-2">Price Breakdown</h4>
+        <div className="space-y-1 text-sm">
+          <div className="flex justify-between">
+            <span className="text-gray-600">Base banner:</span>
+            <span>{usd(item.unit_price_cents / 100)} × {item.quantity}</span>
+          </div>
+          {item.grommets !== 'none' && (
+            <div className="flex justify-between">
+              <span className="text-gray-600">Grommets ({item.grommets}):</span>
+              <span>Included</span>
+            </div>
+          )}
+        </div>
+      </div>
+    </div>
+  );
+};
@@ -0,0 +1,41 @@
+                  return (
+                    <div key={index} style={itemRow}>
+                      <div style={itemInfo}>
+                        <Text style={itemNameStyle}>{itemName}</Text>
+                        {item.options && (
+                          <Text style={itemOptions}>{item.options}</Text>
+                        )}
+                        
+                        {/* Cost Breakdown - only show if we have the data */}
+                        {hasBreakdown && (
+                          <div style={costBreakdown}>
+                            <Text style={breakdownTitle}>Price Breakdown</Text>
+                            <div style={breakdownRow}>
+                              <Text style={breakdownLabel}>{item.product_type === 'yard_sign' ? 'Signs:' : 'Base banner:'}</Text>
+                              <Text style={breakdownValue}>${(item.unitPriceCents / 100).toFixed(2)} × {itemQty}</Text>
+                            </div>
+                            {item.ropeFeet > 0 && (
+                              <div style={breakdownRow}>
+                                <Text style={breakdownLabel}>Rope ({item.ropeFeet.toFixed(1)}ft):</Text>
+                                <Text style={breakdownValue}>${(item.ropeCostCents / 100).toFixed(2)}</Text>
+                              </div>
+                            )}
+                            {item.polePocketCostCents > 0 && (
+                              <div style={breakdownRow}>
+                                <Text style={breakdownLabel}>Pole pockets:</Text>
+                                <Text style={breakdownValue}>${(item.polePocketCostCents / 100).toFixed(2)}</Text>
+                              </div>
+                            )}
+                            <div style={breakdownTotalRow}>
+                              <Text style={breakdownTotalLabel}>Line total:</Text>
+                              <Text style={breakdownTotalValue}>${itemPrice.toFixed(2)}</Text>
+                            </div>
+                          </div>
+                        )}
+                      </div>
+                      <div style={itemPricing}>
+                        <Text style={itemPriceStyle}>${itemPrice.toFixed(2)}</Text>
+                        <Text style={itemQuantity}>Qty: {itemQty}</Text>
+                      </div>
+                    </div>
+                  );
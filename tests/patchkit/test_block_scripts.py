@@ -0,0 +1,70 @@
+"""
+``update_checkout_and_email.py`` on snippets of the real components.
+
+The scripts used to end a block at the ``</div>`` that takes a tag counter
+below zero: the one closing the element that *encloses* the marker. That
+deleted the enclosing element's closing tag along with the block and left
+unbalanced JSX. ``replace_block`` ends the block with the node after the
+marker, so the enclosing ``</div>`` survives; these tests pin that.
+"""
+
+import os
+
+from patchkit.jsx import scan_jsx
+
+import update_checkout_and_email as script
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def read(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def old_block_end(content, marker, tags):
+    # The removed character loop, kept to show exactly where the rules differ.
+    start = content.find(marker)
+    depth = 0
+    for i in range(start, len(content)):
+        if any(content.startswith(f'<{tag}', i) for tag in tags):
+            depth += 1
+        elif any(content.startswith(f'</{tag}>', i) for tag in tags):
+            depth -= 1
+            if depth == -1:
+                return start, i + 6
+    return start, None
+
+
+def test_checkout_card_keeps_its_closing_div():
+    content = read('checkout_item_card.tsx')
+    patched = script.patch_checkout(content)
+
+    assert "import OrderItemBreakdown from '@/components/orders/OrderItemBreakdown';" in patched
+    assert '<OrderItemBreakdown item={item} variant="compact" />' in patched
+    assert 'Price Breakdown' not in patched
+    assert patched.count('<div') == patched.count('</div>')
+    scan_jsx(patched)
+
+    start, old_end = old_block_end(content, '{/* Cost Breakdown */}', ('div',))
+    new_end = scan_jsx(content).node_after(start + len('{/* Cost Breakdown */}')).end
+    # The old end is the card's own </div>, one line further on.
+    assert content[new_end:old_end].strip() == '</div>'
+
+
+def test_order_confirmation_item_keeps_its_closing_div():
+    content = read('order_confirmation_item.tsx')
+    patched = script.patch_email(content)
+
+    assert patched == content[:content.index('{/* Cost Breakdown - only show')] + (
+        '{/* Cost Breakdown - Using Unified Pricing Module */}\n'
+        '                        <OrderItemBreakdownEmail item={item} />\n'
+        '                      </div>\n'
+        + content[content.index('                      <div style={itemPricing}>'):]
+    )
+    scan_jsx(patched)
+
+    marker = '{/* Cost Breakdown - only show if we have the data */}'
+    start, old_end = old_block_end(content, marker, ('div', 'Text'))
+    new_end = scan_jsx(content).node_after(start + len(marker)).end
+    assert content[new_end:old_end].strip() == '</div>'
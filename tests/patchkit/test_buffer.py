@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from patchkit.buffer import EditBuffer
+
+
+def test_replace_text_matches_str_replace_once():
+    rng = random.Random(5)
+    for _ in range(300):
+        content = ''.join(rng.choice('ab\n<>é') for _ in range(rng.randint(1, 80)))
+        start = rng.randrange(len(content))
+        anchor = content[start:start + rng.randint(1, 5)]
+        text = ''.join(rng.choice('xyz\n') for _ in range(rng.randint(0, 6)))
+        assert EditBuffer(content).replace_text(anchor, text).render() == content.replace(anchor, text, 1)
+
+
+def test_many_edits_match_sequential_str_replace():
+    rng = random.Random(11)
+    for _ in range(100):
+        markers = [f'@{n}@' for n in range(rng.randint(1, 8))]
+        filler = [''.join(rng.choice('ab \n') for _ in range(rng.randint(0, 10))) for _ in markers]
+        content = ''.join(f + m for f, m in zip(filler, markers)) + 'tail\n'
+        buffer = EditBuffer(content)
+        expected = content
+        for marker in rng.sample(markers, len(markers)):
+            text = marker.strip('@') * rng.randint(0, 3)
+            buffer.replace_text(marker, text)
+            expected = expected.replace(marker, text, 1)
+        assert buffer.render() == expected
+
+
+def test_line_edits_use_original_line_numbers():
+    lines = [f'line {n}\n' for n in range(10)]
+    buffer = EditBuffer(''.join(lines))
+    buffer.insert_line(3, 'first')
+    buffer.insert_line(3, 'second')
+    buffer.replace_line(7, 'seven')
+    buffer.insert_line(10, 'end')
+
+    # What apply_changes.py did by hand, adjusting indexes after each insert.
+    expected = list(lines)
+    expected[7] = 'seven\n'
+    expected[3:3] = ['first\n', 'second\n']
+    expected.append('end\n')
+    assert buffer.render() == ''.join(expected)
+    assert buffer.find_line('line 7') == 7
+
+
+def test_missing_anchor_and_overlapping_edits_raise():
+    buffer = EditBuffer('abc\n')
+    with pytest.raises(ValueError):
+        buffer.find('zzz')
+    buffer.replace(0, 2, 'X').replace(1, 3, 'Y')
+    with pytest.raises(ValueError):
+        buffer.render()
@@ -0,0 +1,60 @@
+import os
+
+from patchkit import cache as cache_module
+from patchkit.cache import PatchCache, apply_delta, make_delta
+from patchkit.manifest import content_hash
+from patchkit.report import EditStat
+
+
+def put(cache, original, output, pid='p1'):
+    stats = [EditStat('literal', 'usd(', 1, len(output) - len(original))]
+    assert cache.put(original, content_hash(original), pid, output, content_hash(output), {'usd(': 1}, stats)
+
+
+def test_entries_from_another_match_version_are_not_served(tmp_path, monkeypatch):
+    cache = PatchCache(str(tmp_path))
+    original, output = b'const a = usd(1);\n', b'const a = formatUsd(1);\n'
+    put(cache, original, output)
+    assert cache.get(original, content_hash(original), 'p1').output == output
+
+    monkeypatch.setattr(cache_module, 'MATCH_VERSION', cache_module.MATCH_VERSION + 1)
+    assert cache.get(original, content_hash(original), 'p1') is None
+
+
+def test_round_trip_keeps_output_counts_and_stats(tmp_path):
+    cache = PatchCache(str(tmp_path))
+    original = b'header\n' * 200 + b'const a = usd(1);\n' + b'footer\n' * 200
+    output = original.replace(b'usd(', b'formatUsd(')
+    assert cache.get(original, content_hash(original), 'p1') is None
+    put(cache, original, output)
+
+    hit = cache.get(original, content_hash(original), 'p1')
+    assert hit.output == output
+    assert hit.counts == {'usd(': 1}
+    assert [(s.kind, s.label, s.matches, s.size_delta) for s in hit.edits] == [('literal', 'usd(', 1, 6)]
+    # Stored as a delta: far smaller than the file.
+    assert cache.stats()['bytes'] < len(original) // 4
+    # Another patch id, or other input bytes, is a miss.
+    assert cache.get(original, content_hash(original), 'p2') is None
+    assert cache.get(output, content_hash(output), 'p1') is None
+
+
+def test_delta_round_trips_at_the_edges():
+    for original, output in [(b'', b'new'), (b'old', b''), (b'abc', b'abc'), (b'aXc', b'aYYc'), (b'ab', b'abab')]:
+        assert apply_delta(original, *make_delta(original, output)) == output
+
+
+def test_prune_evicts_least_recently_used_first(tmp_path):
+    cache = PatchCache(str(tmp_path))
+    inputs = [f'const n = {n};\n'.encode() for n in range(4)]
+    for n, original in enumerate(inputs):
+        put(cache, original, original + b'// patched\n')
+        # Distinct, increasing mtimes regardless of the filesystem's resolution.
+        os.utime(cache._path(content_hash(original), 'p1'), ns=(n * 10 ** 9, n * 10 ** 9))
+    # Reading an entry makes it the most recently used.
+    assert cache.get(inputs[0], content_hash(inputs[0]), 'p1') is not None
+
+    assert cache.prune(max_entries=2) == 2
+    assert [cache.get(i, content_hash(i), 'p1') is not None for i in inputs] == [True, False, False, True]
+    assert cache.prune(max_bytes=0) == 2
+    assert cache.stats() == {'entries': 0, 'bytes': 0}
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from patchkit.conflicts import EditConflict, IntervalTree, Span, find_conflicts, overlaps
+from patchkit.engine import Edit
+from patchkit.patchset import apply_patch
+from patchkit.patterns import RegexEdit
+
+
+def test_overlap_rules_for_ranges_and_insertion_points():
+    assert overlaps(0, 5, 4, 8)
+    assert not overlaps(0, 5, 5, 8)          # touching ranges
+    assert overlaps(3, 3, 0, 5)              # insertion inside a range
+    assert not overlaps(5, 5, 0, 5)          # insertion at a range's end
+    assert overlaps(5, 5, 5, 5)              # two insertions at one point
+    assert not overlaps(4, 4, 5, 5)
+
+
+def test_interval_tree_agrees_with_brute_force():
+    rng = random.Random(11)
+    for _ in range(50):
+        intervals = []
+        for value in range(rng.randint(0, 60)):
+            start = rng.randint(0, 100)
+            intervals.append((start, start + rng.choice([0, 0, 1, 3, 10, 40]), value))
+        tree = IntervalTree(intervals)
+        for _ in range(20):
+            start = rng.randint(0, 120)
+            end = start + rng.choice([0, 1, 5, 30])
+            expected = sorted(item for item in intervals if overlaps(start, end, item[0], item[1]))
+            assert sorted(tree.overlapping(start, end)) == expected
+
+
+def test_find_conflicts_reports_each_pair_once():
+    spans = [
+        Span(0, 10, 'a', 'literal', 'first'),
+        Span(5, 15, 'b', 'regex', 'second'),
+        Span(20, 25, 'c', 'literal', 'third'),
+        Span(25, 25, 'd', 'block', 'fourth'),
+    ]
+    conflicts = find_conflicts(spans)
+    assert [(c.first.label, c.second.label) for c in conflicts] == [('first', 'second')]
+    assert find_conflicts(spans[2:]) == []
+
+
+def test_overlapping_edits_from_two_patch_sets_raise_and_apply_nothing():
+    content = 'setTimeout(() => {\n  setUploading(false);\n}, 300);\n'
+    edits = [Edit('setUploading(false);', 'setUploading(false);\n  setError(null);'), RegexEdit(r'\}, \d+\);', '}, 0);')]
+    assert apply_patch(content, edits).text.endswith('}, 0);\n')
+    with pytest.raises(EditConflict) as raised:
+        apply_patch(content, [Edit('(() => {\n  setUploading', 'x'), Edit('setUploading(false)', 'y')], origins=['fix', 'fix_mobile'])
+    assert 'fix_mobile' in str(raised.value)
+
+
+def test_identical_edits_from_two_patch_sets_are_not_a_conflict():
+    content = 'usd(1); usd(2);'
+    result = apply_patch(content, [Edit('usd(', 'formatUsd('), Edit('usd(', 'formatUsd(')], origins=['a', 'b'])
+    assert result.text == 'formatUsd(1); formatUsd(2);'
@@ -0,0 +1,37 @@
+import difflib
+import random
+
+from patchkit.diff import diff_opcodes, unified_diff
+
+
+def apply_opcodes(a, b, opcodes):
+    out = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        out.extend(a[i1:i2] if tag == 'equal' else b[j1:j2])
+    return out
+
+
+def test_opcodes_rebuild_the_new_text_with_a_shortest_script():
+    rng = random.Random(5)
+    for _ in range(200):
+        a = [rng.choice('abcde') for _ in range(rng.randint(0, 30))]
+        b = [rng.choice('abcde') for _ in range(rng.randint(0, 30))]
+        opcodes = diff_opcodes(a, b)
+        assert apply_opcodes(a, b, opcodes) == b
+        kept = sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag == 'equal')
+        # The longest common subsequence, which difflib does not guarantee.
+        lcs = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+        for i in range(len(a) - 1, -1, -1):
+            for j in range(len(b) - 1, -1, -1):
+                lcs[i][j] = lcs[i + 1][j + 1] + 1 if a[i] == b[j] else max(lcs[i + 1][j], lcs[i][j + 1])
+        assert kept == lcs[0][0]
+
+
+def test_unified_diff_matches_difflib_on_a_simple_edit():
+    old = ''.join(f'line {i}\n' for i in range(20))
+    new = old.replace('line 10\n', 'line ten\n')
+    expected = ''.join(difflib.unified_diff(
+        old.splitlines(keepends=True), new.splitlines(keepends=True), 'a/x.tsx', 'b/x.tsx', n=3,
+    ))
+    assert unified_diff(old, new, 'x.tsx') == expected
+    assert unified_diff(old, old, 'x.tsx') == ''
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from patchkit import engine
+from patchkit.engine import Edit, apply_edits, find_matches
+from patchkit.runner import apply_file
+
+
+def reference(content, replacements):
+    # Leftmost match first, longest anchor among those starting there.
+    anchors = sorted(replacements, key=len, reverse=True)
+    pieces = []
+    counts = dict.fromkeys(replacements, 0)
+    i = 0
+    while i < len(content):
+        for anchor in anchors:
+            if content.startswith(anchor, i):
+                pieces.append(replacements[anchor])
+                counts[anchor] += 1
+                i += len(anchor)
+                break
+        else:
+            pieces.append(content[i])
+            i += 1
+    return ''.join(pieces), counts
+
+
+def test_longest_anchor_wins_at_the_same_offset():
+    result = apply_edits('<div className="a">', [('<div', '<section'), ('<div className=', '<div class=')])
+    assert result.text == '<div class="a">'
+    assert result.counts == {'<div': 0, '<div className=': 1}
+
+
+def test_leftmost_match_wins_over_a_longer_later_one():
+    # "bcd" would be longer, but "ab" starts first and consumes the "b".
+    assert find_matches('abcd', [('ab', 'X'), ('bcd', 'Y')]) == [(0, 2, 'ab')]
+    assert apply_edits('abcd', [('ab', 'X'), ('bcd', 'Y')]).text == 'Xcd'
+
+
+def test_replacements_never_feed_other_anchors():
+    result = apply_edits('usd(total)', [('usd', 'formatUsd'), ('formatUsd', 'broken')])
+    assert result.text == 'formatUsd(total)'
+    assert result.missing == ['formatUsd']
+
+
+def test_unchanged_text_is_returned_as_is():
+    content = 'const a = 1;\n'
+    result = apply_edits(content, [Edit('missing', 'x')])
+    assert result.text is content
+    assert not result.changed
+
+
+def test_conflicting_replacements_for_one_anchor_are_rejected():
+    with pytest.raises(ValueError):
+        apply_edits('abc', [('a', 'x'), ('a', 'y')])
+    assert apply_edits('abc', [('a', 'x'), ('a', 'x')]).text == 'xbc'
+
+
+def test_matches_a_naive_leftmost_longest_scan():
+    rng = random.Random(7)
+    for _ in range(300):
+        content = ''.join(rng.choice('abc<>é') for _ in range(rng.randint(0, 60)))
+        anchors = {''.join(rng.choice('abc<>é') for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))}
+        replacements = {anchor: f'[{anchor.upper()}]' for anchor in anchors}
+        result = apply_edits(content, list(replacements.items()))
+        assert (result.text, result.counts) == reference(content, replacements)
+
+
+def test_hundreds_of_nested_prefix_anchors():
+    # Each anchor is a prefix of the next: one group per anchor in the trie.
+    replacements = {'a' * n: f'[{n}]' for n in range(1, 600)}
+    content = 'xaaaax' + 'a' * 700 + 'x'
+    result = apply_edits(content, list(replacements.items()))
+    assert (result.text, result.counts) == reference(content, replacements)
+
+
+def test_a_recursion_error_fails_only_its_file(tmp_path, monkeypatch):
+    def too_deep(*args, **kwargs):
+        raise RecursionError('maximum recursion depth exceeded')
+
+    monkeypatch.setattr('patchkit.runner.apply_patch', too_deep)
+    (tmp_path / 'a.ts').write_text('usd(1);\n', encoding='utf-8')
+    summary = apply_file(str(tmp_path), 'a.ts', [Edit('usd(', 'formatUsd(')])
+    assert summary.status == 'failed' and 'recursion' in summary.error
+
+
+def test_alternation_fallback_matches_the_trie(monkeypatch):
+    monkeypatch.setattr(engine, 'MAX_TRIE_DEPTH', 0)
+    engine._matcher.cache_clear()
+    try:
+        test_matches_a_naive_leftmost_longest_scan()
+    finally:
+        engine._matcher.cache_clear()
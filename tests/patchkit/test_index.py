@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from patchkit.index import AmbiguousAnchor, AnchorIndex, anchor_tokens
+
+ANCHOR = '{/* Cost Breakdown */}'
+
+
+def write(root, path, text):
+    full_path = root / path
+    full_path.parent.mkdir(parents=True, exist_ok=True)
+    full_path.write_text(text, encoding='utf-8')
+    return full_path
+
+
+def open_index(root, index_file):
+    index = AnchorIndex(str(root), str(index_file))
+    index.refresh()
+    return index
+
+
+def test_finds_a_target_after_it_moves(tmp_path):
+    root = tmp_path / 'tree'
+    index_file = tmp_path / 'index.json'
+    old = write(root, 'src/pages/Checkout.tsx', f'<div>\n  {ANCHOR}\n  <div>Price Breakdown</div>\n</div>\n')
+    write(root, 'src/pages/Design.tsx', 'const Design = () => <div>Cost</div>;\n')
+    write(root, 'netlify/functions/price.mjs', 'export const breakdown = 1;\n')
+
+    index = open_index(root, index_file)
+    assert index.find_target([ANCHOR, 'Price Breakdown']) == 'src/pages/Checkout.tsx'
+    index.save()
+
+    # The saved index and its cached anchor location are reused, then
+    # corrected by the refresh once the file moves.
+    new = root / 'src/components/checkout/Checkout.tsx'
+    new.parent.mkdir(parents=True)
+    os.replace(old, new)
+    index = AnchorIndex(str(root), str(index_file))
+    assert ANCHOR in index.anchors
+    assert index.refresh() == {'src/pages/Checkout.tsx', 'src/components/checkout/Checkout.tsx'}
+    assert index.find_target([ANCHOR, 'Price Breakdown']) == 'src/components/checkout/Checkout.tsx'
+    assert index.locate(ANCHOR) == {'src/components/checkout/Checkout.tsx': [8]}
+
+
+def test_refresh_only_rereads_changed_files(tmp_path):
+    root = tmp_path / 'tree'
+    write(root, 'src/a.ts', 'const alpha = 1;\n')
+    write(root, 'src/b.ts', 'const beta = 2;\n')
+    index = open_index(root, tmp_path / 'index.json')
+    assert index.refresh() == set()
+
+    write(root, 'src/b.ts', 'const gamma = 3;\n')
+    assert index.refresh() == {'src/b.ts'}
+    assert index.candidates('gamma = 3') == {'src/b.ts'}
+    assert index.candidates('beta') == set()
+
+
+def test_ambiguous_or_missing_anchor_raises(tmp_path):
+    root = tmp_path / 'tree'
+    write(root, 'src/a.tsx', f'{ANCHOR}\n')
+    write(root, 'src/b.tsx', f'{ANCHOR}\n')
+    index = open_index(root, tmp_path / 'index.json')
+    with pytest.raises(AmbiguousAnchor) as excinfo:
+        index.find_target([ANCHOR])
+    assert excinfo.value.paths == ['src/a.tsx', 'src/b.tsx']
+    with pytest.raises(AmbiguousAnchor):
+        index.find_target(['nowhere in the tree'])
+
+
+def test_tokens_touching_the_anchor_edges_may_be_partial_words():
+    assert anchor_tokens('osting Breakdown total') == {
+        ('osting', 'end'), ('Breakdown', 'whole'), ('total', 'start'),
+    }
+    assert anchor_tokens('Breakdown') == {('Breakdown', 'inside')}
+    assert anchor_tokens('{/* */}') == set()
@@ -0,0 +1,74 @@
+import pytest
+
+from patchkit.jsx import BlockEdit, JsxScanError, locate_blocks, replace_block, scan_jsx
+
+
+def names(index):
+    return [node.name for node in index.nodes]
+
+
+def test_strings_and_comments_do_not_affect_the_balance():
+    text = '''
+const label = '</div> inside a string';
+const other = "<span>";
+// </div> in a line comment
+/* <p> in a block comment */
+const view = (
+  <div className="a">
+    <p>Don't worry, it's fine.</p>
+  </div>
+);
+'''
+    index = scan_jsx(text)
+    assert names(index) == ['div', 'p']
+    div = index.nodes[0]
+    assert text[div.start:div.end].startswith('<div') and text[div.start:div.end].endswith('</div>')
+
+
+def test_template_literals_and_their_substitutions():
+    text = 'const a = `</div> ${count > 1 ? `${n} <b>` : ""}`;\nconst v = <i>{`${x}</i>`}</i>;\n'
+    index = scan_jsx(text)
+    assert names(index) == ['i', None]
+    assert text[index.nodes[0].start:index.nodes[0].end] == '<i>{`${x}</i>`}</i>'
+
+
+def test_regex_literals_are_skipped():
+    text = 'const tag = /<div>/g;\nconst parts = value.split(/[<>]/);\nconst v = <span>{a / b}</span>;\n'
+    index = scan_jsx(text)
+    assert names(index) == ['span', None]
+
+
+def test_generics_are_not_elements():
+    text = '''
+const [value, setValue] = useState<string>('');
+const pick = <T,>(items: T[]) => items[0];
+function first<K extends keyof Props>(key: K) { return key; }
+const ref = useRef<HTMLDivElement | null>(null);
+const v = <Wrapper>child</Wrapper>;
+'''
+    index = scan_jsx(text)
+    assert names(index) == ['Wrapper']
+
+
+def test_fragments_self_closing_and_expression_children():
+    text = 'const v = (<>\n  <img src={src} />\n  {open && <Badge variant="x">{count}</Badge>}\n</>);\n'
+    index = scan_jsx(text)
+    assert names(index) == ['', 'img', None, 'Badge', None]
+    assert index.nodes[1].self_closing
+    assert index.nodes[3].parent is index.nodes[2]
+
+
+def test_mismatched_and_unclosed_tags_raise():
+    with pytest.raises(JsxScanError):
+        scan_jsx('const v = <div><span></div>;')
+    with pytest.raises(JsxScanError):
+        scan_jsx('const v = <div><span></span>;')
+
+
+def test_block_is_the_marker_and_the_next_node():
+    text = '<div>\n  {/* Cost Breakdown */}\n  <div className="x">\n    <p>a</p>\n  </div>\n  <p>after</p>\n</div>\n'
+    located, counts = locate_blocks(text, [BlockEdit('{/* Cost Breakdown */}', 'NEW')])
+    (_, start, end), = located
+    assert counts == {'{/* Cost Breakdown */}': 1}
+    assert text[start:end] == '{/* Cost Breakdown */}\n  <div className="x">\n    <p>a</p>\n  </div>'
+    assert replace_block(text, 'missing marker', 'NEW') == text
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from patchkit.engine import Edit
+from patchkit.manifest import DEFAULT_MANIFEST, Manifest, manifest_path
+from patchkit.patchset import PatchSet
+from patchkit.paths import REPO_ROOT
+from patchkit.runner import run
+
+PATCH_SET = PatchSet('usd', [('a.ts', Edit('usd(', 'formatUsd('))])
+
+
+def tree(tmp_path, name, text='usd(1);\n'):
+    root = tmp_path / name
+    root.mkdir()
+    (root / 'a.ts').write_text(text, encoding='utf-8')
+    return root
+
+
+def test_each_root_has_its_own_manifest(tmp_path):
+    assert manifest_path(REPO_ROOT) == DEFAULT_MANIFEST
+    assert manifest_path(str(tmp_path / 'one')) != manifest_path(str(tmp_path / 'two'))
+    assert os.path.dirname(manifest_path(str(tmp_path / 'one'))) == os.path.dirname(DEFAULT_MANIFEST)
+
+
+def test_a_record_for_one_root_never_skips_a_file_in_another(tmp_path):
+    one = tree(tmp_path, 'one')
+    path = str(tmp_path / 'manifest.json')
+    manifest = Manifest(path, str(one))
+    assert [s.status for s in run([PATCH_SET], root=str(one), workers=1, manifest=manifest)] == ['updated']
+    manifest.save()
+
+    # Unpatched, but with the size and mtime recorded for the other tree's post-image.
+    two = tree(tmp_path, 'two', 'usd(1);      \n')
+    stat = os.stat(one / 'a.ts')
+    assert stat.st_size == os.stat(two / 'a.ts').st_size
+    os.utime(two / 'a.ts', ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    summaries = run([PATCH_SET], root=str(two), workers=1, manifest=Manifest(path, str(two)))
+    assert [s.status for s in summaries] == ['updated']
+    assert (two / 'a.ts').read_text(encoding='utf-8') == 'formatUsd(1);      \n'
+    with pytest.raises(ValueError):
+        run([PATCH_SET], root=str(two), workers=1, manifest=Manifest(path, str(one)))
+
+
+def test_touched_but_unchanged_file_is_still_skipped(tmp_path):
+    root = tree(tmp_path, 'tree')
+    path = str(tmp_path / 'manifest.json')
+    manifest = Manifest(path, str(root))
+    run([PATCH_SET], root=str(root), workers=1, manifest=manifest)
+    manifest.save()
+
+    os.utime(root / 'a.ts', ns=(0, 10 ** 18))
+    manifest = Manifest(path, str(root))
+    assert [s.status for s in run([PATCH_SET], root=str(root), workers=1, manifest=manifest)] == ['skipped']
+    # The hash matched, so the new mtime is recorded and the next run skips without reading.
+    assert manifest.dirty
+    assert next(iter(manifest.entries.values()))['mtime_ns'] == 10 ** 18
+
+
+def test_changed_content_is_patched_again(tmp_path):
+    root = tree(tmp_path, 'tree')
+    path = str(tmp_path / 'manifest.json')
+    manifest = Manifest(path, str(root))
+    run([PATCH_SET], root=str(root), workers=1, manifest=manifest)
+    manifest.save()
+
+    # An upstream merge brings the unpatched call back, at the same size, so
+    # only the hash tells the contents apart.
+    (root / 'a.ts').write_text('usd(1);      \n', encoding='utf-8')
+    assert os.path.getsize(root / 'a.ts') == len('formatUsd(1);\n')
+    manifest = Manifest(path, str(root))
+    assert [s.status for s in run([PATCH_SET], root=str(root), workers=1, manifest=manifest)] == ['updated']
+    assert (root / 'a.ts').read_text(encoding='utf-8') == 'formatUsd(1);      \n'
@@ -0,0 +1,72 @@
+import re
+import signal
+import time
+
+import pytest
+
+from patchkit.patterns import PatternTimeout, SafePattern, bound_lazy_dots, required_literal
+
+
+@pytest.mark.parametrize('pattern, expected', [
+    (r'a.*?b', r'a.{0,5}?b'),
+    (r'a.+?b', r'a.{1,5}?b'),
+    (r'(?s)\s*{/\* PDF Preview Overlay \*/}.*?}\s*\)', r'(?s)\s*{/\* PDF Preview Overlay \*/}.{0,5}?}\s*\)'),
+    # A dot after an escaped backslash is a wildcard.
+    (r'\\.*?x', r'\\.{0,5}?x'),
+    # Left alone: an escaped dot, and anything inside a character class.
+    (r'\.*?', r'\.*?'),
+    (r'[.*?]', r'[.*?]'),
+    (r'[^].*?]x.*?', r'[^].*?]x.{0,5}?'),
+    (r'[\].+?].+?', r'[\].+?].{1,5}?'),
+    (r'.*', r'.*'),
+])
+def test_bound_lazy_dots_only_rewrites_wildcards(pattern, expected):
+    assert bound_lazy_dots(pattern, 5) == expected
+
+
+def test_bounded_pattern_matches_like_the_original_within_the_bound():
+    samples = ['a.b', 'a?b', 'a*b', 'a\\xb', '[x]', 'ab', 'a..b', ']x.?', 'a\nb']
+    for pattern in [r'a.*?b', r'a.+?b', r'\\.*?b', r'[.*?]', r'[^].*?]x.*?', r'(?s)a.*?b']:
+        original, bounded = re.compile(pattern), re.compile(bound_lazy_dots(pattern, 50))
+        for sample in samples:
+            assert [m.span() for m in original.finditer(sample)] == [m.span() for m in bounded.finditer(sample)]
+
+
+def test_bounded_pattern_gives_up_past_the_span():
+    assert SafePattern(r'a.*?b', safe=True, max_span=3).search('a' + 'x' * 3 + 'b') is not None
+    assert SafePattern(r'a.*?b', safe=True, max_span=3).search('a' + 'x' * 4 + 'b') is None
+
+
+@pytest.mark.parametrize('pattern, flags, literal', [
+    (r'abc.*defg', 0, 'defg'),
+    (r'(?:foo|bar)bazz', 0, 'bazz'),
+    (r'{/\* PDF Preview Overlay \*/}.*?}', re.DOTALL, '{/* PDF Preview Overlay */}'),
+    (r'ab.*cd', 0, None),
+    (r'usd\(', re.IGNORECASE, None),
+    (r'(?i)usd\(', 0, None),
+    (r'unbalanced(', 0, None),
+])
+def test_required_literal(pattern, flags, literal):
+    assert required_literal(pattern, flags) == literal
+
+
+def test_prefilter_skips_the_regex_when_the_literal_is_missing():
+    # Catastrophic on this input, but the literal is absent, so the regex never runs.
+    pattern = SafePattern(r'(a+)+zzz', budget=0.05)
+    content = 'a' * 40 + 'b'
+    assert pattern.literal == 'zzz'
+    assert not pattern.may_match(content)
+    assert pattern.search(content) is None
+    assert pattern.subn('', content) == (content, 0)
+
+
+@pytest.mark.skipif(not hasattr(signal, 'setitimer'), reason='needs SIGALRM')
+def test_budget_interrupts_a_runaway_match():
+    pattern = SafePattern(r'(a+)+b', literal='', budget=0.05)
+    started = time.perf_counter()
+    with pytest.raises(PatternTimeout):
+        pattern.search('a' * 40)
+    assert time.perf_counter() - started < 2
+    # The previous handler is restored and the timer cleared.
+    assert signal.getsignal(signal.SIGALRM) is signal.SIG_DFL
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
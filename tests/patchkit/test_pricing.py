@@ -0,0 +1,71 @@
+import copy
+import io
+import json
+import os
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from patchkit import pricing  # noqa: E402
+from patchkit.pricing import CHECKS, DEFAULT_FIXTURES, load_export, verify  # noqa: E402
+
+
+@pytest.fixture
+def golden():
+    if not os.path.exists(DEFAULT_FIXTURES):
+        pytest.skip('golden fixtures are not in this tree')
+    with open(DEFAULT_FIXTURES, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def stored_orders(golden):
+    # The golden orders with the TypeScript totals stored on them, as an export would have them.
+    orders = []
+    for order in copy.deepcopy(golden['orders']):
+        expected = order.pop('expected')
+        for field in ('subtotal_cents', 'tax_cents', 'total_cents'):
+            order[field] = expected['totals'][field]
+        orders.append(order)
+    return orders
+
+
+def write_json(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return str(path)
+
+
+def test_golden_fixtures_match(golden):
+    out = io.StringIO()
+    assert pricing.check_golden(DEFAULT_FIXTURES, out) == 0
+    assert 'golden cases match' in out.getvalue()
+
+
+def test_verify_flags_only_the_tampered_order(golden, tmp_path):
+    orders = stored_orders(golden)
+    export = load_export(write_json(tmp_path, 'orders.json', {'orders': orders}))
+    # The fixtures store no per-item costs, so only the order checks apply.
+    item_checks = ('unit_price', 'rope', 'pole_pocket', 'grommets', 'line_total')
+    assert {result.check: len(result) for result in verify(export, skip=item_checks)} == {
+        'subtotal': 0, 'tax': 0, 'total': 0,
+    }
+
+    orders[3]['total_cents'] += 1
+    path = tmp_path / 'orders.jsonl'
+    path.write_text('\n'.join(json.dumps(order) for order in orders), encoding='utf-8')
+    export = load_export(str(path))
+    (total,) = verify(export, skip=[check for check in CHECKS if check != 'total'])
+    assert [export.order_ids[row] for row in total.rows] == ['golden-04']
+    assert list(total.stored - total.expected) == [1]
+
+
+@pytest.mark.parametrize('data', [
+    42, 'orders', {'orders': 5}, [1, 2], [{'items': [3]}], [{'items': 'abc'}], [{'promo': 7}],
+])
+def test_wrongly_shaped_json_is_an_unreadable_export(tmp_path, capsys, data):
+    path = write_json(tmp_path, 'bad.json', data)
+    with pytest.raises(ValueError):
+        load_export(path)
+    assert pricing.main([path]) == 1
+    assert 'unreadable export' in capsys.readouterr().out
@@ -0,0 +1,109 @@
+import json
+import os
+
+from patchkit import cli
+from patchkit.engine import Edit, patch_file
+from patchkit.patchset import PatchSet
+from patchkit.runner import apply_file, run
+from patchkit.stream import stream_file
+
+BANNER = 'src/components/design/BannerEditorLayout.tsx'
+INTERFACE = 'interface BannerEditorLayoutProps {\n  onOpenAIModal?: () => void;\n}\n'
+
+
+def write(root, path, text):
+    full_path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return full_path
+
+
+def read(full_path):
+    with open(full_path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_unmatched_edit_fails_the_file_and_writes_nothing(tmp_path):
+    full_path = write(str(tmp_path), 'a.ts', 'usd(1); usd(2);\n')
+    summary = apply_file(str(tmp_path), 'a.ts', [Edit('usd(', 'formatUsd('), Edit('formatDimensions', 'fmt')])
+    assert summary.status == 'failed'
+    assert "'formatDimensions'" in summary.error
+    assert read(full_path) == 'usd(1); usd(2);\n'
+
+
+def test_streamed_and_swept_files_follow_the_same_rule(tmp_path):
+    root = str(tmp_path)
+    edits = [Edit('usd(', 'formatUsd('), Edit('formatDimensions', 'fmt')]
+    big = write(root, 'big.sql', 'usd(1);\n' * 64)
+    summary = stream_file(root, 'big.sql', edits, window=16, strict=True)
+    assert summary.error is not None and read(big) == 'usd(1);\n' * 64
+    assert not [name for name in os.listdir(root) if name.endswith('.tmp')]
+
+    paths = [write(root, f'{name}.ts', 'usd(1);\n') for name in 'abc']
+    patch_set = PatchSet('sweep', [(f'{name}.ts', edit) for name in 'abc' for edit in edits])
+    summaries = run([patch_set], root=root, workers=1, io_workers=2)
+    assert [summary.status for summary in summaries] == ['failed'] * 3
+    assert all(read(path) == 'usd(1);\n' for path in paths)
+
+
+def test_patch_file_strict_writes_nothing_unless_every_anchor_matched(tmp_path):
+    full_path = write(str(tmp_path), 'a.ts', 'usd(1);\n')
+    result = patch_file(full_path, [('usd(', 'formatUsd('), ('missing', 'x')], strict=True)
+    assert result.missing == ['missing']
+    assert read(full_path) == 'usd(1);\n'
+    patch_file(full_path, [('usd(', 'formatUsd('), ('missing', 'x')])
+    assert read(full_path) == 'formatUsd(1);\n'
+
+
+def test_cli_exits_non_zero_on_a_partly_matched_patch(tmp_path):
+    full_path = write(str(tmp_path), BANNER, INTERFACE)
+    report = str(tmp_path / 'report.json')
+    args = ['banner-editor-design-service-mode', '--root', str(tmp_path), '--no-manifest', '--no-cache']
+    assert cli.main(args + ['--report', report]) == 1
+    assert read(full_path) == INTERFACE
+    with open(report, encoding='utf-8') as f:
+        files = json.load(f)['files']
+    assert files[0]['status'] == 'failed' and 'matched nothing' in files[0]['error']
+
+    patched = INTERFACE + (
+        'const BannerEditorLayout: React.FC<BannerEditorLayoutProps> = ({ onOpenAIModal }) => {\n'
+        '  const [designServiceMode, setDesignServiceMode] = useState(false);\n'
+    )
+    write(str(tmp_path), BANNER, patched)
+    assert cli.main(args) == 0
+    assert 'externalDesignServiceMode' in read(full_path)
+
+
+def test_cli_honours_patchkit_profile(tmp_path, monkeypatch):
+    root = tmp_path / 'tree'
+    write(str(root), 'src/pages/Design.tsx', '  const handleLetUsDesign = () => {\n    setDesignServiceMode(true);\n')
+    monkeypatch.setenv('PATCHKIT_PROFILE', str(tmp_path / 'profiles'))
+    assert cli.main(['add_debug', '--root', str(root), '--no-manifest', '--no-cache']) == 0
+    assert os.listdir(tmp_path / 'profiles') == ['src__pages__Design.tsx.prof']
+
+
+def test_sweep_reports_what_the_process_pool_does(tmp_path):
+    sources = {
+        'src/a.ts': 'usd(1);\nformatDimensions(x);\n',
+        'src/b.ts': 'usd(2);\n' * 40 + 'formatDimensions(y);\n',
+        'src/c.ts': 'usd(3);\n',
+        'lib/d.sql': ('usd(4) formatDimensions\n' * 20),
+    }
+    edits = [Edit('usd(', 'formatUsd('), Edit('formatDimensions', 'fmt')]
+    patch_set = PatchSet('sweep', [(path, edit) for path in sources for edit in edits])
+
+    results = {}
+    for name, options in [('pool', {'workers': 1}), ('sweep', {'io_workers': 2})]:
+        root = str(tmp_path / name)
+        for path, text in sources.items():
+            write(root, path, text)
+        summaries = run([patch_set], root=root, stream_bytes=256, **options)
+        results[name] = (
+            sorted((s.path, s.status, s.counts, s.error, s.pre_hash, s.post_hash) for s in summaries),
+            {path: read(os.path.join(root, path)) for path in sources},
+        )
+    assert results['sweep'] == results['pool']
+    statuses = {path: status for path, status, *_ in results['pool'][0]}
+    assert statuses == {'src/a.ts': 'updated', 'src/b.ts': 'updated', 'src/c.ts': 'failed', 'lib/d.sql': 'updated'}
+    assert results['pool'][1]['src/c.ts'] == 'usd(3);\n'
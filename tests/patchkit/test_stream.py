@@ -0,0 +1,43 @@
+import os
+import random
+
+from patchkit.engine import Edit
+from patchkit.patchset import apply_patch
+from patchkit.stream import stream_file
+
+WINDOW = 16
+
+
+def check(tmp_path, content, edits):
+    path = tmp_path / 'big.sql'
+    path.write_bytes(content.encode('utf-8'))
+    summary = stream_file(str(tmp_path), 'big.sql', edits, window=WINDOW)
+    expected = apply_patch(content, edits)
+    assert summary.error is None
+    assert path.read_bytes().decode('utf-8') == expected.text
+    assert summary.changed == expected.changed
+    assert dict(summary.counts) == dict(expected.counts)
+
+
+def test_anchors_across_window_boundaries(tmp_path):
+    # Every anchor straddles a 16-byte boundary somewhere in the file.
+    content = ('x' * 13 + 'usd(' + 'y' * 9 + 'formatDimensions' + 'z' * 5 + 'é€' + 'usd(') * 20
+    check(tmp_path, content, [Edit('usd(', 'formatUsd('), Edit('formatDimensions', 'fmt'), Edit('é€', '€é')])
+
+
+def test_matches_in_memory_output_for_random_layouts(tmp_path):
+    rng = random.Random(3)
+    for _ in range(40):
+        content = ''.join(rng.choice(['a', 'b', 'ab', 'é', '\n', 'abba']) for _ in range(rng.randint(1, 200)))
+        anchors = sorted({''.join(rng.choice('abé') for _ in range(rng.randint(1, 20))) for _ in range(3)})
+        check(tmp_path, content, [Edit(anchor, anchor.upper() + '!') for anchor in anchors])
+
+
+def test_no_match_leaves_the_file_alone(tmp_path):
+    path = tmp_path / 'big.sql'
+    path.write_bytes(b'nothing to see here\n' * 10)
+    before = os.stat(path)
+    summary = stream_file(str(tmp_path), 'big.sql', [Edit('missing', 'x')], window=WINDOW)
+    assert not summary.changed
+    assert os.stat(path).st_mtime_ns == before.st_mtime_ns
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
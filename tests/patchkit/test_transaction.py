@@ -0,0 +1,52 @@
+import os
+import stat
+
+import pytest
+
+from patchkit import transaction
+from patchkit.transaction import Transaction, TransactionError
+
+
+def _stage(tx, root, name, old, new, mode):
+    path = root / name
+    path.write_bytes(old)
+    os.chmod(path, mode)
+    tx.stage(name, new, old, os.stat(path))
+    return path
+
+
+def test_commit_writes_all_files_and_keeps_permissions(tmp_path):
+    tx = Transaction(str(tmp_path))
+    a = _stage(tx, tmp_path, 'a.ts', b'a = 1\n', b'a = 2\n', 0o644)
+    b = _stage(tx, tmp_path, 'b.ts', b'b = 1\n', b'b = 2\n', 0o755)
+    stats = tx.commit()
+    assert sorted(stats) == ['a.ts', 'b.ts']
+    assert a.read_bytes() == b'a = 2\n' and b.read_bytes() == b'b = 2\n'
+    assert stat.S_IMODE(os.stat(a).st_mode) == 0o644
+    assert stat.S_IMODE(os.stat(b).st_mode) == 0o755
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_failed_rename_rolls_back_contents_and_permissions(tmp_path, monkeypatch):
+    tx = Transaction(str(tmp_path))
+    a = _stage(tx, tmp_path, 'a.ts', b'a = 1\n', b'a = 2\n', 0o644)
+    b = _stage(tx, tmp_path, 'b.ts', b'b = 1\n', b'b = 2\n', 0o640)
+
+    real_replace = os.replace
+    calls = []
+
+    def replace(src, dst):
+        calls.append(dst)
+        if len(calls) == 2:
+            raise OSError('disk full')
+        real_replace(src, dst)
+
+    monkeypatch.setattr(transaction.os, 'replace', replace)
+    with pytest.raises(TransactionError):
+        tx.commit()
+    monkeypatch.undo()
+
+    assert a.read_bytes() == b'a = 1\n' and b.read_bytes() == b'b = 1\n'
+    assert stat.S_IMODE(os.stat(a).st_mode) == 0o644
+    assert stat.S_IMODE(os.stat(b).st_mode) == 0o640
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
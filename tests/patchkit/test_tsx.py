@@ -0,0 +1,67 @@
+from patchkit.tsx import NodeEdit, parse_tsx
+
+COMPONENT = """interface PreviewCanvasProps {
+  file?: string;
+  isUploading?: boolean%s
+}
+
+const PreviewCanvas: React.FC<PreviewCanvasProps> = ({
+  file,
+  isUploading = false%s
+}) => {
+  return <div className="canvas">{file}</div>;
+};
+"""
+
+EDITS = [
+    NodeEdit('interface:PreviewCanvasProps.isUploading', '\n  isRenderingPdf?: boolean;', 'after'),
+    NodeEdit('props:PreviewCanvas.isUploading', '\n  isRenderingPdf = false,', 'after'),
+]
+
+EXPECTED = """interface PreviewCanvasProps {
+  file?: string;
+  isUploading?: boolean;
+  isRenderingPdf?: boolean;
+}
+
+const PreviewCanvas: React.FC<PreviewCanvasProps> = ({
+  file,
+  isUploading = false,
+  isRenderingPdf = false,
+}) => {
+  return <div className="canvas">{file}</div>;
+};
+"""
+
+
+def apply(text, edits):
+    table = parse_tsx(text)
+    spans = sorted(span for edit in edits for span in edit.spans(table, text))
+    out = []
+    cursor = 0
+    for start, end, replacement in spans:
+        out.append(text[cursor:start])
+        out.append(replacement)
+        cursor = end
+    out.append(text[cursor:])
+    return ''.join(out)
+
+
+def test_after_member_and_binding_with_separators():
+    assert apply(COMPONENT % (';', ','), EDITS) == EXPECTED
+
+
+def test_after_last_member_and_binding_without_separators():
+    # The last member and binding may omit their ``;``/``,``; inserting after
+    # them must not run the new one into the old.
+    assert apply(COMPONENT % ('', ''), EDITS) == EXPECTED
+
+
+def test_queries_select_members_and_bindings():
+    text = COMPONENT % (';', ',')
+    table = parse_tsx(text)
+    [(start, end)] = table.select('interface:PreviewCanvasProps.isUploading')
+    assert text[start:end] == 'isUploading?: boolean;'
+    [(start, end)] = table.select('props:PreviewCanvas.isUploading')
+    assert text[start:end] == 'isUploading = false,'
+    assert table.select('props:PreviewCanvas.missing') == []
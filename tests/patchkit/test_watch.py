@@ -0,0 +1,63 @@
+import io
+
+from patchkit import watch as watch_module
+from patchkit.engine import Edit
+from patchkit.patchset import PatchSet
+from patchkit.watch import PollingSource, Watcher
+
+PATCH_SET = PatchSet('usd', [('a.ts', Edit('usd(', 'formatUsd('))])
+
+
+class Clock:
+    """Stands in for the ``time`` module: ``sleep`` only moves ``monotonic`` forward."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class ScriptedSource(PollingSource):
+    """Polling source that rewrites the target at the scheduled (fake) times."""
+
+    def __init__(self, root, paths, interval, clock, writes):
+        super().__init__(root, paths, interval)
+        self.clock = clock
+        self.writes = list(writes)
+
+    def wait(self, timeout):
+        while self.writes and self.writes[0][0] <= self.clock.now:
+            _, text = self.writes.pop(0)
+            (self.root / 'a.ts').write_text(text, encoding='utf-8')
+        return super().wait(timeout)
+
+
+def test_polling_applies_once_per_debounce_window(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(watch_module, 'time', clock)
+    applied = []
+
+    def apply_file(root, path, edits, **kwargs):
+        applied.append((round(clock.now, 2), (tmp_path / path).read_text(encoding='utf-8')))
+        return real_apply_file(root, path, edits, **kwargs)
+
+    real_apply_file = watch_module.apply_file
+    monkeypatch.setattr(watch_module, 'apply_file', apply_file)
+    (tmp_path / 'a.ts').write_text('', encoding='utf-8')
+
+    # A burst of saves 0.1 s apart, then a lone save well after it settled.
+    writes = [(0.1, 'usd(1);\n'), (0.2, 'usd(1); usd(2);\n'), (0.3, 'usd(1); usd(2); usd(3);\n'), (1.0, 'usd(4);\n')]
+    source = ScriptedSource(tmp_path, ['a.ts'], 0.1, clock, writes)
+    watcher = Watcher([PATCH_SET], str(tmp_path), debounce=0.25, out=io.StringIO())
+    watcher.run(source, stop=lambda: clock.now > 2.0)
+
+    # One apply per window, on the last content of the burst; the watcher's
+    # own writes are not picked up as changes.
+    assert [text for _, text in applied] == ['usd(1); usd(2); usd(3);\n', 'usd(4);\n']
+    assert 0.3 < applied[0][0] < 1.0 and applied[1][0] > 1.0
+    assert (tmp_path / 'a.ts').read_text(encoding='utf-8') == 'formatUsd(4);\n'
+    assert watcher.out.getvalue().count('🔁 a.ts: re-applied 1 edits') == 2